@@ -4,11 +4,23 @@ import streamlit as st
 import json
 import requests
 import pandas as pd
-from typing import Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
 import boto3
 from io import BytesIO
 
 
+def _iter_events(response: requests.Response) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(event, data) pairs from a server-sent event stream"""
+    event = "message"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            event = "message"
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            yield event, json.loads(line[len("data:"):])
+
+
 def render_match_summary(
     s3_client: Optional[boto3.client],
     s3_bucket: str,
@@ -33,21 +45,31 @@ def render_match_summary(
         
         if st.button("Generate Analysis"):
             try:
-                response = requests.post(
-                    f"{llm_url}/analyze",
+                # Streamed, so text appears as it is generated; the timeout applies between chunks
+                with requests.post(
+                    f"{llm_url}/analyze/stream",
                     json={
                         "events": events,
                         "provider": "openai",
                     },
                     timeout=30,
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    st.subheader("LLM Analysis")
-                    st.write(result.get("analysis", "No analysis generated"))
-                else:
-                    st.error(f"LLM service error: {response.status_code}")
+                    stream=True,
+                ) as response:
+                    if response.status_code == 200:
+                        st.subheader("LLM Analysis")
+                        placeholder = st.empty()
+                        text = ""
+                        for event, data in _iter_events(response):
+                            if event == "token":
+                                text += data.get("text", "")
+                                placeholder.write(text)
+                            elif event == "done":
+                                text = data.get("analysis", text)
+                                placeholder.write(text or "No analysis generated")
+                            elif event == "error":
+                                st.error(f"LLM analysis failed: {data.get('detail')}")
+                    else:
+                        st.error(f"LLM service error: {response.status_code}")
             except Exception as e:
                 st.error(f"Failed to connect to LLM service: {e}")
         
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark the headless NumPy arena at increasing batch sizes
+
+Steps ArenaEnv with random actions for every ``--arenas`` size and
+reports environment steps per second, arena steps (one decision of every
+agent in one arena) per second and the episodes finished:
+
+    python benchmarks/bench_arena.py --arenas 1 64 1024 4096 --steps 200
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from mlagents_envs.base_env import ActionTuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.envs.arena import ACTION_SPEC, BEHAVIORS, ArenaEnv  # noqa: E402
+
+
+def measure(num_arenas: int, steps: int, agents_per_team: int, seed: int = 0) -> Dict[str, float]:
+    env = ArenaEnv(num_arenas, agents_per_team=agents_per_team, spawn_jitter=1.0, seed=seed)
+    rng = np.random.default_rng(seed)
+    rows = num_arenas * agents_per_team
+    env.reset()
+
+    started = time.perf_counter()
+    for _ in range(steps):
+        for behavior_name in BEHAVIORS:
+            continuous = rng.uniform(-1, 1, (rows, ACTION_SPEC.continuous_size)).astype(np.float32)
+            discrete = np.stack([rng.integers(0, size, rows) for size in ACTION_SPEC.discrete_branches], axis=-1)
+            env.set_actions(behavior_name, ActionTuple(continuous=continuous, discrete=discrete.astype(np.int32)))
+        env.step()
+        for behavior_name in BEHAVIORS:
+            env.get_steps(behavior_name)
+    seconds = time.perf_counter() - started
+
+    return {
+        "arenas": num_arenas,
+        "steps_per_second": steps / seconds,
+        "arena_steps_per_second": steps * num_arenas / seconds,
+        "noxus_wins": int(env.wins[0]),
+        "ionia_wins": int(env.wins[1]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--arenas", type=int, nargs="+", default=[1, 64, 1024, 4096])
+    parser.add_argument("--steps", type=int, default=200, help="Steps per batch size (300 is one timed-out episode)")
+    parser.add_argument("--agents-per-team", type=int, default=2)
+    parser.add_argument("--json", action="store_true", help="Print one JSON object")
+    args = parser.parse_args()
+
+    results: List[dict] = [measure(arenas, args.steps, args.agents_per_team) for arenas in args.arenas]
+    if args.json:
+        print(json.dumps({"results": results}))
+        return
+
+    print(f"{args.steps} steps, {args.agents_per_team} agents per team")
+    print(f"{'arenas':>8}{'steps/s':>10}{'arena steps/s':>15}{'Noxus wins':>12}{'Ionia wins':>12}")
+    for result in results:
+        print(
+            f"{result['arenas']:8d}{result['steps_per_second']:10.1f}{result['arena_steps_per_second']:15.0f}"
+            f"{result['noxus_wins']:12d}{result['ionia_wins']:12d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark pipelined stepping against the serial step-then-infer loop
+
+Runs PipelinedStepper over the stand-in environment with a stand-in
+policy that burns CPU in proportion to the rows it is given
+(``--policy-ms`` for the rows of all environments), for each
+``groups:staleness`` pair in ``--configs``. ``1:0`` is the serial loop.
+By default steps sleep (``--step-ms``) like a Unity build simulating in
+its own process; ``--busy`` burns CPU in the environment processes
+instead. Reports throughput and how busy the policy and the environments
+were:
+
+    python benchmarks/bench_pipeline.py --envs 4 --step-ms 10 --policy-ms 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from mlagents_envs.base_env import ActionTuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.wrappers.pipeline import PipelinedStepper  # noqa: E402
+from src.wrappers.vec_env import VecGameWrapper  # noqa: E402
+from standin_env import ACTION_SPEC, StandinEnvFactory  # noqa: E402
+
+
+class BusyPolicy:
+    """Random actions, after burning ``seconds_per_row`` of CPU for every observation row"""
+
+    def __init__(self, seconds_per_row: float, seed: int = 0):
+        self.seconds_per_row = seconds_per_row
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, obs: Dict[str, np.ndarray]) -> Dict[str, ActionTuple]:
+        rows = sum(len(batch) for batch in obs.values())
+        deadline = time.perf_counter() + rows * self.seconds_per_row
+        while time.perf_counter() < deadline:
+            pass
+        actions = {}
+        for behavior_name, batch in obs.items():
+            continuous = self.rng.uniform(-1, 1, (len(batch), ACTION_SPEC.continuous_size)).astype(np.float32)
+            discrete = np.stack(
+                [self.rng.integers(0, size, len(batch)) for size in ACTION_SPEC.discrete_branches], axis=-1
+            )
+            actions[behavior_name] = ActionTuple(continuous=continuous, discrete=discrete.astype(np.int32))
+        return actions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--envs", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=200, help="Steps of every environment per configuration")
+    parser.add_argument("--step-ms", type=float, default=10.0, help="Milliseconds each environment step takes")
+    parser.add_argument("--busy", action="store_true", help="Burn CPU in environment steps instead of sleeping")
+    parser.add_argument("--policy-ms", type=float, default=8.0, help="Inference CPU milliseconds for all envs' rows")
+    parser.add_argument("--agents-per-team", type=int, default=2)
+    parser.add_argument("--configs", nargs="+", default=["1:0", "2:0", "1:1", "2:1"], help="groups:staleness")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object")
+    args = parser.parse_args()
+
+    factory = StandinEnvFactory(agents_per_team=args.agents_per_team, step_ms=args.step_ms, busy=args.busy)
+    rows = args.envs * args.agents_per_team * 2
+    policy = BusyPolicy(args.policy_ms / 1000.0 / rows)
+
+    results: List[dict] = []
+    vec_env = VecGameWrapper(factory, args.envs)
+    try:
+        for config in args.configs:
+            groups, staleness = (int(part) for part in config.split(":"))
+            stats = PipelinedStepper(vec_env, policy, num_groups=groups, staleness=staleness).run(args.steps)
+            results.append({"groups": groups, "staleness": staleness, **stats})
+    finally:
+        vec_env.close()
+
+    if args.json:
+        print(json.dumps({"cpus": os.cpu_count(), "results": results}))
+        return
+
+    mode = "CPU-bound" if args.busy else "sleeping"
+    print(
+        f"{os.cpu_count()} CPUs, {args.envs} envs, {args.step_ms:g} ms {mode} steps, "
+        f"{args.policy_ms:g} ms inference for all envs"
+    )
+    print(f"{'groups:staleness':<18}{'steps/s':>9}{'speedup':>9}{'policy busy':>13}{'env busy':>10}{'fallbacks':>11}")
+    baseline = results[0]["steps_per_second"]
+    for result in results:
+        print(
+            f"{result['groups']}:{result['staleness']:<16}{result['steps_per_second']:9.0f}"
+            f"{result['steps_per_second'] / baseline:8.2f}x"
+            f"{result['policy_utilization'] * 100:12.0f}%{result['env_utilization'] * 100:9.0f}%"
+            f"{result['stale_fallbacks']:11d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
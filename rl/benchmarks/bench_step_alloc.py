@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Microbenchmark GameWrapper.step allocations, unbuffered against buffered
+
+Steps a stand-in environment whose ``get_steps`` hands back the same
+DecisionSteps/TerminalSteps objects every time, so everything allocated
+during a step is the wrapper's own. For each mode it reports the time per
+step and, from ``tracemalloc``, the bytes a step allocates at its peak
+and the bytes still held once it returns:
+
+    python benchmarks/bench_step_alloc.py --agents-per-team 64 --steps 2000
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+from mlagents_envs.base_env import DecisionSteps, TerminalSteps
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.wrappers.game_wrapper import GameWrapper  # noqa: E402
+from standin_env import StandinEnv  # noqa: E402
+from bench_vec_env import random_actions  # noqa: E402
+
+
+class CachedStepsEnv(StandinEnv):
+    """StandinEnv returning precomputed steps: decisions only, and every ``episode_length`` steps with terminals"""
+
+    def __init__(self, agents_per_team: int, episode_length: int):
+        super().__init__(agents_per_team=agents_per_team, step_ms=0.0, episode_length=episode_length)
+        self.cached: Dict[Tuple[str, bool], Tuple[DecisionSteps, TerminalSteps]] = {}
+        for behavior_name in self.behavior_specs:
+            self.steps = 0
+            self.cached[behavior_name, False] = super().get_steps(behavior_name)
+            self.steps = episode_length
+            self.cached[behavior_name, True] = super().get_steps(behavior_name)
+        self.steps = 0
+
+    def step(self):
+        self.steps += 1
+
+    def get_steps(self, behavior_name: str) -> Tuple[DecisionSteps, TerminalSteps]:
+        return self.cached[behavior_name, self.steps % self.episode_length == 0]
+
+
+def measure(buffered: bool, agents_per_team: int, episode_length: int, steps: int) -> Dict[str, float]:
+    env = CachedStepsEnv(agents_per_team, episode_length)
+    wrapper = GameWrapper(env, buffered=buffered)
+    actions = random_actions(np.random.default_rng(0), (agents_per_team,))
+    wrapper.reset()
+    # Warm up: grow buffers and caches, and pass an episode end
+    for _ in range(episode_length + 1):
+        wrapper.step(actions)
+
+    started = time.perf_counter()
+    for _ in range(steps):
+        wrapper.step(actions)
+    seconds = time.perf_counter() - started
+
+    peak_bytes = 0
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(steps):
+        tracemalloc.reset_peak()
+        floor, _ = tracemalloc.get_traced_memory()
+        wrapper.step(actions)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_bytes += peak - floor
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "microseconds_per_step": seconds / steps * 1e6,
+        "peak_bytes_per_step": peak_bytes / steps,
+        "retained_bytes_per_step": (after - before) / steps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents-per-team", type=int, default=16)
+    parser.add_argument("--episode-length", type=int, default=100, help="Steps between steps with terminal agents")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="Print one JSON object")
+    args = parser.parse_args()
+
+    report = {
+        mode: measure(mode == "buffered", args.agents_per_team, args.episode_length, args.steps)
+        for mode in ("unbuffered", "buffered")
+    }
+    if args.json:
+        print(json.dumps(report))
+        return
+
+    print(f"{args.agents_per_team} agents per team, terminal agents every {args.episode_length} steps")
+    print(f"{'':<12}{'us/step':>10}{'peak B/step':>14}{'retained B/step':>17}")
+    for mode, result in report.items():
+        print(
+            f"{mode:<12}{result['microseconds_per_step']:10.1f}{result['peak_bytes_per_step']:14.0f}"
+            f"{result['retained_bytes_per_step']:17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark VecGameWrapper throughput against a single GameWrapper
+
+Steps the stand-in environment (``standin_env.py``, which burns
+``--step-ms`` of CPU per step like a simulation would, or sleeps through
+it with ``--sleep`` like a separate Unity process) through one in-process
+GameWrapper, then through VecGameWrapper with each count in ``--envs``,
+and reports environment steps per second and the scaling
+efficiency relative to the single wrapper. CPU-bound steps scale up to
+the number of cores; sleeping steps show the wrapper's own overhead:
+
+    python benchmarks/bench_vec_env.py --envs 1 2 4 8 --step-ms 2
+    python benchmarks/bench_vec_env.py --envs 1 4 16 --step-ms 20 --sleep
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from mlagents_envs.base_env import ActionTuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.wrappers.game_wrapper import GameWrapper  # noqa: E402
+from src.wrappers.vec_env import VecGameWrapper  # noqa: E402
+from standin_env import ACTION_SPEC, BEHAVIORS, StandinEnvFactory  # noqa: E402
+
+
+def random_actions(rng: np.random.Generator, shape: tuple) -> Dict[str, ActionTuple]:
+    """Random hybrid actions per behavior, ``shape`` leading the action axis"""
+    actions = {}
+    for behavior_name in BEHAVIORS:
+        continuous = rng.uniform(-1, 1, shape + (ACTION_SPEC.continuous_size,)).astype(np.float32)
+        discrete = np.stack([rng.integers(0, size, shape) for size in ACTION_SPEC.discrete_branches], axis=-1)
+        actions[behavior_name] = ActionTuple(continuous=continuous, discrete=discrete.astype(np.int32))
+    return actions
+
+
+def time_single(factory: StandinEnvFactory, steps: int) -> float:
+    """Environment steps per second of one in-process GameWrapper"""
+    rng = np.random.default_rng(0)
+    wrapper = GameWrapper(factory(0))
+    wrapper.reset()
+    actions = random_actions(rng, (factory.agents_per_team,))
+    started = time.perf_counter()
+    for _ in range(steps):
+        wrapper.step(actions)
+    elapsed = time.perf_counter() - started
+    wrapper.close()
+    return steps / elapsed
+
+
+def time_vec(factory: StandinEnvFactory, num_envs: int, steps: int) -> float:
+    """Environment steps per second of VecGameWrapper over ``num_envs`` processes"""
+    rng = np.random.default_rng(0)
+    vec = VecGameWrapper(factory, num_envs)
+    try:
+        vec.reset()
+        actions = random_actions(rng, (num_envs, factory.agents_per_team))
+        # Untimed warm-up step so process start-up is not measured
+        vec.step(actions)
+        started = time.perf_counter()
+        for _ in range(steps):
+            vec.step(actions)
+        elapsed = time.perf_counter() - started
+    finally:
+        vec.close()
+    return num_envs * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--steps", type=int, default=500, help="Batched steps timed per configuration")
+    parser.add_argument("--step-ms", type=float, default=2.0, help="Milliseconds each environment step takes")
+    parser.add_argument("--sleep", action="store_true", help="Sleep through steps instead of burning CPU")
+    parser.add_argument("--agents-per-team", type=int, default=2)
+    parser.add_argument("--json", action="store_true", help="Print one JSON object")
+    args = parser.parse_args()
+
+    factory = StandinEnvFactory(agents_per_team=args.agents_per_team, step_ms=args.step_ms, busy=not args.sleep)
+    baseline = time_single(factory, args.steps)
+    results: List[dict] = []
+    for num_envs in sorted(set(args.envs)):
+        rate = time_vec(factory, num_envs, args.steps)
+        results.append({
+            "num_envs": num_envs,
+            "steps_per_second": rate,
+            "speedup": rate / baseline,
+            "efficiency": rate / baseline / num_envs,
+        })
+
+    if args.json:
+        print(json.dumps({"cpus": os.cpu_count(), "single_steps_per_second": baseline, "vec": results}))
+        return
+
+    mode = "sleeping" if args.sleep else "CPU-bound"
+    print(f"{os.cpu_count()} CPUs, {args.step_ms:g} ms {mode} per environment step")
+    print(f"{'GameWrapper':<16}{baseline:10.0f} steps/s")
+    for result in results:
+        print(
+            f"{'Vec x' + str(result['num_envs']):<16}{result['steps_per_second']:10.0f} steps/s"
+            f"  {result['speedup']:5.2f}x  {result['efficiency'] * 100:5.1f}% efficiency"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Stand-in for a Noxus-Ionia Unity build, for benchmarking the wrapper layer
+
+Implements ``BaseEnv`` with the game's shapes (one behavior per team, 33
+observations, 3 continuous actions and discrete branches of 6 and 1) and
+spends a configurable time per step in place of the simulation, either
+burning CPU or sleeping as if a separate Unity process were simulating.
+Observations are random, and every agent's episode ends after a fixed
+number of steps, so wrappers see both decision and terminal steps.
+
+    from standin_env import StandinEnvFactory
+    env = StandinEnvFactory(step_ms=2.0)(0)
+"""
+
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+from mlagents_envs.base_env import (
+    ActionSpec,
+    ActionTuple,
+    BaseEnv,
+    BehaviorMapping,
+    BehaviorSpec,
+    DecisionSteps,
+    DimensionProperty,
+    ObservationSpec,
+    ObservationType,
+    TerminalSteps,
+)
+
+BEHAVIORS = ("NoxusAgent", "IoniaAgent")
+OBSERVATION_SIZE = 33
+ACTION_SPEC = ActionSpec(continuous_size=3, discrete_branches=(6, 1))
+
+
+def behavior_spec() -> BehaviorSpec:
+    observation = ObservationSpec(
+        shape=(OBSERVATION_SIZE,),
+        dimension_property=(DimensionProperty.NONE,),
+        observation_type=ObservationType.DEFAULT,
+        name="VectorSensor",
+    )
+    return BehaviorSpec(observation_specs=[observation], action_spec=ACTION_SPEC)
+
+
+class StandinEnv(BaseEnv):
+    """
+    Args:
+        agents_per_team: Agents in each behavior
+        step_ms: Time each step takes, standing in for the simulation
+        busy: Burn ``step_ms`` of CPU (a simulation in this process) rather than sleep
+            (a Unity build simulating in its own process)
+        episode_length: Steps before every agent's episode ends
+        seed: Seed of the observation stream
+    """
+
+    def __init__(
+        self,
+        agents_per_team: int = 2,
+        step_ms: float = 1.0,
+        busy: bool = True,
+        episode_length: int = 500,
+        seed: int = 0,
+    ):
+        self.agents_per_team = agents_per_team
+        self.step_ms = step_ms
+        self.busy = busy
+        self.episode_length = episode_length
+        self.rng = np.random.default_rng(seed)
+        self.steps = 0
+        self._specs = BehaviorMapping({name: behavior_spec() for name in BEHAVIORS})
+        self._actions: Dict[str, ActionTuple] = {}
+
+    @property
+    def behavior_specs(self) -> BehaviorMapping:
+        return self._specs
+
+    def reset(self):
+        self.steps = 0
+
+    def step(self):
+        if not self.busy:
+            time.sleep(self.step_ms / 1000.0)
+            self.steps += 1
+            return
+        deadline = time.perf_counter() + self.step_ms / 1000.0
+        while time.perf_counter() < deadline:
+            pass
+        self.steps += 1
+
+    def set_actions(self, behavior_name: str, action: ActionTuple):
+        self._actions[behavior_name] = action
+
+    def set_action_for_agent(self, behavior_name: str, agent_id: int, action: ActionTuple):
+        pass
+
+    def get_steps(self, behavior_name: str) -> Tuple[DecisionSteps, TerminalSteps]:
+        n = self.agents_per_team
+        offset = BEHAVIORS.index(behavior_name) * n
+        agent_id = np.arange(offset, offset + n, dtype=np.int32)
+        obs = [self.rng.random((n, OBSERVATION_SIZE), dtype=np.float32)]
+        reward = self.rng.standard_normal(n).astype(np.float32)
+        group = np.zeros(n, dtype=np.int32)
+        group_reward = np.zeros(n, dtype=np.float32)
+
+        if self.steps and self.steps % self.episode_length == 0:
+            terminal = TerminalSteps(obs, reward, np.zeros(n, dtype=bool), agent_id, group, group_reward)
+            # Agents restart straight away, as in the Unity build
+            decision = DecisionSteps(
+                [self.rng.random((n, OBSERVATION_SIZE), dtype=np.float32)],
+                np.zeros(n, dtype=np.float32),
+                agent_id,
+                None,
+                group,
+                group_reward,
+            )
+            return decision, terminal
+
+        decision = DecisionSteps(obs, reward, agent_id, None, group, group_reward)
+        return decision, TerminalSteps.empty(self._specs[behavior_name])
+
+    def close(self):
+        pass
+
+
+class StandinEnvFactory:
+    """Picklable ``index -> StandinEnv``, seeding each environment differently"""
+
+    def __init__(
+        self,
+        agents_per_team: int = 2,
+        step_ms: float = 1.0,
+        busy: bool = True,
+        episode_length: int = 500,
+        seed: int = 0,
+    ):
+        self.agents_per_team = agents_per_team
+        self.step_ms = step_ms
+        self.busy = busy
+        self.episode_length = episode_length
+        self.seed = seed
+
+    def __call__(self, index: int) -> StandinEnv:
+        return StandinEnv(self.agents_per_team, self.step_ms, self.busy, self.episode_length, self.seed + index)
@@ -0,0 +1 @@
+"""Headless environments implementing the ML-Agents BaseEnv API"""
@@ -0,0 +1,484 @@
+"""Headless NumPy reimplementation of the Noxus-Ionia arena
+
+ArenaEnv implements ``BaseEnv`` for ``num_arenas`` independent copies of
+TrainingScene stepped together as array operations, so rollouts need no
+Unity process. The behaviors, the 33-feature observations and the hybrid
+action space (3 continuous actions, discrete branches of 6 and 1) match
+the agent prefabs, and agent ids stay the same across episodes.
+
+Rules follow BaseAgent.cs, GameManager.cs, HealZone.cs and Obstacle.cs
+with the scene and prefab values: one environment step is a decision
+period of 5 physics steps of 0.02 s, with the action repeated on each.
+Agents accelerate towards their move direction and turn to face it,
+attack the nearest enemy in range for 25 damage once per second, heal
+10 HP/s in their own heal zone and push obstacles with the interact
+action. Dead agents stay dead, observing zeros, until the episode ends.
+A team wins by eliminating the other; at the time limit Ionia wins
+unless it has been eliminated. The mana system has been removed from the
+game (the banked-mana observations are always 0), so there is nothing to
+pick up or deposit.
+
+Differences from the Unity build:
+
+- Positions are clamped to the arena walls; agents and obstacles do not collide with each other
+- Attack and interact targets come from current positions, not the lists cached at the last decision
+- A finished arena restarts at the next step, not 1 s later
+- The attack cooldown observation counts from the episode start, not from scene load
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+from mlagents_envs.base_env import (
+    ActionSpec,
+    ActionTuple,
+    BaseEnv,
+    BehaviorMapping,
+    BehaviorSpec,
+    DecisionSteps,
+    DimensionProperty,
+    ObservationSpec,
+    ObservationType,
+    TerminalSteps,
+)
+
+BEHAVIORS = ("NoxusAgent", "IoniaAgent")
+NOXUS, IONIA = 0, 1
+OBSERVATION_SIZE = 33
+ACTION_SPEC = ActionSpec(continuous_size=3, discrete_branches=(6, 1))
+
+# Discrete branch 0 has 6 values; value 5 (formerly drop) is a no-op, like defend and signal
+ACTION_NONE, ACTION_INTERACT, ACTION_ATTACK, ACTION_DEFEND, ACTION_SIGNAL = range(5)
+
+# Time (TimeManager.asset, agent prefabs, TrainingScene)
+FIXED_DELTA_TIME = 0.02
+DECISION_PERIOD = 5
+EPISODE_MAX_TIME = 30.0
+WIN_CHECK_DELAY = 0.5
+# Observed time remaining is normalized by 5 minutes
+TIME_NORMALIZER = 300.0
+
+# BaseAgent (prefab overrides applied)
+MOVE_SPEED = 5.0
+ROTATION_SPEED = 180.0
+ACCELERATION = 10.0
+DECELERATION = 15.0
+AGENT_DRAG = 5.0
+INTERACTION_RANGE = 2.0
+ATTACK_RANGE = 1.5
+ATTACK_COOLDOWN = 1.0
+ATTACK_DAMAGE = 25
+MAX_HEALTH = 100
+K_NEAREST = 5
+OBSERVATION_RADIUS = 20.0
+POSITION_NORMALIZER = 50.0
+REWARD_DEATH = -1.0
+REWARD_WIN = 10.0
+REWARD_LOSS = -5.0
+REWARD_IDLE = -0.01
+IDLE_DISTANCE = 0.1
+IDLE_GRACE = 2.0
+
+# TrainingScene layout, (x, z) on a 20 x 20 ground inside walls at +-10
+ARENA_LIMIT = 9.0
+HEAL_ZONES = np.array([[10.0, 10.0], [-10.0, -10.0]])
+HEAL_RATE = 10.0
+HEAL_ZONE_RADIUS = 5.0
+SPAWN_POINTS = np.array([[[7.0, 5.0], [5.0, 7.0]], [[-7.0, -5.0], [-5.0, -7.0]]])
+
+# Obstacles: WallObstacle and BoxObstacle
+OBSTACLE_STARTS = np.array([[3.84, -4.28], [-5.09, 4.18]])
+OBSTACLE_MASS = np.array([50.0, 10.0])
+OBSTACLE_DRAG = np.array([2.0, 1.0])
+OBSTACLE_SPEED_NORMALIZER = 5.0
+PUSH_FORCE = 5.0
+MAX_PUSH_DISTANCE = 10.0
+NEAREST_OBSTACLES = 3
+
+
+def behavior_spec() -> BehaviorSpec:
+    observation = ObservationSpec(
+        shape=(OBSERVATION_SIZE,),
+        dimension_property=(DimensionProperty.NONE,),
+        observation_type=ObservationType.DEFAULT,
+        name="VectorSensor",
+    )
+    return BehaviorSpec(observation_specs=[observation], action_spec=ACTION_SPEC)
+
+
+def _norm(vectors: np.ndarray) -> np.ndarray:
+    return np.sqrt(np.sum(np.square(vectors), axis=-1))
+
+
+def _distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise distances between (E, N, 2) and (E, M, 2) points, shape (E, N, M)"""
+    return _norm(a[:, :, None, :] - b[:, None, :, :])
+
+
+class ArenaEnv(BaseEnv):
+    """
+    ``num_arenas`` Noxus-Ionia arenas as one BaseEnv.
+
+    Each behavior's steps hold ``num_arenas * agents_per_team`` agents, arena by arena;
+    agent ``arena * 2 * agents_per_team + slot`` is Noxus for the first ``agents_per_team``
+    slots of its arena and Ionia for the rest.
+
+    Args:
+        num_arenas: Arenas simulated together
+        agents_per_team: Agents per team and arena (the scene has spawn points for 2)
+        episode_max_time: Seconds before the episode times out (TrainingScene uses 30)
+        spawn_jitter: Uniform noise added to spawn positions, 0 for the scene's exact spawns
+        seed: Seed of the spawn jitter
+    """
+
+    def __init__(
+        self,
+        num_arenas: int = 1,
+        agents_per_team: int = 2,
+        episode_max_time: float = EPISODE_MAX_TIME,
+        spawn_jitter: float = 0.0,
+        seed: int = 0,
+    ):
+        if not 1 <= agents_per_team <= SPAWN_POINTS.shape[1]:
+            raise ValueError(f"agents_per_team must be between 1 and {SPAWN_POINTS.shape[1]}")
+        self.num_arenas = num_arenas
+        self.agents_per_team = agents_per_team
+        self.episode_max_time = episode_max_time
+        self.spawn_jitter = spawn_jitter
+        self.rng = np.random.default_rng(seed)
+
+        arenas, agents = num_arenas, 2 * agents_per_team
+        self.team = np.repeat([NOXUS, IONIA], agents_per_team)
+        self.spawns = SPAWN_POINTS[:, :agents_per_team].reshape(agents, 2)
+        self.agent_ids = np.arange(arenas * agents, dtype=np.int32).reshape(arenas, agents)
+        self._specs = BehaviorMapping({name: behavior_spec() for name in BEHAVIORS})
+
+        # Agent state, (arenas, agents, ...)
+        self.position = np.zeros((arenas, agents, 2))
+        self.velocity = np.zeros((arenas, agents, 2))  # BaseAgent.currentVelocity
+        self.body_velocity = np.zeros((arenas, agents, 2))  # Rigidbody velocity after drag
+        self.yaw = np.zeros((arenas, agents))
+        self.health = np.zeros((arenas, agents), dtype=np.int64)
+        self.heal_accumulated = np.zeros((arenas, agents))
+        self.since_attack = np.zeros((arenas, agents))
+        self.dead = np.zeros((arenas, agents), dtype=bool)
+        self.idle_time = np.zeros((arenas, agents))
+        self.last_position = np.zeros((arenas, agents, 2))
+        self.reward = np.zeros((arenas, agents), dtype=np.float32)
+
+        # Obstacle state, (arenas, obstacles, 2), and arena clocks
+        self.obstacle_position = np.zeros((arenas, len(OBSTACLE_STARTS), 2))
+        self.obstacle_velocity = np.zeros((arenas, len(OBSTACLE_STARTS), 2))
+        self.time = np.zeros(arenas)
+
+        # Actions for the next step; dead agents' are ignored
+        self.continuous_actions = np.zeros((arenas, agents, ACTION_SPEC.continuous_size), dtype=np.float32)
+        self.discrete_actions = np.zeros((arenas, agents, len(ACTION_SPEC.discrete_branches)), dtype=np.int32)
+
+        # Episodes won by each team, and the results of the last step
+        self.wins = np.zeros(2, dtype=np.int64)
+        self._obs = np.zeros((arenas, agents, OBSERVATION_SIZE), dtype=np.float32)
+        self._ended = np.zeros(0, dtype=np.int64)
+        self._terminal_obs = np.zeros((0, agents, OBSERVATION_SIZE), dtype=np.float32)
+        self._terminal_reward = np.zeros((0, agents), dtype=np.float32)
+
+    @property
+    def behavior_specs(self) -> BehaviorMapping:
+        return self._specs
+
+    def get_behavior_names(self) -> List[str]:
+        """Behavior names, for callers of the pre-0.30 ``get_behavior_names()`` API"""
+        return list(BEHAVIORS)
+
+    def _slots(self, behavior_name: str) -> slice:
+        team = BEHAVIORS.index(behavior_name)
+        return slice(team * self.agents_per_team, (team + 1) * self.agents_per_team)
+
+    def set_actions(self, behavior_name: str, action: ActionTuple):
+        slots = self._slots(behavior_name)
+        shape = (self.num_arenas, self.agents_per_team, -1)
+        if action.continuous is not None and action.continuous.size:
+            self.continuous_actions[:, slots] = np.reshape(action.continuous, shape)
+        if action.discrete is not None and action.discrete.size:
+            self.discrete_actions[:, slots] = np.reshape(action.discrete, shape)
+
+    def set_action_for_agent(self, behavior_name: str, agent_id: int, action: ActionTuple):
+        arena, slot = divmod(int(agent_id), 2 * self.agents_per_team)
+        if action.continuous is not None and action.continuous.size:
+            self.continuous_actions[arena, slot] = np.reshape(action.continuous, -1)
+        if action.discrete is not None and action.discrete.size:
+            self.discrete_actions[arena, slot] = np.reshape(action.discrete, -1)
+
+    def reset(self):
+        self._reset_arenas(np.arange(self.num_arenas))
+        self.reward.fill(0.0)
+        self._ended = np.zeros(0, dtype=np.int64)
+        self._obs = self._observe(np.arange(self.num_arenas))
+
+    def step(self):
+        """One decision period: DECISION_PERIOD physics steps with the current actions"""
+        self.reward.fill(0.0)
+        active = np.ones(self.num_arenas, dtype=bool)
+        for _ in range(DECISION_PERIOD):
+            active &= ~self._physics_step(active)
+
+        everything = np.arange(self.num_arenas)
+        obs = self._observe(everything)
+        ended = np.flatnonzero(~active)
+        self._ended = ended
+        self._terminal_obs = obs[ended]
+        self._terminal_reward = self.reward[ended]
+        if len(ended):
+            self._reset_arenas(ended)
+            obs[ended] = self._observe(ended)
+            self.reward[ended] = 0.0
+        self._obs = obs
+
+    def get_steps(self, behavior_name: str) -> Tuple[DecisionSteps, TerminalSteps]:
+        slots = self._slots(behavior_name)
+        rows = self.num_arenas * self.agents_per_team
+        decision = DecisionSteps(
+            [self._obs[:, slots].reshape(rows, OBSERVATION_SIZE)],
+            self.reward[:, slots].reshape(rows),
+            self.agent_ids[:, slots].reshape(rows),
+            None,
+            np.zeros(rows, dtype=np.int32),
+            np.zeros(rows, dtype=np.float32),
+        )
+        if not len(self._ended):
+            return decision, TerminalSteps.empty(self._specs[behavior_name])
+
+        rows = len(self._ended) * self.agents_per_team
+        terminal = TerminalSteps(
+            [self._terminal_obs[:, slots].reshape(rows, OBSERVATION_SIZE)],
+            self._terminal_reward[:, slots].reshape(rows),
+            np.zeros(rows, dtype=bool),
+            self.agent_ids[self._ended][:, slots].reshape(rows),
+            np.zeros(rows, dtype=np.int32),
+            np.zeros(rows, dtype=np.float32),
+        )
+        return decision, terminal
+
+    def close(self):
+        pass
+
+    def _reset_arenas(self, arenas: np.ndarray):
+        """GameManager.StartEpisode and BaseAgent.OnEpisodeBegin for the given arenas"""
+        position = np.broadcast_to(self.spawns, (len(arenas),) + self.spawns.shape)
+        if self.spawn_jitter:
+            position = position + self.rng.uniform(-self.spawn_jitter, self.spawn_jitter, position.shape)
+        self.position[arenas] = position
+        self.last_position[arenas] = position
+        self.velocity[arenas] = 0.0
+        self.body_velocity[arenas] = 0.0
+        self.yaw[arenas] = 0.0
+        self.health[arenas] = MAX_HEALTH
+        self.heal_accumulated[arenas] = 0.0
+        self.since_attack[arenas] = 0.0
+        self.dead[arenas] = False
+        self.idle_time[arenas] = 0.0
+        self.obstacle_position[arenas] = OBSTACLE_STARTS
+        self.obstacle_velocity[arenas] = 0.0
+        self.time[arenas] = 0.0
+
+    def _physics_step(self, active: np.ndarray) -> np.ndarray:
+        """Advance the active arenas by FIXED_DELTA_TIME; returns the arenas whose episode ended"""
+        dt = FIXED_DELTA_TIME
+        alive = ~self.dead & active[:, None]
+        action = self.discrete_actions[..., 0]
+
+        # OnActionReceived: move towards the normalized direction at full speed, turn to face it
+        direction = self.continuous_actions[..., :2].astype(np.float64)
+        length = _norm(direction)
+        moving = length > 1e-5
+        target = np.where(moving[..., None], direction / np.maximum(length, 1e-5)[..., None] * MOVE_SPEED, 0.0)
+        max_change = np.where(moving, ACCELERATION * dt, DECELERATION * dt)
+        change = target - self.velocity
+        change_length = _norm(change)
+        scale = np.where(change_length > max_change, max_change / np.maximum(change_length, 1e-12), 1.0)
+        self.velocity = np.where(alive[..., None], self.velocity + change * scale[..., None], 0.0)
+
+        speed = _norm(self.velocity)
+        turning = alive & (speed > 0.1)
+        target_yaw = np.degrees(np.arctan2(self.velocity[..., 0], self.velocity[..., 1])) % 360.0
+        turn = (target_yaw - self.yaw + 180.0) % 360.0 - 180.0
+        turn = np.clip(turn, -ROTATION_SPEED * dt, ROTATION_SPEED * dt)
+        self.yaw = np.where(turning, (self.yaw + turn) % 360.0, self.yaw)
+
+        self._attack(alive & (action == ACTION_ATTACK))
+        self._interact(alive & ~self.dead & (action == ACTION_INTERACT))
+        alive &= ~self.dead
+
+        # HealZone.FixedUpdate: own zone only, whole HP at a time
+        home = HEAL_ZONES[self.team]
+        in_zone = alive & (_norm(self.position - home) <= HEAL_ZONE_RADIUS)
+        self.heal_accumulated += np.where(in_zone, HEAL_RATE * dt, 0.0)
+        whole = np.floor(self.heal_accumulated)
+        self.heal_accumulated -= whole
+        self.health = np.minimum(MAX_HEALTH, self.health + whole.astype(np.int64))
+
+        # Physics: drag, integration, walls
+        self.body_velocity = np.where(alive[..., None], self.velocity / (1.0 + AGENT_DRAG * dt), 0.0)
+        self.position += self.body_velocity * dt
+        np.clip(self.position, -ARENA_LIMIT, ARENA_LIMIT, out=self.position)
+
+        self.obstacle_velocity /= (1.0 + OBSTACLE_DRAG * dt)[:, None]
+        self.obstacle_velocity *= active[:, None, None]
+        self.obstacle_position += self.obstacle_velocity * dt
+        at_wall = np.abs(self.obstacle_position) > ARENA_LIMIT
+        self.obstacle_velocity[at_wall] = 0.0
+        np.clip(self.obstacle_position, -ARENA_LIMIT, ARENA_LIMIT, out=self.obstacle_position)
+
+        # UpdateRewards: idle penalty after IDLE_GRACE seconds of moving less than IDLE_DISTANCE per step
+        idle = alive & (_norm(self.position - self.last_position) < IDLE_DISTANCE)
+        self.idle_time = np.where(idle, self.idle_time + dt, np.where(alive, 0.0, self.idle_time))
+        self.reward += np.where(idle & (self.idle_time > IDLE_GRACE), REWARD_IDLE * dt, 0.0).astype(np.float32)
+        self.last_position[:] = self.position
+
+        self.since_attack += np.where(alive, dt, 0.0)
+        self.time += np.where(active, dt, 0.0)
+        return self._check_win(active)
+
+    def _attack(self, attacking: np.ndarray):
+        """HandleAttack: nearest living enemy within attack range takes ATTACK_DAMAGE, once per cooldown"""
+        attacking = attacking & (self.since_attack >= ATTACK_COOLDOWN)
+        if not attacking.any():
+            return
+        distance = _distances(self.position, self.position)
+        enemy = (self.team[:, None] != self.team[None, :]) & ~self.dead[:, None, :]
+        distance = np.where(enemy & (distance < OBSERVATION_RADIUS), distance, np.inf)
+        nearest = np.argmin(distance, axis=-1)
+        hits = attacking & (np.take_along_axis(distance, nearest[..., None], axis=-1)[..., 0] < ATTACK_RANGE)
+        if not hits.any():
+            return
+
+        arena, slot = np.nonzero(hits)
+        damage = np.zeros(self.health.shape, dtype=np.int64)
+        np.add.at(damage, (arena, nearest[arena, slot]), ATTACK_DAMAGE)
+        self.since_attack[hits] = 0.0
+        self.health = np.maximum(self.health - damage, 0)
+
+        # Die: no respawn until the episode ends
+        died = ~self.dead & (self.health <= 0)
+        self.dead |= died
+        self.reward += np.where(died, REWARD_DEATH, 0.0).astype(np.float32)
+        self.velocity[died] = 0.0
+        self.body_velocity[died] = 0.0
+
+    def _interact(self, interacting: np.ndarray):
+        """HandleInteract: push the nearest obstacle within reach along the agent's velocity"""
+        if not interacting.any():
+            return
+        distance = _distances(self.position, self.obstacle_position)
+        nearest = np.argmin(distance, axis=-1)
+        nearest_distance = np.take_along_axis(distance, nearest[..., None], axis=-1)[..., 0]
+        speed = _norm(self.velocity)
+        pushing = interacting & (nearest_distance < INTERACTION_RANGE) & (speed > 1e-5)
+        if not pushing.any():
+            return
+
+        arena, slot = np.nonzero(pushing)
+        obstacle = nearest[arena, slot]
+        from_start = _norm(self.obstacle_position[arena, obstacle] - OBSTACLE_STARTS[obstacle])
+        keep = from_start < MAX_PUSH_DISTANCE
+        arena, slot, obstacle = arena[keep], slot[keep], obstacle[keep]
+        direction = self.velocity[arena, slot] / speed[arena, slot][:, None]
+        impulse = direction * (PUSH_FORCE / OBSTACLE_MASS[obstacle])[:, None]
+        np.add.at(self.obstacle_velocity, (arena, obstacle), impulse)
+
+    def _check_win(self, active: np.ndarray) -> np.ndarray:
+        """GameManager.CheckWinConditions and the timeout; rewards both teams of ended arenas"""
+        team_dead = self.dead.reshape(self.num_arenas, 2, self.agents_per_team).all(axis=-1)
+        checked = active & (self.time >= WIN_CHECK_DELAY)
+        noxus_wins = checked & team_dead[:, IONIA]
+        ionia_wins = checked & ~noxus_wins & team_dead[:, NOXUS]
+
+        timeout = active & ~(noxus_wins | ionia_wins) & (self.time > self.episode_max_time)
+        noxus_wins |= timeout & team_dead[:, IONIA]
+        ionia_wins |= timeout & ~team_dead[:, IONIA]
+
+        ended = noxus_wins | ionia_wins
+        if ended.any():
+            winner = np.where(noxus_wins, NOXUS, IONIA)
+            won = self.team[None, :] == winner[:, None]
+            self.reward += np.where(ended[:, None], np.where(won, REWARD_WIN, REWARD_LOSS), 0.0).astype(np.float32)
+            self.wins += [noxus_wins.sum(), ionia_wins.sum()]
+        return ended
+
+    def _observe(self, arenas: np.ndarray) -> np.ndarray:
+        """BaseAgent.CollectObservations for every agent of the given arenas, (len(arenas), agents, 33)"""
+        position = self.position[arenas]
+        dead = self.dead[arenas]
+        health = self.health[arenas] / MAX_HEALTH
+        count, agents = dead.shape
+        obs = np.zeros((count, agents, OBSERVATION_SIZE), dtype=np.float32)
+
+        # Self state (7)
+        obs[..., 0] = health
+        obs[..., 1] = self.since_attack[arenas] / ATTACK_COOLDOWN
+        obs[..., 2] = self.team == NOXUS
+        obs[..., 3:5] = position / POSITION_NORMALIZER
+        obs[..., 5] = self.yaw[arenas] / 360.0
+        obs[..., 6] = _norm(self.body_velocity[arenas]) / MOVE_SPEED
+
+        # k nearest living agents within the observation radius (5 x 3), padded with (1, 0, 0)
+        distance = _distances(position, position)
+        visible = ~np.eye(agents, dtype=bool) & ~dead[:, None, :] & (distance < OBSERVATION_RADIUS)
+        distance = np.where(visible, distance, np.inf)
+        take = min(K_NEAREST, agents)
+        order = np.argsort(distance, axis=-1)[..., :take]
+        nearest = np.take_along_axis(distance, order, axis=-1)
+        found = np.isfinite(nearest)
+        entities = np.zeros((count, agents, K_NEAREST, 3), dtype=np.float32)
+        entities[..., 0] = 1.0
+        entities[..., :take, 0] = np.where(found, nearest / OBSERVATION_RADIUS, 1.0)
+        entities[..., :take, 1] = found & (self.team[order] == self.team[None, :, None])
+        entities[..., :take, 2] = np.where(found, np.take_along_axis(health[:, None, :], order, axis=-1), 0.0)
+        obs[..., 7:22] = entities.reshape(count, agents, 3 * K_NEAREST)
+
+        # Nearest obstacles within the observation radius (3 x 2), padded with (1, 0)
+        distance = _distances(position, self.obstacle_position[arenas])
+        distance = np.where(distance < OBSERVATION_RADIUS, distance, np.inf)
+        take = min(NEAREST_OBSTACLES, distance.shape[-1])
+        order = np.argsort(distance, axis=-1)[..., :take]
+        nearest = np.take_along_axis(distance, order, axis=-1)
+        found = np.isfinite(nearest)
+        obstacle_speed = _norm(self.obstacle_velocity[arenas]) / OBSTACLE_SPEED_NORMALIZER
+        obstacles = np.zeros((count, agents, NEAREST_OBSTACLES, 2), dtype=np.float32)
+        obstacles[..., 0] = 1.0
+        obstacles[..., :take, 0] = np.where(found, nearest / OBSERVATION_RADIUS, 1.0)
+        obstacles[..., :take, 1] = np.where(found, np.take_along_axis(obstacle_speed[:, None, :], order, axis=-1), 0.0)
+        obs[..., 22:28] = obstacles.reshape(count, agents, 2 * NEAREST_OBSTACLES)
+
+        # Heal zones (2) and global summary (3): no mana banked, time remaining
+        obs[..., 28] = _norm(position - HEAL_ZONES[self.team]) / POSITION_NORMALIZER
+        obs[..., 29] = _norm(position - HEAL_ZONES[1 - self.team]) / POSITION_NORMALIZER
+        remaining = np.maximum(0.0, self.episode_max_time - self.time[arenas]) / TIME_NORMALIZER
+        obs[..., 32] = remaining[:, None]
+
+        # Dead agents observe zeros
+        obs[dead] = 0.0
+        return obs
+
+
+class ArenaEnvFactory:
+    """Picklable ``index -> ArenaEnv`` for VecGameWrapper, seeding each environment differently"""
+
+    def __init__(
+        self,
+        num_arenas: int = 1,
+        agents_per_team: int = 2,
+        episode_max_time: float = EPISODE_MAX_TIME,
+        spawn_jitter: float = 0.0,
+        seed: int = 0,
+    ):
+        self.num_arenas = num_arenas
+        self.agents_per_team = agents_per_team
+        self.episode_max_time = episode_max_time
+        self.spawn_jitter = spawn_jitter
+        self.seed = seed
+
+    def __call__(self, index: int) -> ArenaEnv:
+        return ArenaEnv(
+            self.num_arenas, self.agents_per_team, self.episode_max_time, self.spawn_jitter, self.seed + index
+        )
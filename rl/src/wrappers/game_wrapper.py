@@ -1,16 +1,49 @@
 """Gym-style wrapper for ML-Agents Noxus-Ionia environment"""
 
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from mlagents_envs.base_env import BaseEnv
 from mlagents_envs.side_channel.engine_configuration_channel import EngineConfigurationChannel
 from mlagents_envs.side_channel.environment_parameters_channel import EnvironmentParametersChannel
 
+from .normalization import RunningMeanStd
+
+
+class StepBuffers:
+    """
+    Preallocated step outputs of one behavior, decision rows first, then terminal rows.
+
+    Views of the first ``rows`` rows are cached, so a step with the same number of agents
+    as the last one hands out the same array objects again.
+    """
+
+    def __init__(self, obs_shape: tuple, capacity: int):
+        self.obs = np.zeros((capacity,) + tuple(obs_shape), dtype=np.float32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.rows = -1
+        self.views = (self.obs, self.rewards, self.dones)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.rewards)
+
+    def view(self, rows: int) -> tuple:
+        if rows != self.rows:
+            self.rows = rows
+            self.views = (self.obs[:rows], self.rewards[:rows], self.dones[:rows])
+        return self.views
+
 
 class GameWrapper:
     """
     Wrapper for ML-Agents environment with observation normalization
     and action masking utilities.
+
+    With ``buffered=True`` reset() and step() write into arrays preallocated per behavior
+    (observation shape from the behavior spec, rows growing to the most agents seen, or
+    ``max_agents`` up front) and return views of them. The views are overwritten by the
+    next call, so copy anything kept across steps.
     """
 
     def __init__(
@@ -19,34 +52,47 @@ class GameWrapper:
         normalize_observations: bool = True,
         normalize_rewards: bool = False,
         reward_scale: float = 1.0,
+        buffered: bool = False,
+        max_agents: Optional[int] = None,
     ):
         self.env = env
         self.normalize_observations = normalize_observations
         self.normalize_rewards = normalize_rewards
         self.reward_scale = reward_scale
+        self.buffered = buffered
+        self.max_agents = max_agents
+
+        # Buffered mode: step outputs per behavior, and result dicts refilled every step
+        self.step_buffers: Dict[str, StepBuffers] = {}
+        self._results = ({}, {}, {}, {})
 
-        # Observation normalization stats
-        self.obs_mean = None
-        self.obs_std = None
-        self.obs_count = 0
+        # Observation normalization stats per behavior, sized from its spec
+        self.obs_stats: Dict[str, RunningMeanStd] = {}
+        self.obs_stats_frozen = False
 
         # Reward normalization stats
         self.reward_mean = 0.0
         self.reward_std = 1.0
         self.reward_count = 0
 
+    @property
+    def behavior_names(self) -> List[str]:
+        """Behavior names of the environment (``BaseEnv.behavior_specs`` keys)"""
+        return list(self.env.behavior_specs.keys())
+
     def reset(self) -> Dict[str, np.ndarray]:
         """Reset environment and return initial observations"""
         self.env.reset()
-        decision_steps, terminal_steps = self.env.get_steps(self.env.get_behavior_names()[0])
-        
+        if self.buffered:
+            return self._collect_buffered(resetting=True)[0]
+
         obs_dict = {}
-        for behavior_name in self.env.get_behavior_names():
+        for behavior_name in self.behavior_names:
             decision_steps, terminal_steps = self.env.get_steps(behavior_name)
             if len(decision_steps) > 0:
                 obs = decision_steps.obs[0]  # First observation vector
                 if self.normalize_observations:
-                    obs = self._normalize_observation(obs)
+                    obs = self._normalize_observation(behavior_name, obs)
                 obs_dict[behavior_name] = obs
 
         return obs_dict
@@ -62,6 +108,8 @@ class GameWrapper:
 
         # Step environment
         self.env.step()
+        if self.buffered:
+            return self._collect_buffered()
 
         # Get results
         obs_dict = {}
@@ -69,7 +117,7 @@ class GameWrapper:
         done_dict = {}
         info_dict = {}
 
-        for behavior_name in self.env.get_behavior_names():
+        for behavior_name in self.behavior_names:
             decision_steps, terminal_steps = self.env.get_steps(behavior_name)
 
             # Combine decision and terminal steps
@@ -82,7 +130,7 @@ class GameWrapper:
             if len(decision_steps) > 0:
                 obs = decision_steps.obs[0]
                 if self.normalize_observations:
-                    obs = self._normalize_observation(obs)
+                    obs = self._normalize_observation(behavior_name, obs)
                 all_obs.append(obs)
                 all_rewards.append(decision_steps.reward)
                 all_dones.append(np.zeros(len(decision_steps), dtype=bool))
@@ -92,7 +140,7 @@ class GameWrapper:
             if len(terminal_steps) > 0:
                 obs = terminal_steps.obs[0]
                 if self.normalize_observations:
-                    obs = self._normalize_observation(obs)
+                    obs = self._normalize_observation(behavior_name, obs)
                 all_obs.append(obs)
                 all_rewards.append(terminal_steps.reward)
                 all_dones.append(np.ones(len(terminal_steps), dtype=bool))
@@ -113,27 +161,95 @@ class GameWrapper:
 
         return obs_dict, reward_dict, done_dict, info_dict
 
-    def _normalize_observation(self, obs: np.ndarray) -> np.ndarray:
-        """Normalize observation using running statistics"""
-        obs = np.asarray(obs, dtype=np.float32)
+    def _buffers(self, behavior_name: str, rows: int) -> StepBuffers:
+        """The behavior's step buffers, (re)allocated when ``rows`` do not fit"""
+        buffers = self.step_buffers.get(behavior_name)
+        if buffers is None or buffers.capacity < rows:
+            capacity = max(rows, self.max_agents or 0, 2 * buffers.capacity if buffers else 0)
+            obs_shape = self.env.behavior_specs[behavior_name].observation_specs[0].shape
+            buffers = StepBuffers(obs_shape, capacity)
+            self.step_buffers[behavior_name] = buffers
+        return buffers
+
+    def _collect_buffered(self, resetting: bool = False) -> tuple:
+        """
+        Step results written into the step buffers; same layout as the unbuffered step().
 
-        if self.obs_mean is None:
-            self.obs_mean = np.zeros_like(obs)
-            self.obs_std = np.ones_like(obs)
+        When resetting, only decision steps are collected and reward statistics are left alone,
+        as in the unbuffered reset().
+        """
+        obs_dict, reward_dict, done_dict, info_dict = self._results
+        for result in self._results:
+            result.clear()
 
-        # Update running statistics
-        self.obs_count += 1
-        alpha = 1.0 / self.obs_count
-        delta = obs - self.obs_mean
-        self.obs_mean += alpha * delta
-        self.obs_std += alpha * (delta * (obs - self.obs_mean) - self.obs_std)
+        for behavior_name in self.env.behavior_specs:
+            decision_steps, terminal_steps = self.env.get_steps(behavior_name)
+            decisions = len(decision_steps)
+            rows = decisions if resetting else decisions + len(terminal_steps)
+            if rows == 0:
+                continue
+            obs, rewards, dones = self._buffers(behavior_name, rows).view(rows)
+
+            for steps, start, stop in ((decision_steps, 0, decisions), (terminal_steps, decisions, rows)):
+                if start == stop:
+                    continue
+                if self.normalize_observations:
+                    self._normalize_observation(behavior_name, steps.obs[0], out=obs[start:stop])
+                else:
+                    np.copyto(obs[start:stop], steps.obs[0], casting="same_kind")
+                np.copyto(rewards[start:stop], steps.reward, casting="same_kind")
+            dones[:decisions] = False
+            dones[decisions:] = True
+
+            if resetting:
+                obs_dict[behavior_name] = obs
+                continue
+            if self.normalize_rewards:
+                rewards[:] = self._normalize_reward(rewards)
+            if self.reward_scale != 1.0:
+                rewards *= self.reward_scale
 
-        # Avoid division by zero
-        self.obs_std = np.maximum(self.obs_std, 1e-8)
+            obs_dict[behavior_name] = obs
+            reward_dict[behavior_name] = rewards
+            done_dict[behavior_name] = dones
+            info_dict[behavior_name] = {"episode_end": True} if decisions == 0 else {}
 
-        # Normalize
-        normalized = (obs - self.obs_mean) / self.obs_std
-        return normalized
+        return self._results
+
+    def _normalize_observation(
+        self,
+        behavior_name: str,
+        obs: np.ndarray,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Update the behavior's running statistics with a batch of observations, then normalize it"""
+        stats = self.obs_stats.get(behavior_name)
+        if stats is None:
+            stats = RunningMeanStd(self.get_observation_space_size(behavior_name))
+            stats.freeze(self.obs_stats_frozen)
+            self.obs_stats[behavior_name] = stats
+        return stats(obs, out=out)
+
+    def freeze_observation_stats(self, frozen: bool = True):
+        """Keep normalizing with the current statistics without updating them (evaluation)"""
+        self.obs_stats_frozen = frozen
+        for stats in self.obs_stats.values():
+            stats.freeze(frozen)
+
+    def observation_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Picklable observation statistics per behavior"""
+        return {behavior_name: stats.state() for behavior_name, stats in self.obs_stats.items()}
+
+    def load_observation_stats(self, states: Dict[str, Dict[str, Any]]):
+        """Replace observation statistics, e.g. with ones saved at training time or pooled across workers"""
+        for behavior_name, state in states.items():
+            stats = self.obs_stats.get(behavior_name)
+            if stats is None:
+                stats = RunningMeanStd.from_state(state)
+                stats.freeze(self.obs_stats_frozen)
+                self.obs_stats[behavior_name] = stats
+            else:
+                stats.load_state(state)
 
     def _normalize_reward(self, reward: np.ndarray) -> np.ndarray:
         """Normalize reward using running statistics"""
@@ -158,12 +274,12 @@ class GameWrapper:
         self.env.close()
 
     def get_action_space_size(self, behavior_name: str) -> int:
-        """Get action space size for behavior"""
-        spec = self.env.get_behavior_spec(behavior_name)
-        return spec.action_size
+        """Get action space size for behavior (continuous actions plus discrete branches)"""
+        action_spec = self.env.behavior_specs[behavior_name].action_spec
+        return action_spec.continuous_size + len(action_spec.discrete_branches)
 
     def get_observation_space_size(self, behavior_name: str) -> int:
         """Get observation space size for behavior"""
-        spec = self.env.get_behavior_spec(behavior_name)
+        spec = self.env.behavior_specs[behavior_name]
         return spec.observation_specs[0].shape[0] if spec.observation_specs else 0
 
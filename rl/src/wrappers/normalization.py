@@ -0,0 +1,180 @@
+"""Running per-feature mean and variance for observation normalization
+
+Statistics count samples, not calls: each batch of rows is reduced to its
+own mean and sum of squared deviations and merged into the running totals
+with Chan et al.'s parallel update, which is exact for any batch sizes.
+All arithmetic writes into buffers allocated up front (the row buffers
+grow only when a larger batch arrives), so steady-state updates and
+``normalize(..., out=...)`` allocate nothing. Per-feature vectors are
+tiled into a row buffer before being applied: ufuncs broadcasting a
+vector over rows allocate iteration buffers on every call, while
+same-shape ufuncs and ``np.copyto`` do not.
+
+Statistics from different processes combine with ``merge``; ``subtract``
+undoes a merge, which lets VecGameWrapper pool what each worker has seen
+since the last sync without counting the shared part twice.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class RunningMeanStd:
+    """
+    Per-feature running mean and variance of observation rows.
+
+    Args:
+        size: Features per observation row
+        epsilon: Added to the variance before taking the square root
+        clip: Clip normalized values to [-clip, clip] when set
+    """
+
+    def __init__(self, size: int, epsilon: float = 1e-8, clip: Optional[float] = None):
+        self.size = size
+        self.epsilon = epsilon
+        self.clip = clip
+        self.frozen = False
+
+        self.count = 0
+        self.mean = np.zeros(size, dtype=np.float64)
+        # Sum of squared deviations from the mean (M2); variance is m2 / count
+        self.m2 = np.zeros(size, dtype=np.float64)
+        # 1 / sqrt(variance + epsilon), kept current so normalizing is a subtract and a multiply
+        self.inv_std = np.ones(size, dtype=np.float64)
+
+        self._batch_mean = np.zeros(size, dtype=np.float64)
+        self._batch_m2 = np.zeros(size, dtype=np.float64)
+        self._delta = np.zeros(size, dtype=np.float64)
+        # Row buffers: a float64 copy of the batch, and a per-feature vector tiled over its rows
+        self._scratch = np.zeros((0, size), dtype=np.float64)
+        self._tiled = np.zeros((0, size), dtype=np.float64)
+
+    @property
+    def var(self) -> np.ndarray:
+        return self.m2 / self.count if self.count else np.ones(self.size)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var + self.epsilon)
+
+    def freeze(self, frozen: bool = True):
+        """Stop (or resume) updating, e.g. to evaluate with the training statistics"""
+        self.frozen = frozen
+
+    def update(self, batch: np.ndarray):
+        """Merge a (rows, size) batch into the statistics; a no-op while frozen"""
+        rows = len(batch)
+        if self.frozen or rows == 0:
+            return
+        scratch, tiled = self._rows(rows)
+
+        np.copyto(scratch, batch, casting="same_kind")
+        np.sum(scratch, axis=0, out=self._batch_mean)
+        self._batch_mean /= rows
+        np.copyto(tiled, self._batch_mean)
+        np.subtract(scratch, tiled, out=scratch)
+        np.square(scratch, out=scratch)
+        np.sum(scratch, axis=0, out=self._batch_m2)
+        self._merge(rows, self._batch_mean, self._batch_m2)
+
+    def _rows(self, rows: int):
+        if len(self._scratch) < rows:
+            self._scratch = np.zeros((rows, self.size), dtype=np.float64)
+            self._tiled = np.zeros((rows, self.size), dtype=np.float64)
+        return self._scratch[:rows], self._tiled[:rows]
+
+    def _merge(self, count: int, mean: np.ndarray, m2: np.ndarray):
+        """Chan's parallel update with another set of (count, mean, m2)"""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = np.subtract(mean, self.mean, out=self._delta)
+        # mean += delta * n_b / n
+        delta *= count / total
+        self.mean += delta
+        # m2 += m2_b + delta^2 * n_a * n_b / n, from the scaled delta: (delta * n_b / n)^2 * n_a * n / n_b
+        np.square(delta, out=delta)
+        delta *= self.count * total / count
+        self.m2 += m2
+        self.m2 += delta
+        self.count = total
+        self._refresh()
+
+    def _refresh(self):
+        if self.count:
+            np.divide(self.m2, self.count, out=self.inv_std)
+            self.inv_std += self.epsilon
+            np.sqrt(self.inv_std, out=self.inv_std)
+            np.reciprocal(self.inv_std, out=self.inv_std)
+        else:
+            self.inv_std.fill(1.0)
+
+    def normalize(self, obs: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """(obs - mean) / std, written into ``out`` when given (may be ``obs`` itself)"""
+        if out is None:
+            out = np.empty(obs.shape, dtype=np.float32)
+        scratch, tiled = self._rows(len(obs))
+        np.copyto(scratch, obs, casting="same_kind")
+        np.copyto(tiled, self.mean)
+        np.subtract(scratch, tiled, out=scratch)
+        np.copyto(tiled, self.inv_std)
+        np.multiply(scratch, tiled, out=scratch)
+        if self.clip is not None:
+            np.clip(scratch, -self.clip, self.clip, out=scratch)
+        np.copyto(out, scratch, casting="same_kind")
+        return out
+
+    def __call__(self, obs: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Update with ``obs`` (unless frozen), then normalize it"""
+        self.update(obs)
+        return self.normalize(obs, out=out)
+
+    def merge(self, other: "RunningMeanStd"):
+        """Add the samples ``other`` has seen, e.g. another worker's"""
+        self._merge(other.count, other.mean, other.m2)
+
+    def subtract(self, other: "RunningMeanStd"):
+        """Remove the samples of ``other``, which must have been merged into these statistics"""
+        count = self.count - other.count
+        if count < 0:
+            raise ValueError("Cannot subtract statistics of more samples than were merged")
+        if count == 0:
+            self.reset()
+            return
+        # Invert Chan's update: solve the merged mean and m2 for the remaining part
+        mean = (self.count * self.mean - other.count * other.mean) / count
+        delta = other.mean - mean
+        m2 = self.m2 - other.m2 - np.square(delta) * (other.count * count / self.count)
+        self.count = count
+        self.mean[:] = mean
+        # Rounding can leave tiny negatives where a feature is constant
+        np.maximum(m2, 0.0, out=self.m2)
+        self._refresh()
+
+    def reset(self):
+        self.count = 0
+        self.mean.fill(0.0)
+        self.m2.fill(0.0)
+        self._refresh()
+
+    def copy(self) -> "RunningMeanStd":
+        stats = RunningMeanStd(self.size, self.epsilon, self.clip)
+        stats.load_state(self.state())
+        return stats
+
+    def state(self) -> Dict[str, Any]:
+        """Picklable snapshot of the statistics"""
+        return {"count": self.count, "mean": self.mean.copy(), "m2": self.m2.copy()}
+
+    def load_state(self, state: Dict[str, Any]):
+        self.count = int(state["count"])
+        self.mean[:] = state["mean"]
+        self.m2[:] = state["m2"]
+        self._refresh()
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], epsilon: float = 1e-8, clip: Optional[float] = None) -> "RunningMeanStd":
+        stats = cls(len(state["mean"]), epsilon, clip)
+        stats.load_state(state)
+        return stats
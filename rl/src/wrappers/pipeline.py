@@ -0,0 +1,166 @@
+"""Pipelined stepping: overlap policy inference with environment simulation
+
+A plain loop alternates: send actions, wait while the environments
+simulate, run the policy while they sit idle. PipelinedStepper splits the
+environments of a VecGameWrapper into groups and keeps them out of phase:
+while one group simulates, the policy runs on the observations another
+group just returned, so neither side waits on the other for long.
+
+With ``staleness`` > 0 a group is sent actions computed from observations
+up to that many of its own steps old, so its next actions are inferred
+while it simulates and a single group overlaps too. Stale actions only
+fit while each environment keeps the same number of deciding agents (the
+game respawns agents, so it does); when a count changes, that step falls
+back to fresh inference and ``stale_fallbacks`` counts it.
+
+The policy takes per-behavior observation rows (as returned by
+VecGameWrapper) and returns actions row-aligned with them, arrays or
+ActionTuples; rows of agents that are done get no action.
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .vec_env import VecGameWrapper
+
+# Per-behavior observation rows -> per-behavior actions, row-aligned with the observations
+Policy = Callable[[Dict[str, np.ndarray]], Dict[str, Any]]
+
+# on_step(group, actions sent to each of its environments, step_wait result)
+StepCallback = Callable[[int, List[Dict[str, Any]], tuple], None]
+
+
+def _take(action: Any, mask: np.ndarray) -> Any:
+    if hasattr(action, "continuous") and hasattr(action, "discrete"):
+        return type(action)(
+            continuous=None if action.continuous is None else action.continuous[mask],
+            discrete=None if action.discrete is None else action.discrete[mask],
+        )
+    return np.asarray(action)[mask]
+
+
+def decision_counts(infos: Dict[str, Any], dones: Dict[str, np.ndarray], num_envs: int) -> Dict[str, np.ndarray]:
+    """Deciding agents (rows not done) per environment, per behavior"""
+    counts = {}
+    for behavior_name, info in infos.items():
+        rows = info["env_index"]
+        live = ~dones[behavior_name] if behavior_name in dones else np.ones(len(rows), dtype=bool)
+        counts[behavior_name] = np.bincount(rows[live], minlength=num_envs)
+    return counts
+
+
+def split_rows(
+    actions: Dict[str, Any],
+    infos: Dict[str, Any],
+    dones: Dict[str, np.ndarray],
+    num_envs: int,
+) -> List[Dict[str, Any]]:
+    """Per-environment action dicts from row-aligned actions, keeping each environment's deciding rows"""
+    per_env: List[Dict[str, Any]] = [{} for _ in range(num_envs)]
+    for behavior_name, action in actions.items():
+        rows = infos[behavior_name]["env_index"]
+        live = ~dones[behavior_name] if behavior_name in dones else np.ones(len(rows), dtype=bool)
+        for index in range(num_envs):
+            per_env[index][behavior_name] = _take(action, (rows == index) & live)
+    return per_env
+
+
+class PipelinedStepper:
+    """
+    Steps groups of a VecGameWrapper's environments out of phase with policy inference.
+
+    Args:
+        vec_env: Environments to step; they are reset by run()
+        policy: Row-aligned actions for a group's observations
+        num_groups: Groups the environments are split into (1 disables the overlap across groups)
+        staleness: Steps old a group's observations may be when its actions are computed from them
+    """
+
+    def __init__(self, vec_env: VecGameWrapper, policy: Policy, num_groups: int = 2, staleness: int = 0):
+        if not 1 <= num_groups <= vec_env.num_envs:
+            raise ValueError(f"num_groups must be between 1 and num_envs ({vec_env.num_envs})")
+        if staleness < 0:
+            raise ValueError("staleness must be at least 0")
+        self.vec_env = vec_env
+        self.policy = policy
+        self.staleness = staleness
+        self.groups = [list(group) for group in np.array_split(np.arange(vec_env.num_envs), num_groups)]
+
+        self.policy_seconds = 0.0
+        self.stale_fallbacks = 0
+
+    def _infer(self, group: int, obs: Dict[str, np.ndarray], dones: Dict[str, np.ndarray], infos: Dict[str, Any]):
+        """Split actions for a group's results, with the decision counts they were computed for"""
+        started = time.perf_counter()
+        actions = self.policy(obs)
+        self.policy_seconds += time.perf_counter() - started
+        size = len(self.groups[group])
+        return split_rows(actions, infos, dones, size), decision_counts(infos, dones, size)
+
+    def run(self, steps: int, on_step: Optional[StepCallback] = None) -> Dict[str, float]:
+        """
+        Reset the environments and step every one of them ``steps`` times.
+
+        Returns: Throughput and utilization; ``policy_utilization`` and ``env_utilization``
+            are the fractions of the wall time the policy and the average environment were busy
+        """
+        vec_env = self.vec_env
+        self.policy_seconds = 0.0
+        self.stale_fallbacks = 0
+        wait_seconds = 0.0
+        busy_before = sum(vec_env.busy_seconds())
+        started = time.perf_counter()
+
+        sent: List[List[Dict[str, Any]]] = []
+        queues: List[Deque[Tuple[List[Dict[str, Any]], Dict[str, np.ndarray]]]] = []
+        for group, indices in enumerate(self.groups):
+            obs, infos = vec_env.reset(indices, return_info=True)
+            first = self._infer(group, obs, {}, infos)
+            queues.append(deque([first] * self.staleness))
+            vec_env.step_async(first[0], indices)
+            sent.append(first[0])
+
+        for step in range(1, steps + 1):
+            for group, indices in enumerate(self.groups):
+                waited = time.perf_counter()
+                result = vec_env.step_wait(indices)
+                wait_seconds += time.perf_counter() - waited
+                if on_step is not None:
+                    on_step(group, sent[group], result)
+                if step == steps:
+                    continue
+
+                obs, _, dones, infos = result
+                fresh = None
+                if self.staleness == 0:
+                    actions, _ = self._infer(group, obs, dones, infos)
+                else:
+                    actions, counts = queues[group].popleft()
+                    current = decision_counts(infos, dones, len(indices))
+                    if current.keys() != counts.keys() or any(
+                        not np.array_equal(current[name], counts[name]) for name in current
+                    ):
+                        self.stale_fallbacks += 1
+                        fresh = self._infer(group, obs, dones, infos)
+                        actions = fresh[0]
+                vec_env.step_async(actions, indices)
+                sent[group] = actions
+                if self.staleness:
+                    # Inferred while this group simulates the step just sent, unless the fallback already did
+                    queues[group].append(fresh or self._infer(group, obs, dones, infos))
+
+        wall = time.perf_counter() - started
+        env_busy = (sum(vec_env.busy_seconds()) - busy_before) / vec_env.num_envs
+        return {
+            "env_steps": steps * vec_env.num_envs,
+            "seconds": wall,
+            "steps_per_second": steps * vec_env.num_envs / wall,
+            "policy_seconds": self.policy_seconds,
+            "wait_seconds": wait_seconds,
+            "policy_utilization": self.policy_seconds / wall,
+            "env_utilization": env_busy / wall,
+            "stale_fallbacks": self.stale_fallbacks,
+        }
@@ -0,0 +1,383 @@
+"""Vectorized GameWrapper running N environments in subprocesses
+
+Each environment gets its own process, its own ``worker_id`` and its own
+GameWrapper, so N Unity builds (or any local ``BaseEnv``) simulate in
+parallel. ``step()`` sends every environment its actions before waiting
+for any of them, then returns one array per behavior with the rows of all
+environments concatenated in environment order; ``infos[behavior]
+["env_index"]`` maps each row back to its environment. ``step_async`` and
+``step_wait`` also take a subset of environment indices, so groups of
+environments can be in flight independently (see ``pipeline.py``).
+"""
+
+import multiprocessing
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .normalization import RunningMeanStd
+
+# Builds the environment for one worker from its index (0..num_envs-1)
+EnvFactory = Callable[[int], Any]
+
+# Per-environment action dicts, or one dict whose values have a leading num_envs axis
+VecActions = Union[Sequence[Dict[str, Any]], Dict[str, Any]]
+
+
+class EnvWorkerError(RuntimeError):
+    """Raised when an environment process fails; carries the worker's traceback"""
+
+
+class UnityEnvFactory:
+    """
+    Picklable factory for Unity builds, one ``worker_id`` (and port) per environment.
+
+    Args:
+        file_name: Path to the Unity executable (None connects to the Editor, which allows one env)
+        base_worker_id: worker_id of the first environment; the i-th uses base_worker_id + i
+        seed: Seed of the first environment; the i-th uses seed + i
+        no_graphics: Run builds without rendering
+        time_scale: Engine time scale set through the configuration side channel
+        additional_args: Extra command-line arguments for the build
+    """
+
+    def __init__(
+        self,
+        file_name: Optional[str],
+        base_worker_id: int = 0,
+        seed: int = 42,
+        no_graphics: bool = True,
+        time_scale: Optional[float] = None,
+        additional_args: Optional[List[str]] = None,
+    ):
+        self.file_name = file_name
+        self.base_worker_id = base_worker_id
+        self.seed = seed
+        self.no_graphics = no_graphics
+        self.time_scale = time_scale
+        self.additional_args = additional_args
+
+    def __call__(self, index: int):
+        from mlagents_envs.environment import UnityEnvironment
+        from mlagents_envs.side_channel.engine_configuration_channel import EngineConfigurationChannel
+
+        side_channels = []
+        if self.time_scale is not None:
+            channel = EngineConfigurationChannel()
+            channel.set_configuration_parameters(time_scale=self.time_scale)
+            side_channels.append(channel)
+
+        return UnityEnvironment(
+            file_name=self.file_name,
+            worker_id=self.base_worker_id + index,
+            seed=self.seed + index,
+            no_graphics=self.no_graphics,
+            side_channels=side_channels,
+            additional_args=self.additional_args,
+        )
+
+
+def _worker(remote, parent_remote, env_fn: EnvFactory, index: int, wrapper_kwargs: Dict[str, Any]):
+    """Environment process: build a GameWrapper and serve commands until told to close"""
+    from .game_wrapper import GameWrapper
+
+    parent_remote.close()
+    wrapper = None
+    # Seconds spent inside wrapper.step, for utilization reporting
+    busy_seconds = 0.0
+    try:
+        wrapper = GameWrapper(env_fn(index), **wrapper_kwargs)
+        while True:
+            command, data = remote.recv()
+            if command == "step":
+                started = time.perf_counter()
+                result = wrapper.step(data)
+                busy_seconds += time.perf_counter() - started
+                remote.send(("ok", result))
+            elif command == "busy":
+                remote.send(("ok", busy_seconds))
+            elif command == "reset":
+                remote.send(("ok", wrapper.reset()))
+            elif command == "call":
+                target, name, args = data
+                obj = wrapper.env if target == "env" else wrapper
+                result = getattr(obj, name)
+                remote.send(("ok", result(*args) if callable(result) else result))
+            elif command == "close":
+                break
+            else:
+                raise ValueError(f"Unknown command: {command}")
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        try:
+            remote.send(("error", traceback.format_exc()))
+        except (BrokenPipeError, EOFError):
+            pass
+    finally:
+        if wrapper is not None:
+            wrapper.close()
+        remote.close()
+
+
+def _split_actions(actions: VecActions, num_envs: int) -> List[Dict[str, Any]]:
+    """Per-environment action dicts from either accepted layout"""
+    if not isinstance(actions, dict):
+        if len(actions) != num_envs:
+            raise ValueError(f"Expected actions for {num_envs} environments, got {len(actions)}")
+        return list(actions)
+
+    per_env: List[Dict[str, Any]] = [{} for _ in range(num_envs)]
+    for behavior_name, action in actions.items():
+        for index in range(num_envs):
+            if hasattr(action, "continuous") and hasattr(action, "discrete"):
+                # ActionTuple: split both parts, keep the type
+                per_env[index][behavior_name] = type(action)(
+                    continuous=None if action.continuous is None else action.continuous[index],
+                    discrete=None if action.discrete is None else action.discrete[index],
+                )
+            else:
+                per_env[index][behavior_name] = action[index]
+    return per_env
+
+
+class VecGameWrapper:
+    """
+    N GameWrappers stepped in parallel, one subprocess each.
+
+    Args:
+        env_fn: Picklable ``index -> BaseEnv`` (e.g. UnityEnvFactory); each index is one environment
+        num_envs: Environments to run
+        start_method: Multiprocessing start method; "spawn" is safe with Unity and threads
+        **wrapper_kwargs: Passed to every GameWrapper (normalize_observations, reward_scale, ...)
+    """
+
+    def __init__(
+        self,
+        env_fn: EnvFactory,
+        num_envs: int,
+        start_method: str = "spawn",
+        **wrapper_kwargs,
+    ):
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+        self.num_envs = num_envs
+        # Observation statistics as of the last sync, shared by every environment
+        self.obs_stats: Dict[str, RunningMeanStd] = {}
+        # Indices of environments stepped with step_async and not yet collected, in send order
+        self.pending: List[int] = []
+        self.closed = False
+
+        context = multiprocessing.get_context(start_method)
+        pipes = [context.Pipe() for _ in range(num_envs)]
+        self.remotes = [parent for parent, _ in pipes]
+        self.processes = []
+        for index, (remote, work_remote) in enumerate(pipes):
+            process = context.Process(
+                target=_worker,
+                args=(work_remote, remote, env_fn, index, wrapper_kwargs),
+                daemon=True,
+            )
+            process.start()
+            work_remote.close()
+            self.processes.append(process)
+
+    @property
+    def waiting(self) -> bool:
+        return bool(self.pending)
+
+    def _receive(self, indices: Optional[Sequence[int]] = None) -> List[Any]:
+        results = []
+        for index in range(self.num_envs) if indices is None else indices:
+            try:
+                status, payload = self.remotes[index].recv()
+            except EOFError:
+                raise EnvWorkerError(f"Environment {index} exited unexpectedly")
+            if status == "error":
+                raise EnvWorkerError(f"Environment {index} failed:\n{payload}")
+            results.append(payload)
+        return results
+
+    def reset(self, indices: Optional[Sequence[int]] = None, return_info: bool = False):
+        """
+        Reset environments; observations of all of them per behavior.
+
+        Args:
+            indices: Environments to reset, rows in this order; all of them by default
+            return_info: Also return step_wait-style infos (``env_index`` per behavior)
+        """
+        indices = list(range(self.num_envs)) if indices is None else list(indices)
+        if set(indices).intersection(self.pending):
+            raise RuntimeError("Cannot reset an environment while a step is pending")
+        for index in indices:
+            self.remotes[index].send(("reset", None))
+        results = self._receive(indices)
+        obs, env_index = _concatenate(results)
+        if not return_info:
+            return obs
+        infos = {
+            behavior_name: {"env_index": rows, "env_infos": [{} for _ in indices]}
+            for behavior_name, rows in env_index.items()
+        }
+        return obs, infos
+
+    def step_async(self, actions: VecActions, indices: Optional[Sequence[int]] = None):
+        """
+        Send actions to environments without waiting for the results.
+
+        Args:
+            actions: As for step(), for the environments in ``indices``
+            indices: Environments to step; all of them by default
+        """
+        indices = list(range(self.num_envs)) if indices is None else list(indices)
+        busy = set(indices).intersection(self.pending)
+        if busy:
+            raise RuntimeError(f"step_async called twice without step_wait for environments {sorted(busy)}")
+        for index, env_actions in zip(indices, _split_actions(actions, len(indices))):
+            self.remotes[index].send(("step", env_actions))
+        self.pending.extend(indices)
+
+    def step_wait(
+        self,
+        indices: Optional[Sequence[int]] = None,
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, Any]]:
+        """
+        Results of step_async: (observations, rewards, dones, infos) per behavior.
+
+        Args:
+            indices: Environments to collect, rows in this order; all pending ones by default.
+                ``env_index`` in the infos counts positions in ``indices``
+        """
+        indices = list(self.pending) if indices is None else list(indices)
+        missing = set(indices).difference(self.pending)
+        if missing:
+            raise RuntimeError(f"step_wait for environments that were not stepped: {sorted(missing)}")
+        for index in indices:
+            self.pending.remove(index)
+        results = self._receive(indices)
+
+        obs, env_index = _concatenate([result[0] for result in results])
+        rewards, _ = _concatenate([result[1] for result in results])
+        dones, _ = _concatenate([result[2] for result in results])
+        infos = {
+            behavior_name: {
+                "env_index": rows,
+                "env_infos": [result[3].get(behavior_name, {}) for result in results],
+            }
+            for behavior_name, rows in env_index.items()
+        }
+        return obs, rewards, dones, infos
+
+    def step(self, actions: VecActions) -> tuple:
+        """
+        Step every environment with its actions.
+
+        Args:
+            actions: One GameWrapper-style action dict per environment, or one dict whose
+                values (arrays or ActionTuples) have a leading num_envs axis
+
+        Returns: (observations, rewards, dones, infos), each keyed by behavior name
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def env_call(self, name: str, *args, index: int = 0) -> Any:
+        """Call (or read) ``name`` on one environment's BaseEnv, e.g. ``env_call("behavior_specs")``"""
+        return self._call("env", name, args, index)
+
+    def wrapper_call(self, name: str, *args, index: int = 0) -> Any:
+        """Call (or read) ``name`` on one environment's GameWrapper"""
+        return self._call("wrapper", name, args, index)
+
+    def _call(self, target: str, name: str, args: tuple, index: int) -> Any:
+        if index in self.pending:
+            raise RuntimeError("Cannot call into an environment while a step is pending")
+        self.remotes[index].send(("call", (target, name, args)))
+        return self._receive([index])[0]
+
+    def busy_seconds(self) -> List[float]:
+        """Seconds each environment has spent stepping, for utilization"""
+        if self.pending:
+            raise RuntimeError("Cannot read busy time while a step is pending")
+        for remote in self.remotes:
+            remote.send(("busy", None))
+        return self._receive()
+
+    def get_observation_space_size(self, behavior_name: str) -> int:
+        return self.wrapper_call("get_observation_space_size", behavior_name)
+
+    def get_action_space_size(self, behavior_name: str) -> int:
+        return self.wrapper_call("get_action_space_size", behavior_name)
+
+    def sync_observation_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Pool the observation statistics of every environment and load the result into all of them.
+
+        Each environment's statistics are the last pooled ones plus what it has seen since, so
+        the pooled part is subtracted before merging and no sample is counted twice.
+
+        Returns: The pooled statistics per behavior (GameWrapper.observation_stats format)
+        """
+        states = [self.wrapper_call("observation_stats", index=index) for index in range(self.num_envs)]
+        pooled: Dict[str, RunningMeanStd] = {}
+        for env_states in states:
+            for behavior_name, state in env_states.items():
+                base = self.obs_stats.get(behavior_name)
+                if behavior_name not in pooled:
+                    pooled[behavior_name] = base.copy() if base is not None else RunningMeanStd(len(state["mean"]))
+                local = RunningMeanStd.from_state(state)
+                if base is not None:
+                    local.subtract(base)
+                pooled[behavior_name].merge(local)
+
+        self.obs_stats.update(pooled)
+        pooled_states = {behavior_name: stats.state() for behavior_name, stats in self.obs_stats.items()}
+        for index in range(self.num_envs):
+            self.wrapper_call("load_observation_stats", pooled_states, index=index)
+        return pooled_states
+
+    def freeze_observation_stats(self, frozen: bool = True):
+        """Freeze (or unfreeze) observation statistics in every environment"""
+        for index in range(self.num_envs):
+            self.wrapper_call("freeze_observation_stats", frozen, index=index)
+
+    def close(self):
+        """Stop every environment process"""
+        if self.closed:
+            return
+        if self.pending:
+            try:
+                self._receive(self.pending)
+            except EnvWorkerError:
+                pass
+            self.pending = []
+        for remote in self.remotes:
+            try:
+                remote.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for remote in self.remotes:
+            remote.close()
+        self.closed = True
+
+
+def _concatenate(results: List[Dict[str, np.ndarray]]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """Per-behavior arrays of all environments joined along the agent axis, and each row's environment"""
+    behavior_names: List[str] = []
+    for result in results:
+        behavior_names.extend(name for name in result if name not in behavior_names)
+
+    joined = {}
+    env_index = {}
+    for behavior_name in behavior_names:
+        parts = [np.asarray(result[behavior_name]) for result in results if behavior_name in result]
+        counts = [len(result[behavior_name]) if behavior_name in result else 0 for result in results]
+        joined[behavior_name] = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        env_index[behavior_name] = np.repeat(np.arange(len(results)), counts)
+    return joined, env_index
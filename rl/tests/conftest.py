@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import the package as `src`, like the scripts and benchmarks do
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,171 @@
+"""Headless arena rules and BaseEnv behaviour"""
+
+import numpy as np
+import pytest
+from mlagents_envs.base_env import ActionTuple
+
+from src.envs.arena import (
+    ACTION_ATTACK,
+    ACTION_INTERACT,
+    BEHAVIORS,
+    IONIA,
+    NOXUS,
+    OBSERVATION_SIZE,
+    REWARD_DEATH,
+    REWARD_LOSS,
+    REWARD_WIN,
+    ArenaEnv,
+    ArenaEnvFactory,
+)
+from src.wrappers.game_wrapper import GameWrapper
+
+NOXUS_AGENT, IONIA_AGENT = BEHAVIORS
+
+
+def test_specs_and_step_layout():
+    env = ArenaEnv(num_arenas=3)
+    env.reset()
+
+    assert env.get_behavior_names() == list(BEHAVIORS)
+    spec = env.behavior_specs[NOXUS_AGENT]
+    assert spec.observation_specs[0].shape == (OBSERVATION_SIZE,)
+    assert spec.action_spec.continuous_size == 3
+    assert spec.action_spec.discrete_branches == (6, 1)
+
+    noxus, _ = env.get_steps(NOXUS_AGENT)
+    ionia, terminal = env.get_steps(IONIA_AGENT)
+    assert noxus.obs[0].shape == (6, OBSERVATION_SIZE)
+    assert len(terminal) == 0
+    np.testing.assert_array_equal(noxus.agent_id, [0, 1, 4, 5, 8, 9])
+    np.testing.assert_array_equal(ionia.agent_id, [2, 3, 6, 7, 10, 11])
+    # Team flag, and time remaining of a 30 s episode normalized by 300 s
+    np.testing.assert_array_equal(noxus.obs[0][:, 2], 1.0)
+    np.testing.assert_array_equal(ionia.obs[0][:, 2], 0.0)
+    np.testing.assert_allclose(noxus.obs[0][:, 32], 0.1)
+
+
+def test_timeout_ends_every_arena_with_an_ionia_win():
+    env = ArenaEnv(num_arenas=2, episode_max_time=1.0)
+    env.reset()
+    for step in range(20):
+        env.step()
+        noxus, noxus_terminal = env.get_steps(NOXUS_AGENT)
+        _, ionia_terminal = env.get_steps(IONIA_AGENT)
+        if len(noxus_terminal):
+            break
+    assert step in (9, 10)
+
+    np.testing.assert_allclose(noxus_terminal.reward, REWARD_LOSS, atol=0.01)
+    np.testing.assert_allclose(ionia_terminal.reward, REWARD_WIN, atol=0.01)
+    assert not noxus_terminal.interrupted.any()
+    np.testing.assert_array_equal(np.sort(noxus_terminal.agent_id), noxus.agent_id)
+    np.testing.assert_array_equal(env.wins, [0, 2])
+    # The arenas restarted: fresh clocks and no rewards yet
+    np.testing.assert_allclose(noxus.obs[0][:, 32], 1.0 / 300)
+    np.testing.assert_array_equal(noxus.reward, 0.0)
+
+
+def attack_setup(ionia_health):
+    """One arena, each Ionia agent next to a Noxus agent, past the win check delay and cooldowns"""
+    env = ArenaEnv(num_arenas=1)
+    env.reset()
+    env.time[:] = 1.0
+    env.since_attack[:] = 1.0
+    env.position[0, 2:] = env.position[0, :2] + [0.5, 0.0]
+    env.health[0, 2:] = ionia_health
+    env.set_actions(
+        NOXUS_AGENT,
+        ActionTuple(continuous=np.zeros((2, 3), np.float32), discrete=np.array([[ACTION_ATTACK, 0]] * 2, np.int32)),
+    )
+    return env
+
+
+def test_eliminating_the_enemy_team_wins():
+    env = attack_setup(ionia_health=[25, 25])
+    env.step()
+    _, noxus_terminal = env.get_steps(NOXUS_AGENT)
+    _, ionia_terminal = env.get_steps(IONIA_AGENT)
+
+    np.testing.assert_allclose(noxus_terminal.reward, REWARD_WIN, atol=0.01)
+    np.testing.assert_allclose(ionia_terminal.reward, REWARD_DEATH + REWARD_LOSS, atol=0.01)
+    np.testing.assert_array_equal(ionia_terminal.obs[0], 0.0)
+    np.testing.assert_array_equal(env.wins, [1, 0])
+
+
+def test_dead_agents_observe_zeros_until_the_episode_ends():
+    env = attack_setup(ionia_health=[25, 100])
+    env.step()
+    ionia, terminal = env.get_steps(IONIA_AGENT)
+
+    assert len(terminal) == 0
+    np.testing.assert_array_equal(ionia.obs[0][0], 0.0)
+    assert ionia.obs[0][1, 0] == pytest.approx(0.75)
+    assert ionia.reward[0] == pytest.approx(REWARD_DEATH)
+    np.testing.assert_array_equal(env.dead[0], [False, False, True, False])
+
+
+def test_attack_cooldown():
+    env = attack_setup(ionia_health=[100, 100])
+    env.step()
+    # One hit in the 5 physics steps of a decision, then the 1 s cooldown
+    np.testing.assert_array_equal(env.health[0, 2:], [75, 75])
+    env.step()
+    np.testing.assert_array_equal(env.health[0, 2:], [75, 75])
+
+
+def test_heal_zone_heals_its_own_team_only():
+    env = ArenaEnv(num_arenas=1)
+    env.reset()
+    env.health[0] = 50
+    env.position[0, 0] = [9.0, 9.0]  # Noxus in the Noxus zone
+    env.position[0, 2] = [8.0, 8.0]  # Ionia in the Noxus zone
+    env.position[0, 3] = [-9.0, -9.0]  # Ionia in the Ionia zone
+    env.step()
+    # 10 HP/s over a 0.1 s decision
+    np.testing.assert_array_equal(env.health[0], [51, 50, 50, 51])
+
+
+def test_interact_pushes_the_nearest_obstacle():
+    env = ArenaEnv(num_arenas=1)
+    env.reset()
+    env.position[0, 0] = env.obstacle_position[0, 0] + [0.0, 1.0]
+    continuous = np.array([[0.0, -1.0, 0.0], [0.0, 0.0, 0.0]], np.float32)
+    discrete = np.array([[ACTION_INTERACT, 0], [0, 0]], np.int32)
+    env.set_actions(NOXUS_AGENT, ActionTuple(continuous=continuous, discrete=discrete))
+    env.step()
+
+    velocity = env.obstacle_velocity[0, 0]
+    assert velocity[1] < 0 and velocity[0] == pytest.approx(0.0)
+    np.testing.assert_array_equal(env.obstacle_velocity[0, 1], 0.0)
+
+
+def test_movement_is_clamped_to_the_walls():
+    env = ArenaEnv(num_arenas=1)
+    env.reset()
+    env.set_actions(NOXUS_AGENT, ActionTuple(continuous=np.array([[1.0, 1.0, 0.0]] * 2, np.float32)))
+    for _ in range(60):
+        env.step()
+    np.testing.assert_allclose(env.position[0, :2], 9.0)
+    assert env.team[NOXUS] == NOXUS and env.team[-1] == IONIA
+
+
+def test_set_action_for_agent_targets_one_agent():
+    env = ArenaEnv(num_arenas=2)
+    env.reset()
+    env.set_action_for_agent(IONIA_AGENT, 7, ActionTuple(continuous=np.array([[1.0, 0.0, 0.0]], np.float32)))
+    np.testing.assert_array_equal(env.continuous_actions[1, 3], [1.0, 0.0, 0.0])
+    assert np.count_nonzero(env.continuous_actions) == 1
+
+
+def test_game_wrapper_steps_the_arena():
+    wrapper = GameWrapper(ArenaEnvFactory(num_arenas=4, spawn_jitter=0.5)(0))
+    obs = wrapper.reset()
+    assert {name: batch.shape for name, batch in obs.items()} == {name: (8, OBSERVATION_SIZE) for name in BEHAVIORS}
+    obs, rewards, dones, _ = wrapper.step({})
+    assert rewards[NOXUS_AGENT].shape == (8,)
+    assert not dones[IONIA_AGENT].any()
+
+
+def test_too_many_agents_per_team():
+    with pytest.raises(ValueError):
+        ArenaEnv(agents_per_team=3)
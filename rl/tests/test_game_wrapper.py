@@ -0,0 +1,69 @@
+"""Buffered GameWrapper stepping against the unbuffered path"""
+
+import numpy as np
+import pytest
+from mlagents_envs.base_env import ActionTuple
+
+from src.envs.arena import ACTION_SPEC, BEHAVIORS, ArenaEnv
+from src.wrappers.game_wrapper import GameWrapper
+
+ARENAS = 3
+ROWS = ARENAS * 2
+
+
+def make(buffered, **kwargs):
+    # Episodes end every 6 steps, so terminal rows come up
+    return GameWrapper(ArenaEnv(ARENAS, episode_max_time=0.6, spawn_jitter=0.5), buffered=buffered, **kwargs)
+
+
+def random_actions(rng):
+    return {
+        behavior_name: ActionTuple(
+            continuous=rng.uniform(-1, 1, (ROWS, ACTION_SPEC.continuous_size)).astype(np.float32),
+            discrete=np.zeros((ROWS, 2), dtype=np.int32),
+        )
+        for behavior_name in BEHAVIORS
+    }
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"normalize_observations": False}, {"normalize_rewards": True, "reward_scale": 0.5}],
+)
+def test_buffered_matches_unbuffered(kwargs):
+    plain, buffered = make(False, **kwargs), make(True, **kwargs)
+    rng = np.random.default_rng(0)
+
+    expected, result = plain.reset(), buffered.reset()
+    assert result.keys() == expected.keys()
+    for behavior_name, obs in expected.items():
+        np.testing.assert_allclose(result[behavior_name], obs, rtol=1e-6, atol=1e-6)
+
+    terminal_steps = 0
+    for _ in range(14):
+        actions = random_actions(rng)
+        expected = plain.step(actions)
+        result = buffered.step(actions)
+        for position in range(3):
+            assert result[position].keys() == expected[position].keys()
+            for behavior_name, values in expected[position].items():
+                np.testing.assert_allclose(result[position][behavior_name], values, rtol=1e-6, atol=1e-6)
+        terminal_steps += bool(expected[2][BEHAVIORS[0]].any())
+    assert terminal_steps == 2
+
+
+def test_buffered_reset_leaves_reward_statistics_alone():
+    wrapper = make(True, normalize_rewards=True)
+    wrapper.reset()
+    assert wrapper.reward_count == 0
+
+
+def test_buffered_results_are_reused_views():
+    wrapper = make(True, max_agents=2 * ROWS)
+    wrapper.reset()
+    rng = np.random.default_rng(1)
+    first = wrapper.step(random_actions(rng))[0][BEHAVIORS[0]]
+    second = wrapper.step(random_actions(rng))[0][BEHAVIORS[0]]
+
+    assert np.shares_memory(first, second)
+    assert wrapper.step_buffers[BEHAVIORS[0]].capacity == 2 * ROWS
@@ -0,0 +1,120 @@
+"""RunningMeanStd against NumPy over the concatenated data"""
+
+import numpy as np
+import pytest
+
+from src.wrappers.normalization import RunningMeanStd
+
+SIZE = 5
+BATCH_SIZES = (1, 7, 130, 3, 64)
+
+
+def batches(sizes, seed=0):
+    rng = np.random.default_rng(seed)
+    # Offset and scale per feature so a wrong merge cannot hide behind zero means
+    loc, scale = [0.0, 5.0, -3.0, 100.0, 1e-3], [1.0, 0.1, 10.0, 2.0, 1e-4]
+    return [rng.normal(loc=loc, scale=scale, size=(n, SIZE)) for n in sizes]
+
+
+def fed(data):
+    stats = RunningMeanStd(SIZE)
+    for batch in data:
+        stats.update(batch)
+    return stats
+
+
+def assert_matches(stats, data):
+    rows = np.concatenate(data).astype(np.float64)
+    assert stats.count == len(rows)
+    np.testing.assert_allclose(stats.mean, rows.mean(axis=0), rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(stats.var, rows.var(axis=0), rtol=1e-9, atol=1e-15)
+
+
+def test_update_matches_numpy_for_uneven_batches():
+    data = batches(BATCH_SIZES)
+    assert_matches(fed(data), data)
+
+
+def test_update_accepts_float32_rows():
+    data = [batch.astype(np.float32) for batch in batches(BATCH_SIZES)]
+    assert_matches(fed(data), data)
+
+
+def test_merge_matches_concatenated_data():
+    left, right = batches((3, 50, 1)), batches((17, 2), seed=1)
+    stats = fed(left)
+    stats.merge(fed(right))
+    assert_matches(stats, left + right)
+
+
+def test_merge_into_empty_and_of_empty():
+    data = batches((9, 4))
+    empty = RunningMeanStd(SIZE)
+    empty.merge(fed(data))
+    assert_matches(empty, data)
+
+    stats = fed(data)
+    stats.merge(RunningMeanStd(SIZE))
+    assert_matches(stats, data)
+
+
+def test_subtract_undoes_merge():
+    base, extra = batches((40, 3, 11)), batches((1, 25), seed=2)
+    stats = fed(base)
+    stats.merge(fed(extra))
+    stats.subtract(fed(extra))
+    assert_matches(stats, base)
+
+
+def test_subtract_everything_resets():
+    data = batches((6, 2))
+    stats = fed(data)
+    stats.subtract(fed(data))
+    assert stats.count == 0
+    np.testing.assert_array_equal(stats.mean, 0.0)
+    np.testing.assert_array_equal(stats.inv_std, 1.0)
+
+
+def test_subtract_more_than_merged_raises():
+    with pytest.raises(ValueError):
+        fed(batches((2,))).subtract(fed(batches((3,))))
+
+
+def test_normalize_in_place():
+    data = batches(BATCH_SIZES)
+    stats = fed(data)
+    obs = data[2].astype(np.float32)
+    expected = (obs - stats.mean) / np.sqrt(stats.var + stats.epsilon)
+
+    result = stats.normalize(obs, out=obs)
+
+    assert result is obs
+    assert obs.dtype == np.float32
+    np.testing.assert_allclose(obs, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_normalize_clips_and_leaves_input_alone_without_out():
+    stats = RunningMeanStd(SIZE, clip=1.0)
+    stats.update(batches((100,))[0])
+    obs = np.full((4, SIZE), 1e6)
+
+    result = stats.normalize(obs)
+
+    assert result is not obs
+    np.testing.assert_array_equal(obs, 1e6)
+    np.testing.assert_array_equal(result, 1.0)
+
+
+def test_frozen_statistics_do_not_update():
+    data = batches((10,))
+    stats = fed(data)
+    stats.freeze()
+    stats(batches((5,), seed=3)[0])
+    assert_matches(stats, data)
+
+
+def test_state_round_trip():
+    data = batches((8, 13))
+    restored = RunningMeanStd.from_state(fed(data).state())
+    assert_matches(restored, data)
+    np.testing.assert_allclose(restored.inv_std, 1 / np.sqrt(np.concatenate(data).var(axis=0) + 1e-8))
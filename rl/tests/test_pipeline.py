@@ -0,0 +1,91 @@
+"""PipelinedStepper over an in-process stand-in for VecGameWrapper"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from src.wrappers.pipeline import PipelinedStepper
+
+
+class ChangingCountsVecEnv:
+    """
+    VecGameWrapper stand-in whose environments switch between 2 and 3 deciding agents
+    every 3 steps, plus one done agent after each step. step_async checks that every
+    environment gets one action per deciding agent.
+    """
+
+    def __init__(self, num_envs: int):
+        self.num_envs = num_envs
+        self.steps = [0] * num_envs
+        self.deciding = [0] * num_envs
+
+    def _deciding(self, index: int) -> int:
+        return 2 if (self.steps[index] // 3) % 2 == 0 else 3
+
+    def _results(self, indices: List[int], finished: int = 1):
+        rows, done = [], []
+        for position, index in enumerate(indices):
+            self.deciding[index] = self._deciding(index)
+            rows.extend([position] * (self.deciding[index] + finished))
+            done.extend([False] * self.deciding[index] + [True] * finished)
+        obs = {"agent": np.zeros((len(rows), 4), dtype=np.float32)}
+        infos: Dict[str, Any] = {"agent": {"env_index": np.array(rows)}}
+        return obs, {"agent": np.zeros(len(rows))}, {"agent": np.array(done)}, infos
+
+    def reset(self, indices, return_info=False):
+        # Nothing is done right after a reset
+        obs, _, _, infos = self._results(list(indices), finished=0)
+        return obs, infos
+
+    def step_async(self, actions, indices):
+        for index, env_actions in zip(indices, actions):
+            assert len(env_actions["agent"]) == self.deciding[index]
+
+    def step_wait(self, indices):
+        for index in indices:
+            self.steps[index] += 1
+        return self._results(list(indices))
+
+    def busy_seconds(self):
+        return [0.0] * self.num_envs
+
+
+class CountingPolicy:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, obs):
+        self.calls += 1
+        return {name: np.zeros(len(batch)) for name, batch in obs.items()}
+
+
+@pytest.mark.parametrize("num_envs,num_groups,staleness", [(2, 1, 0), (2, 1, 1), (4, 2, 1), (2, 2, 2)])
+def test_one_inference_per_group_and_step(num_envs, num_groups, staleness):
+    policy = CountingPolicy()
+    stepper = PipelinedStepper(ChangingCountsVecEnv(num_envs), policy, num_groups=num_groups, staleness=staleness)
+    steps = 13
+
+    stats = stepper.run(steps)
+
+    # Stale actions are replaced when counts change, without a second inference for the queue
+    assert policy.calls == num_groups * steps
+    assert stats["env_steps"] == num_envs * steps
+    if staleness:
+        assert stats["stale_fallbacks"] > 0
+    else:
+        assert stats["stale_fallbacks"] == 0
+
+
+def test_on_step_sees_every_group_step():
+    seen = []
+    stepper = PipelinedStepper(ChangingCountsVecEnv(4), CountingPolicy(), num_groups=2, staleness=1)
+    stepper.run(5, on_step=lambda group, actions, result: seen.append((group, len(actions))))
+    assert seen == [(0, 2), (1, 2)] * 5
+
+
+def test_rejects_bad_configuration():
+    with pytest.raises(ValueError):
+        PipelinedStepper(ChangingCountsVecEnv(2), CountingPolicy(), num_groups=3)
+    with pytest.raises(ValueError):
+        PipelinedStepper(ChangingCountsVecEnv(2), CountingPolicy(), staleness=-1)
@@ -0,0 +1,109 @@
+"""VecGameWrapper against GameWrappers stepped in this process"""
+
+import numpy as np
+import pytest
+from mlagents_envs.base_env import ActionTuple
+
+from src.envs.arena import ACTION_SPEC, BEHAVIORS, ArenaEnvFactory
+from src.wrappers.game_wrapper import GameWrapper
+from src.wrappers.vec_env import EnvWorkerError, VecGameWrapper
+
+NUM_ENVS = 2
+# Agents per behavior in each environment: 2 arenas of 2 agents per team
+ROWS = 4
+FACTORY = ArenaEnvFactory(num_arenas=2, spawn_jitter=0.5, episode_max_time=0.6)
+
+
+def random_actions(rng, leading=()):
+    shape = leading + (ROWS,)
+    return {
+        behavior_name: ActionTuple(
+            continuous=rng.uniform(-1, 1, shape + (ACTION_SPEC.continuous_size,)).astype(np.float32),
+            discrete=rng.integers(0, 5, shape + (2,)).astype(np.int32) * np.array([1, 0], dtype=np.int32),
+        )
+        for behavior_name in BEHAVIORS
+    }
+
+
+def env_actions(actions, index):
+    return {
+        behavior_name: ActionTuple(continuous=action.continuous[index], discrete=action.discrete[index])
+        for behavior_name, action in actions.items()
+    }
+
+
+@pytest.fixture(scope="module")
+def vec_env():
+    envs = VecGameWrapper(FACTORY, NUM_ENVS, normalize_observations=False)
+    yield envs
+    envs.close()
+
+
+def test_rows_match_environments_stepped_in_process(vec_env):
+    local = [GameWrapper(FACTORY(index), normalize_observations=False) for index in range(NUM_ENVS)]
+    rng = np.random.default_rng(0)
+
+    obs = vec_env.reset()
+    expected = [wrapper.reset() for wrapper in local]
+    for behavior_name in BEHAVIORS:
+        np.testing.assert_array_equal(obs[behavior_name], np.concatenate([e[behavior_name] for e in expected]))
+
+    # Past an episode end (0.6 s is 6 steps), so terminal rows are included
+    for _ in range(8):
+        actions = random_actions(rng, (NUM_ENVS,))
+        obs, rewards, dones, infos = vec_env.step(actions)
+        results = [wrapper.step(env_actions(actions, index)) for index, wrapper in enumerate(local)]
+        for behavior_name in BEHAVIORS:
+            for position, field in enumerate((obs, rewards, dones)):
+                joined = np.concatenate([result[position][behavior_name] for result in results])
+                np.testing.assert_array_equal(field[behavior_name], joined)
+            rows = [len(result[0][behavior_name]) for result in results]
+            np.testing.assert_array_equal(infos[behavior_name]["env_index"], np.repeat(np.arange(NUM_ENVS), rows))
+
+
+def test_step_subsets_out_of_phase(vec_env):
+    rng = np.random.default_rng(1)
+    vec_env.reset()
+    vec_env.step_async([env_actions(random_actions(rng, (1,)), 0)], indices=[1])
+    assert vec_env.pending == [1]
+    with pytest.raises(RuntimeError):
+        vec_env.step_async([env_actions(random_actions(rng, (1,)), 0)], indices=[1])
+
+    obs, _, _, infos = vec_env.step_wait([1])
+    assert not vec_env.waiting
+    assert len(obs[BEHAVIORS[0]]) == ROWS
+    np.testing.assert_array_equal(infos[BEHAVIORS[0]]["env_index"], 0)
+
+
+def test_env_call_reads_the_environment(vec_env):
+    assert list(vec_env.env_call("behavior_specs", index=1)) == list(BEHAVIORS)
+    assert vec_env.get_observation_space_size(BEHAVIORS[0]) == 33
+
+
+def test_sync_observation_stats_counts_every_row_once():
+    envs = VecGameWrapper(FACTORY, NUM_ENVS)
+    try:
+        rng = np.random.default_rng(2)
+        envs.reset()
+        assert envs.sync_observation_stats()[BEHAVIORS[0]]["count"] == NUM_ENVS * ROWS
+
+        for _ in range(3):
+            envs.step(random_actions(rng, (NUM_ENVS,)))
+        pooled = envs.sync_observation_stats()
+        assert pooled[BEHAVIORS[0]]["count"] == 4 * NUM_ENVS * ROWS
+        for index in range(NUM_ENVS):
+            assert envs.wrapper_call("observation_stats", index=index)[BEHAVIORS[0]]["count"] == 4 * NUM_ENVS * ROWS
+    finally:
+        envs.close()
+
+
+def test_worker_failure_raises_with_traceback():
+    envs = VecGameWrapper(FACTORY, 1)
+    try:
+        envs.reset()
+        # Three rows where the environment has four agents per behavior
+        bad = {BEHAVIORS[0]: ActionTuple(continuous=np.zeros((1, 3, 3), dtype=np.float32))}
+        with pytest.raises(EnvWorkerError, match="Environment 0 failed"):
+            envs.step(bad)
+    finally:
+        envs.close()
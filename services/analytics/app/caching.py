@@ -0,0 +1,75 @@
+"""Conditional requests for analysis results
+
+Results are a pure function of the events, the endpoint and its query
+parameters, so the ETag is a fingerprint of those inputs and can be checked
+before any work is done. For stored datasets the dataset id (already a
+content hash) stands in for the events; raw bodies are hashed.
+"""
+
+import hashlib
+from typing import Iterable, Tuple, Union
+
+from starlette.datastructures import MutableHeaders
+
+from .codecs import EncodedEvents
+from .datasets import DatasetRef
+
+# Bump when analyses change their output for the same input
+RESULT_VERSION = "1"
+
+
+def result_etag(
+    path: str,
+    params: Iterable[Tuple[str, str]],
+    events: Union[EncodedEvents, DatasetRef],
+) -> str:
+    """Weak ETag identifying the result of ``path`` for these events and parameters"""
+    digest = hashlib.sha256()
+    digest.update(f"{RESULT_VERSION}\0{path}\0".encode())
+    for key, value in sorted(params):
+        digest.update(f"{key}={value}\0".encode())
+    if isinstance(events, DatasetRef):
+        digest.update(f"dataset:{events.dataset_id}".encode())
+    else:
+        digest.update(f"body:{events.media_type}\0".encode())
+        digest.update(events.body)
+    # Weak: gzip, zstd and identity encodings of a result share one tag
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Weak comparison against an If-None-Match header value"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ETagMiddleware:
+    """Adds the ETag computed for a request (``request.state.etag``) to its successful response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_tagged(message):
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+                etag = scope.get("state", {}).get("etag")
+                if etag is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers["ETag"] = etag
+                    # Clients may reuse the result but must revalidate first
+                    headers["Cache-Control"] = "no-cache"
+            await send(message)
+
+        await self.app(scope, receive, send_tagged)
@@ -0,0 +1,182 @@
+"""Request body codecs for event data
+
+Events arrive as JSON (a list of event objects), an Arrow IPC stream or
+msgpack, and are decoded into a pandas DataFrame with one row per event.
+Nested objects such as ``data`` are flattened into dotted columns
+(``data.winner``) so analyzers can work on whole columns at once.
+
+pandas is imported on first decode, so the API process, which only passes
+payloads through to workers, never loads it.
+"""
+
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+JSON = "application/json"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+
+# Accepted Content-Type values and the codec they map to
+MEDIA_TYPES = {
+    JSON: JSON,
+    ARROW_STREAM: ARROW_STREAM,
+    "application/x-arrow-stream": ARROW_STREAM,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+class EventDecodeError(ValueError):
+    """Raised when a request body cannot be decoded into events"""
+
+
+class EncodedEvents:
+    """
+    Raw event payload as received over HTTP.
+
+    Passed to worker processes undecoded so parsing happens off the event
+    loop and only a single bytes buffer is pickled.
+    """
+
+    def __init__(self, body: bytes, media_type: str = JSON):
+        self.body = body
+        self.media_type = media_type
+
+    def __len__(self) -> int:
+        return len(self.body)
+
+
+def normalize_media_type(content_type: str) -> str:
+    """Map a Content-Type header to a supported codec, or raise EventDecodeError"""
+    media_type = (content_type or JSON).split(";")[0].strip().lower()
+    if media_type not in MEDIA_TYPES:
+        raise EventDecodeError(
+            f"Unsupported content type: {media_type}. Use one of: {', '.join(sorted(set(MEDIA_TYPES.values())))}"
+        )
+    return MEDIA_TYPES[media_type]
+
+
+def events_to_frame(events: List[Dict[str, Any]]) -> "pd.DataFrame":
+    """Build the columnar event frame from a list of event dictionaries"""
+    import pandas as pd
+
+    if not events:
+        return pd.DataFrame()
+    return _flatten_dict_columns(pd.DataFrame(events))
+
+
+def _flatten_dict_columns(frame: "pd.DataFrame") -> "pd.DataFrame":
+    """Expand object columns holding dictionaries into dotted columns"""
+    import pandas as pd
+
+    for column in list(frame.columns):
+        values = frame[column]
+        if values.dtype != object:
+            continue
+        sample = values.dropna()
+        if sample.empty or not isinstance(sample.iloc[0], dict):
+            continue
+        expanded = pd.DataFrame(
+            [v if isinstance(v, dict) else {} for v in values.tolist()],
+            index=frame.index,
+        )
+        expanded.columns = [f"{column}.{key}" for key in expanded.columns]
+        frame = pd.concat([frame.drop(columns=[column]), expanded], axis=1)
+    return frame
+
+
+def _loads(body: bytes) -> Any:
+    try:
+        import orjson
+
+        return orjson.loads(body)
+    except ImportError:
+        return json.loads(body)
+
+
+def _decode_json(body: bytes) -> "pd.DataFrame":
+    try:
+        events = _loads(body)
+    except ValueError as e:
+        raise EventDecodeError(f"Invalid JSON body: {e}")
+    if not isinstance(events, list):
+        raise EventDecodeError("JSON body must be a list of events")
+    return events_to_frame(events)
+
+
+def _decode_arrow(body: bytes) -> "pd.DataFrame":
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise EventDecodeError(f"Invalid Arrow IPC stream: {e}")
+
+    # Struct columns (e.g. data) become dotted columns, matching events_to_frame
+    while any(pa.types.is_struct(field.type) for field in table.schema):
+        table = table.flatten()
+    return table.to_pandas()
+
+
+def _decode_msgpack(body: bytes) -> "pd.DataFrame":
+    import pandas as pd
+
+    try:
+        import msgpack
+    except ImportError:
+        raise EventDecodeError("msgpack bodies require the 'msgpack' package")
+
+    try:
+        payload = msgpack.unpackb(body, raw=False)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise EventDecodeError(f"Invalid msgpack body: {e}")
+
+    if isinstance(payload, list):
+        # Record-oriented: same shape as the JSON body
+        return events_to_frame(payload)
+    if isinstance(payload, dict):
+        # Column-oriented: {"tick": [...], "agent_id": [...], "data": [{...}, ...]}
+        try:
+            frame = pd.DataFrame(payload)
+        except ValueError as e:
+            raise EventDecodeError(f"msgpack columns must have equal length: {e}")
+        return _flatten_dict_columns(frame)
+    raise EventDecodeError("msgpack body must be a list of events or a map of columns")
+
+
+_DECODERS = {
+    JSON: _decode_json,
+    ARROW_STREAM: _decode_arrow,
+    MSGPACK: _decode_msgpack,
+}
+
+
+def decode_events(body: bytes, media_type: str = JSON) -> "pd.DataFrame":
+    """Decode a request body into the columnar event frame"""
+    return _DECODERS[normalize_media_type(media_type)](body)
+
+
+def as_event_frame(events: Union[EncodedEvents, "pd.DataFrame", List[Dict[str, Any]]]) -> "pd.DataFrame":
+    """Accept any supported event representation and return the event frame"""
+    import pandas as pd
+
+    if isinstance(events, pd.DataFrame):
+        return events
+    if isinstance(events, EncodedEvents):
+        return decode_events(events.body, events.media_type)
+    return events_to_frame(events)
+
+
+def encode_arrow(frame: "pd.DataFrame") -> bytes:
+    """Serialize an event frame as an Arrow IPC stream"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,164 @@
+"""Response compression negotiated from Accept-Encoding
+
+zstd is preferred when the client accepts it and the ``zstandard`` package
+is installed, gzip otherwise. Whole responses are compressed at once;
+streamed responses are compressed chunk by chunk and flushed after every
+chunk so rows still reach the client as soon as they are produced.
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+# Media types worth compressing; everything else passes through untouched
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/vnd.apache.arrow.stream",
+    "text/",
+)
+
+# Bodies above this size are compressed in a worker thread (zlib and zstd release the GIL)
+THREAD_THRESHOLD = 1024 * 1024
+
+
+def _zstandard():
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
+
+
+def negotiate(accept_encoding: str, available=(ZSTD, GZIP)) -> Optional[str]:
+    """Pick the preferred available encoding the client accepts, or None"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+
+    best = None
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best[0] if best else None
+
+
+class _Compressor:
+    """Incremental compressor producing one self-contained stream"""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        if encoding == ZSTD:
+            zstandard = _zstandard()
+            self._zstd_flush = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            self._obj = zstandard.ZstdCompressor(level=level or 3).compressobj()
+        else:
+            self._zstd_flush = None
+            self._obj = zlib.compressobj(level or 6, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so the client can decode it right away"""
+        flush = self._zstd_flush if self._zstd_flush is not None else zlib.Z_SYNC_FLUSH
+        return self._obj.compress(data) + self._obj.flush(flush)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._obj.compress(data) + self._obj.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON, NDJSON and Arrow responses"""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.available = (ZSTD, GZIP) if _zstandard() is not None else (GZIP,)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.available)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                # Headers depend on the body, so hold them until the first chunk
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(scope=start_message)
+                media_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or start_message["status"] < 200
+                    or start_message["status"] in (204, 304)
+                    or not media_type.startswith(COMPRESSIBLE_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    body = await self._run(compressor.finish, body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                await send(start_message)
+
+            if more_body:
+                body = await self._run(compressor.compress, body)
+            else:
+                body = await self._run(compressor.finish, body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+        if start_message is not None and compressor is None and not passthrough:
+            # Response without a body message
+            await send(start_message)
+
+    @staticmethod
+    async def _run(fn, body: bytes) -> bytes:
+        if len(body) > THREAD_THRESHOLD:
+            return await run_in_threadpool(fn, body)
+        return fn(body)
@@ -0,0 +1,258 @@
+"""Server-side registry of uploaded event datasets
+
+Events are uploaded once, stored as Parquet under the SHA-256 of their
+columnar content and referenced by that ``dataset_id`` in later calls.
+The registry index is persisted next to the files so datasets survive
+restarts, and the least recently used datasets are evicted once the
+total size exceeds the configured budget. Datasets referenced by a running
+request or job are pinned: they are never evicted, and deleting one only
+removes its file once the last reference is released.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Schema metadata key listing columns stored as JSON text
+_JSON_COLUMNS_KEY = b"noxus_ionia.json_columns"
+
+
+class DatasetRef:
+    """Picklable reference to a stored dataset, loaded inside worker processes"""
+
+    def __init__(self, dataset_id: str, path: str):
+        self.dataset_id = dataset_id
+        self.path = path
+
+    def load(self) -> "pd.DataFrame":
+        return read_dataset(self.path)
+
+
+def _to_arrow_table(frame: "pd.DataFrame"):
+    """
+    Convert an event frame to Arrow.
+
+    Columns with mixed types (e.g. ``target`` holding both ids and lists)
+    cannot be represented natively and are stored as JSON text instead.
+    """
+    import pyarrow as pa
+
+    json_columns = []
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        table = None
+        for column in frame.columns:
+            try:
+                pa.array(frame[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                json_columns.append(column)
+
+    if table is None:
+        frame = frame.copy()
+        for column in json_columns:
+            frame[column] = frame[column].map(lambda v: json.dumps(v, default=str))
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+
+    metadata = dict(table.schema.metadata or {})
+    metadata[_JSON_COLUMNS_KEY] = json.dumps(json_columns).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def content_hash(table) -> str:
+    """SHA-256 of the table's Arrow IPC serialization"""
+    import pyarrow as pa
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return hashlib.sha256(sink.getvalue()).hexdigest()
+
+
+def write_dataset(frame: "pd.DataFrame", root: str) -> Dict[str, Any]:
+    """Store an event frame under its content hash and return its metadata"""
+    import pyarrow.parquet as pq
+
+    table = _to_arrow_table(frame)
+    dataset_id = content_hash(table)
+    path = Path(root) / f"{dataset_id}.parquet"
+
+    if not path.exists():
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, path)
+
+    return {
+        "dataset_id": dataset_id,
+        "num_events": len(frame),
+        "columns": list(frame.columns),
+        "size_bytes": path.stat().st_size,
+    }
+
+
+def read_dataset(path: str) -> "pd.DataFrame":
+    """Load a stored dataset back into an event frame"""
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    metadata = table.schema.metadata or {}
+    json_columns = json.loads(metadata.get(_JSON_COLUMNS_KEY, b"[]"))
+
+    frame = table.to_pandas()
+    for column in json_columns:
+        frame[column] = frame[column].map(json.loads)
+    return frame
+
+
+class DatasetRegistry:
+    """
+    Tracks stored datasets and evicts the least recently used beyond ``max_bytes``.
+
+    ``register``, ``delete``, ``release``, ``start`` and ``shutdown`` touch
+    files, so async callers run them in a thread.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root or os.getenv("ANALYTICS_DATASET_DIR", "data/datasets"))
+        self.max_bytes = max_bytes or int(os.getenv("ANALYTICS_DATASET_MAX_BYTES", 5 * 1024**3))
+
+        # dataset_id -> metadata, least recently used first
+        self._datasets: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # dataset_id -> references handed out by ref() or pin() and not yet released
+        self._pins: Dict[str, int] = {}
+        # Deleted while pinned: files to remove once released
+        self._deleted: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "index.json"
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(meta["size_bytes"] for meta in self._datasets.values())
+
+    def start(self):
+        """Load the persisted index, dropping entries whose files are gone"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        for tmp in self.root.glob("*.tmp"):
+            tmp.unlink(missing_ok=True)
+
+        try:
+            with open(self.index_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+
+        with self._lock:
+            self._datasets.clear()
+            for meta in sorted(entries, key=lambda m: m.get("last_used_at", 0)):
+                if self._path(meta["dataset_id"]).exists():
+                    self._datasets[meta["dataset_id"]] = meta
+            self._evict()
+            self._save()
+
+    def shutdown(self):
+        """Persist last-use times"""
+        with self._lock:
+            self._save()
+
+    def _path(self, dataset_id: str) -> Path:
+        return self.root / f"{dataset_id}.parquet"
+
+    def _save(self):
+        tmp = self.index_path.with_name("index.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(list(self._datasets.values()), f)
+        os.replace(tmp, self.index_path)
+
+    def _evict(self) -> bool:
+        """Drop unpinned datasets, least recently used first, until under budget; whether any were"""
+        evicted = False
+        # The most recently used dataset is kept even when it alone exceeds the budget
+        for dataset_id in list(self._datasets)[:-1]:
+            if self.total_bytes <= self.max_bytes:
+                break
+            if self._pins.get(dataset_id):
+                continue
+            del self._datasets[dataset_id]
+            self._path(dataset_id).unlink(missing_ok=True)
+            evicted = True
+        return evicted
+
+    def register(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a dataset written by write_dataset()"""
+        with self._lock:
+            existing = self._datasets.pop(meta["dataset_id"], None)
+            # Uploaded again after a delete that is still waiting for its references
+            self._deleted.discard(meta["dataset_id"])
+            now = time.time()
+            meta = {
+                **meta,
+                "created_at": existing["created_at"] if existing else now,
+                "last_used_at": now,
+            }
+            self._datasets[meta["dataset_id"]] = meta
+            self._evict()
+            self._save()
+        return meta
+
+    def ref(self, dataset_id: str) -> Optional[DatasetRef]:
+        """
+        Pinned reference to a dataset for a worker, marking it recently used.
+
+        The dataset stays on disk until the reference is passed to release().
+        """
+        with self._lock:
+            meta = self._datasets.get(dataset_id)
+            if meta is None:
+                return None
+            meta["last_used_at"] = time.time()
+            self._datasets.move_to_end(dataset_id)
+            self._pins[dataset_id] = self._pins.get(dataset_id, 0) + 1
+        return DatasetRef(dataset_id, str(self._path(dataset_id)))
+
+    def pin(self, ref: DatasetRef):
+        """Take another reference to a dataset already pinned by ``ref``, e.g. for a job outliving its request"""
+        with self._lock:
+            self._pins[ref.dataset_id] = self._pins.get(ref.dataset_id, 0) + 1
+
+    def release(self, ref: DatasetRef):
+        """Drop a reference from ref() or pin(), removing or evicting the dataset if it was waiting on it"""
+        with self._lock:
+            pins = self._pins.get(ref.dataset_id, 0) - 1
+            if pins > 0:
+                self._pins[ref.dataset_id] = pins
+                return
+            self._pins.pop(ref.dataset_id, None)
+            if ref.dataset_id in self._deleted:
+                self._deleted.discard(ref.dataset_id)
+                self._path(ref.dataset_id).unlink(missing_ok=True)
+            elif self._evict():
+                self._save()
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        return self._datasets.get(dataset_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Datasets, most recently used first"""
+        return list(reversed(self._datasets.values()))
+
+    def delete(self, dataset_id: str) -> bool:
+        with self._lock:
+            if self._datasets.pop(dataset_id, None) is None:
+                return False
+            if self._pins.get(dataset_id):
+                self._deleted.add(dataset_id)
+            else:
+                self._path(dataset_id).unlink(missing_ok=True)
+            self._save()
+        return True
@@ -0,0 +1,274 @@
+"""Bounded process pool for CPU-bound analytics work"""
+
+import asyncio
+import functools
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from queue import Empty, Full
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from .metrics import PEAK_RSS, REGISTRY, capture_phases, peak_rss_bytes, record_phase, record_phases
+
+POOL_TASKS = REGISTRY.gauge(
+    "compute_pool_tasks",
+    "Tasks admitted to a compute pool, running or waiting for a worker",
+    ["pool", "state"],
+)
+
+# Chunks buffered between a streaming worker and the response writer
+STREAM_BUFFER = 8
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Analytics workers are saturated, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _call(fn: Callable[..., Any], args: tuple, kwargs: dict, submitted_at: float):
+    """Worker side of ComputePool.run(): also report phase timings and peak memory"""
+    with capture_phases() as timeline:
+        record_phase("queue_wait", max(0.0, time.time() - submitted_at))
+        result = fn(*args, **kwargs)
+    return result, timeline.phases, peak_rss_bytes()
+
+
+def _ready() -> int:
+    """No-op task that makes a worker prove it has started and run its initializer"""
+    return os.getpid()
+
+
+def _produce(fn: Callable[..., Iterable[Any]], args: tuple, kwargs: dict, channel, cancelled, submitted_at: float):
+    """Worker side of ComputePool.stream(): push chunks into a bounded queue"""
+
+    def put(message) -> bool:
+        while not cancelled.is_set():
+            try:
+                channel.put(message, timeout=1.0)
+                return True
+            except Full:
+                continue
+        return False
+
+    with capture_phases() as timeline:
+        record_phase("queue_wait", max(0.0, time.time() - submitted_at))
+        try:
+            for chunk in fn(*args, **kwargs):
+                if not put(("item", chunk)):
+                    return
+        except Exception as e:
+            put(("error", e))
+            return
+    put(("end", (timeline.phases, peak_rss_bytes())))
+
+
+class ComputePool:
+    """
+    Process pool that keeps pandas/networkx work off the asyncio event loop.
+
+    At most ``max_workers`` tasks run at once and at most ``max_queue`` more
+    wait for a free worker. Anything beyond that is rejected immediately with
+    PoolSaturatedError so the API can answer 429 instead of letting latency grow
+    without bound.
+
+    ``initializer`` runs once in every worker as it starts, e.g. to import
+    heavy modules before the first task arrives.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        start_method: Optional[str] = None,
+        name: str = "requests",
+        initializer: Optional[Callable[[], Any]] = None,
+    ):
+        self.max_workers = max_workers or int(os.getenv("ANALYTICS_WORKERS", os.cpu_count() or 1))
+        if max_queue is None:
+            max_queue = int(os.getenv("ANALYTICS_MAX_QUEUE", self.max_workers * 4))
+        self.max_queue = max_queue
+        self.start_method = start_method or os.getenv("ANALYTICS_START_METHOD", "spawn")
+        self.initializer = initializer
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._lock = threading.Lock()
+        self._admitted = 0
+
+        # Exponentially weighted task duration, used to size Retry-After
+        self._avg_duration = 1.0
+
+        POOL_TASKS.set_function(lambda: self.in_flight - self.queued, pool=name, state="running")
+        POOL_TASKS.set_function(lambda: self.queued, pool=name, state="queued")
+
+    @property
+    def in_flight(self) -> int:
+        """Tasks currently running or waiting for a worker"""
+        return self._admitted
+
+    @property
+    def queued(self) -> int:
+        """Tasks admitted but still waiting for a worker"""
+        return max(0, self._admitted - self.max_workers)
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def start(self):
+        """Create the worker processes (idempotent)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=self.initializer,
+                )
+
+    async def warm_up(self):
+        """Start every worker and wait until each has run the initializer"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            # Submitted together, so the pool starts a worker for each instead of reusing an idle one
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _ready) for _ in range(self.max_workers)))
+        except BrokenProcessPool:
+            self.shutdown(wait=False)
+            raise
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
+
+    def check_capacity(self):
+        """Raise PoolSaturatedError if no worker or queue slot is free"""
+        if self._admitted >= self.capacity:
+            raise PoolSaturatedError(self.retry_after())
+
+    def acquire(self):
+        """Reserve a worker or queue slot, raising PoolSaturatedError if none is left"""
+        with self._lock:
+            self.check_capacity()
+            self._admitted += 1
+
+    def release(self):
+        """Return a slot reserved with acquire()"""
+        with self._lock:
+            self._admitted = max(0, self._admitted - 1)
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up"""
+        waves = (self.queued + 1) / self.max_workers
+        return max(1, math.ceil(self._avg_duration * waves))
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in a worker process and await its result.
+
+        If the caller is cancelled while the task is already executing, the
+        worker cannot be stopped; its slot stays reserved until it finishes.
+        """
+        self.acquire()
+        return await self.run_reserved(fn, *args, **kwargs)
+
+    async def run_reserved(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Like run(), for a slot already reserved with acquire(); the slot is released the same way"""
+        release = True
+        try:
+            self.start()
+            started = time.perf_counter()
+            future = self._executor.submit(_call, fn, args, kwargs, time.time())
+            try:
+                result, phases, peak_rss = await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                if not future.cancel():
+                    release = False
+                    future.add_done_callback(lambda _: self.release())
+                raise
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM); replace the pool so later requests recover
+                self.shutdown(wait=False)
+                raise
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.perf_counter() - started)
+            record_phases(phases)
+            PEAK_RSS.set_max(peak_rss, process="worker")
+            return result
+        finally:
+            if release:
+                self.release()
+
+    def _stream_manager(self):
+        # Queues shared with pool workers must be manager proxies
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context(self.start_method).Manager()
+            return self._manager
+
+    async def stream(self, fn: Callable[..., Iterable[Any]], *args, **kwargs) -> AsyncIterator[Any]:
+        """
+        Run a generator function in a worker process and yield its chunks.
+
+        Chunks travel through a bounded queue, so a slow client pauses the
+        worker instead of letting the result pile up in memory. The worker
+        slot is held until the stream is exhausted, or until the worker
+        returns after the consumer stops.
+        """
+        self.acquire()
+        release = True
+        try:
+            self.start()
+            loop = asyncio.get_running_loop()
+            manager = await loop.run_in_executor(None, self._stream_manager)
+            channel = manager.Queue(maxsize=STREAM_BUFFER)
+            cancelled = manager.Event()
+            started = time.perf_counter()
+            future = loop.run_in_executor(
+                self._executor, functools.partial(_produce, fn, args, kwargs, channel, cancelled, time.time())
+            )
+            broken = False
+            try:
+                while True:
+                    try:
+                        kind, payload = await loop.run_in_executor(None, functools.partial(channel.get, timeout=1.0))
+                    except Empty:
+                        if future.done():
+                            # The worker exited without finishing the stream
+                            future.result()
+                            raise BrokenProcessPool("Streaming worker exited unexpectedly")
+                        continue
+                    if kind == "item":
+                        yield payload
+                    elif kind == "error":
+                        raise payload
+                    else:
+                        phases, peak_rss = payload
+                        record_phases(phases)
+                        PEAK_RSS.set_max(peak_rss, process="worker")
+                        break
+            except BrokenProcessPool:
+                broken = True
+                raise
+            finally:
+                cancelled.set()
+                if broken:
+                    self.shutdown(wait=False)
+                elif not future.done():
+                    release = False
+                    future.add_done_callback(lambda _: self.release())
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.perf_counter() - started)
+        finally:
+            if release:
+                self.release()
@@ -0,0 +1,331 @@
+"""Background jobs for long-running analyses
+
+A job is submitted with its events and parameters, runs on a dedicated
+compute pool and writes its progress and result to ``<job_dir>/<job_id>/``.
+Identical submissions that are still queued or running share one job.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from . import tasks
+from .datasets import DatasetRef, DatasetRegistry
+from .executor import ComputePool
+from .metrics import capture_phases, observe_phases
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _write_json_atomic(path: Path, payload: Any):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class JobProgress:
+    """Picklable progress callback that workers use to report job phases"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, fraction: float, phase: str):
+        _write_json_atomic(Path(self.path), {"progress": fraction, "phase": phase, "updated_at": time.time()})
+
+
+JobEvents = Union[List[Dict[str, Any]], DatasetRef]
+
+
+def run_job(kind: str, events: JobEvents, params: Dict[str, Any], job_path: str):
+    """Worker entry point: run the analysis and persist its result"""
+    path = Path(job_path)
+    progress = JobProgress(str(path / "progress.json"))
+
+    result = tasks.TASKS[kind](events, progress=progress, **params)
+
+    _write_json_atomic(path / "result.json", {"status": "success", **result})
+    progress(1.0, "done")
+
+
+def check_params(kind: str, params: Dict[str, Any]):
+    """Raise ValueError unless ``params`` are valid keyword arguments for the job's task"""
+    if "progress" in params:
+        raise ValueError(f"Invalid params for {kind}: 'progress' is reserved")
+    try:
+        inspect.signature(tasks.TASKS[kind]).bind(None, progress=None, **params)
+    except TypeError as e:
+        raise ValueError(f"Invalid params for {kind}: {e}")
+
+
+def job_fingerprint(kind: str, events: JobEvents, params: Dict[str, Any]) -> str:
+    """Content hash identifying identical submissions"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str).encode())
+    if isinstance(events, DatasetRef):
+        # Dataset ids are already content hashes
+        digest.update(events.dataset_id.encode())
+    else:
+        for event in events:
+            digest.update(json.dumps(event, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class Job:
+    """Metadata for a submitted analysis"""
+
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        params: Dict[str, Any],
+        fingerprint: str,
+        num_events: Optional[int] = None,
+        dataset_id: Optional[str] = None,
+        status: str = QUEUED,
+        created_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+        error: Optional[str] = None,
+    ):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.fingerprint = fingerprint
+        self.num_events = num_events
+        self.dataset_id = dataset_id
+        self.status = status
+        self.created_at = created_at or time.time()
+        self.finished_at = finished_at
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "fingerprint": self.fingerprint,
+            "num_events": self.num_events,
+            "dataset_id": self.dataset_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(**data)
+
+
+class JobManager:
+    """
+    Schedules analysis jobs on a local worker pool and tracks their state on disk.
+
+    Jobs on a stored dataset pin it in ``datasets`` until they finish.
+    """
+
+    def __init__(
+        self,
+        job_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        datasets: Optional[DatasetRegistry] = None,
+    ):
+        self.job_dir = Path(job_dir or os.getenv("ANALYTICS_JOB_DIR", "data/jobs"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("ANALYTICS_JOB_TTL", 24 * 3600))
+        self.pool = ComputePool(
+            max_workers=max_workers or int(os.getenv("ANALYTICS_JOB_WORKERS", 0)) or None,
+            max_queue=max_queue if max_queue is not None else int(os.getenv("ANALYTICS_JOB_QUEUE", 256)),
+            name="jobs",
+            initializer=tasks.warm_up,
+        )
+
+        self.datasets = datasets
+
+        self.jobs: Dict[str, Job] = {}
+        self._in_flight: Dict[str, str] = {}  # fingerprint -> job_id
+        self._runners: Dict[str, asyncio.Task] = {}
+        # Jobs holding a pool slot reserved at submit that their runner has not taken over yet
+        self._reserved: Set[str] = set()
+        # Datasets pinned by jobs that have not finished
+        self._pinned: Dict[str, DatasetRef] = {}
+
+    def start(self):
+        """Load persisted jobs and start the worker pool"""
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        for meta_path in self.job_dir.glob("*/job.json"):
+            data = _read_json(meta_path)
+            if not data:
+                continue
+            job = Job.from_dict(data)
+            if job.status not in FINISHED_STATES:
+                # The worker that owned this job died with the previous process
+                self._finish(job, FAILED, error="Interrupted by service restart")
+            self.jobs[job.job_id] = job
+        self.purge_expired()
+        self.pool.start()
+
+    def shutdown(self):
+        for runner in self._runners.values():
+            runner.cancel()
+        self.pool.shutdown(wait=False)
+
+    def _path(self, job_id: str) -> Path:
+        return self.job_dir / job_id
+
+    def _save(self, job: Job):
+        _write_json_atomic(self._path(job.job_id) / "job.json", job.to_dict())
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        self._save(job)
+        if self._in_flight.get(job.fingerprint) == job.job_id:
+            del self._in_flight[job.fingerprint]
+
+    async def submit(
+        self,
+        kind: str,
+        events: JobEvents,
+        params: Dict[str, Any],
+    ) -> Tuple[Job, bool]:
+        """
+        Submit an analysis job.
+
+        Returns the job and whether it was deduplicated against an identical
+        job that is still queued or running. Raises ValueError for an unknown
+        kind or params the analysis does not accept, and PoolSaturatedError
+        when no worker or queue slot is left. An accepted job holds its slot
+        until it finishes, so it never fails later for lack of capacity.
+        """
+        if kind not in tasks.TASKS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        check_params(kind, params)
+
+        loop = asyncio.get_running_loop()
+        fingerprint = await loop.run_in_executor(None, job_fingerprint, kind, events, params)
+
+        existing_id = self._in_flight.get(fingerprint)
+        if existing_id is not None:
+            return self.jobs[existing_id], True
+
+        # Report a full queue to the caller instead of accepting a job that cannot run
+        self.pool.acquire()
+
+        if isinstance(events, DatasetRef):
+            job = Job(uuid.uuid4().hex, kind, params, fingerprint, dataset_id=events.dataset_id)
+        else:
+            job = Job(uuid.uuid4().hex, kind, params, fingerprint, num_events=len(events))
+        try:
+            self._path(job.job_id).mkdir(parents=True, exist_ok=True)
+            self._save(job)
+        except BaseException:
+            self.pool.release()
+            raise
+        self.jobs[job.job_id] = job
+        self._in_flight[fingerprint] = job.job_id
+        self._reserved.add(job.job_id)
+        if isinstance(events, DatasetRef) and self.datasets is not None:
+            self.datasets.pin(events)
+            self._pinned[job.job_id] = events
+        runner = asyncio.create_task(self._run(job, events))
+        runner.add_done_callback(lambda _: self._runner_done(job.job_id))
+        self._runners[job.job_id] = runner
+
+        self.purge_expired()
+        return job, False
+
+    async def _run(self, job: Job, events: JobEvents):
+        # The pool releases the reserved slot from here on
+        self._reserved.discard(job.job_id)
+        try:
+            with capture_phases() as timeline:
+                await self.pool.run_reserved(run_job, job.kind, events, job.params, str(self._path(job.job_id)))
+            observe_phases(f"job:{job.kind}", timeline.phases)
+            status, error = SUCCEEDED, None
+        except asyncio.CancelledError:
+            status, error = CANCELLED, None
+        except Exception as e:
+            status, error = FAILED, str(e)
+
+        # A job cancelled while its worker was busy keeps its cancelled state
+        if job.status not in FINISHED_STATES:
+            self._finish(job, status, error=error)
+
+    def _runner_done(self, job_id: str):
+        self._runners.pop(job_id, None)
+        if job_id in self._reserved:
+            # Cancelled before its runner started, so the slot was never handed to the pool
+            self._reserved.discard(job_id)
+            self.pool.release()
+        ref = self._pinned.pop(job_id, None)
+        if ref is not None:
+            asyncio.get_running_loop().run_in_executor(None, self.datasets.release, ref)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def describe(self, job: Job) -> Dict[str, Any]:
+        """Job metadata plus the latest progress reported by the worker"""
+        info = job.to_dict()
+        progress = _read_json(self._path(job.job_id) / "progress.json")
+        if job.status == QUEUED and progress:
+            info["status"] = RUNNING
+        info["progress"] = progress.get("progress", 0.0) if progress else 0.0
+        info["phase"] = progress.get("phase") if progress else None
+        return info
+
+    def result_path(self, job: Job) -> Optional[Path]:
+        """Path of the persisted result, if the job succeeded"""
+        if job.status != SUCCEEDED:
+            return None
+        path = self._path(job.job_id) / "result.json"
+        return path if path.exists() else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job.
+
+        Queued jobs never start. A job already executing in a worker process
+        runs to completion in the background but its result is discarded; it
+        keeps its pool slot until then.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        self._finish(job, CANCELLED)
+        runner = self._runners.get(job_id)
+        if runner is not None:
+            runner.cancel()
+        return job
+
+    def purge_expired(self):
+        """Delete finished jobs older than the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+        for job_id, job in list(self.jobs.items()):
+            if job.status in FINISHED_STATES and (job.finished_at or 0) < cutoff:
+                shutil.rmtree(self._path(job_id), ignore_errors=True)
+                del self.jobs[job_id]
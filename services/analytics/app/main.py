@@ -1,15 +1,22 @@
 """FastAPI service for analytics and SNA"""
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
-from typing import Optional, List, Dict, Any
-import pandas as pd
-import json
-from pathlib import Path
+from fastapi import FastAPI, HTTPException, UploadFile, File, Body, Depends, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from typing import Optional, Dict, Any, AsyncIterator, Callable, Iterator, Union
 
-from .processors import EventLogProcessor
-from .sna import SocialNetworkAnalyzer
-from .stats import StatisticalAnalyzer
+from starlette.concurrency import run_in_threadpool
+
+from . import tasks
+from .caching import ETagMiddleware, etag_matches, result_etag
+from .codecs import ARROW_STREAM, JSON, MSGPACK, EncodedEvents, EventDecodeError, normalize_media_type
+from .compression import CompressionMiddleware
+from .datasets import DatasetRef, DatasetRegistry
+from .executor import ComputePool, PoolSaturatedError
+from .jobs import JobManager
+from .metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, MetricsMiddleware, TimedJSONResponse, phase
+from .models import JobRequest
+from .streaming import DEFAULT_BATCH_ROWS, MAX_BATCH_ROWS, MEDIA_TYPES as STREAM_MEDIA_TYPES
+from .warmup import WarmUp
 
 app = FastAPI(
     title="Noxus-Ionia Analytics Service",
@@ -17,10 +24,180 @@ app = FastAPI(
     version="0.1.0",
 )
 
-# Initialize analyzers
-processor = EventLogProcessor()
-sna_analyzer = SocialNetworkAnalyzer()
-stats_analyzer = StatisticalAnalyzer()
+# Listed innermost first: results are tagged, then compressed, then measured
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware)
+# Per-endpoint and per-phase latency, payload sizes and queue depth on /metrics
+app.add_middleware(MetricsMiddleware)
+
+# CPU-bound analysis runs in worker processes so the event loop stays responsive;
+# each worker imports pandas/networkx/scipy as it starts, never the API process
+compute_pool = ComputePool(initializer=tasks.warm_up)
+
+# Uploaded event datasets, referenced by dataset_id in later calls
+dataset_registry = DatasetRegistry()
+
+# Long-running analyses submitted through /jobs use their own worker pool
+job_manager = JobManager(datasets=dataset_registry)
+
+# Worker processes are started in the background; /health/ready waits for them
+warm_up = WarmUp()
+warm_up.add("compute_pool", compute_pool.warm_up)
+warm_up.add("job_pool", job_manager.pool.warm_up)
+
+
+@app.on_event("startup")
+async def start_compute_pool():
+    dataset_registry.start()
+    compute_pool.start()
+    job_manager.start()
+    warm_up.start()
+
+
+@app.on_event("shutdown")
+async def stop_compute_pool():
+    warm_up.cancel()
+    compute_pool.shutdown()
+    job_manager.shutdown()
+    dataset_registry.shutdown()
+
+
+def _too_many_requests(e: PoolSaturatedError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+async def _offload(fn: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    """Run an analytics task in the compute pool, mapping saturation to 429"""
+    try:
+        return await compute_pool.run(fn, *args)
+    except PoolSaturatedError as e:
+        raise _too_many_requests(e)
+    except EventDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _stream(fn: Callable[..., Iterator[bytes]], format: str, *args) -> StreamingResponse:
+    """
+    Stream an encoded result from the compute pool.
+
+    The first chunk is awaited before responding so saturation and decode
+    errors still produce a proper status code instead of a truncated body.
+    """
+    if format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported stream format: {format}. Use one of: {', '.join(STREAM_MEDIA_TYPES)}",
+        )
+
+    chunks = compute_pool.stream(fn, *args)
+    try:
+        with phase("first_chunk"):
+            first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except PoolSaturatedError as e:
+        raise _too_many_requests(e)
+    except EventDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def body() -> AsyncIterator[bytes]:
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return StreamingResponse(body(), media_type=STREAM_MEDIA_TYPES[format])
+
+
+def _dataset_ref(dataset_id: str) -> DatasetRef:
+    """Pinned reference to a dataset; the caller releases it"""
+    ref = dataset_registry.ref(dataset_id)
+    if ref is None:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset_id}")
+    return ref
+
+
+async def read_body_events(request: Request) -> EncodedEvents:
+    """
+    Read an event payload without decoding it on the event loop.
+    
+    Accepts a JSON list of events, an Arrow IPC stream or msgpack (a list of
+    events or a map of columns), selected by Content-Type.
+    """
+    try:
+        media_type = normalize_media_type(request.headers.get("content-type", JSON))
+    except EventDecodeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    with phase("read_body"):
+        body = await request.body()
+    return EncodedEvents(body, media_type)
+
+
+async def read_events(
+    request: Request,
+    dataset_id: Optional[str] = None,
+) -> AsyncIterator[Union[EncodedEvents, DatasetRef]]:
+    """
+    Events from an uploaded dataset when ``dataset_id`` is given, else from the body.
+
+    The dataset stays pinned, so it cannot be evicted or deleted under the
+    request, until the response is done.
+    """
+    if dataset_id is None:
+        yield await read_body_events(request)
+        return
+
+    ref = _dataset_ref(dataset_id)
+    try:
+        yield ref
+    finally:
+        await run_in_threadpool(dataset_registry.release, ref)
+
+
+async def read_conditional_events(
+    request: Request,
+    events: Union[EncodedEvents, DatasetRef] = Depends(read_events),
+) -> Union[EncodedEvents, DatasetRef]:
+    """
+    Events for an analysis, answering 304 when the client already has the result.
+    
+    The ETag fingerprints the endpoint, its query parameters and the dataset
+    id or body, so a repeated poll is answered without computing anything.
+    """
+    with phase("etag"):
+        if isinstance(events, EncodedEvents) and len(events.body) > 1024 * 1024:
+            etag = await run_in_threadpool(result_etag, request.url.path, request.query_params.multi_items(), events)
+        else:
+            etag = result_etag(request.url.path, request.query_params.multi_items(), events)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(etag, if_none_match):
+        raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    request.state.etag = etag
+    return events
+
+
+# Documents the accepted request bodies, since they are read from the raw request
+EVENTS_BODY = {
+    "requestBody": {
+        "required": False,
+        "description": "Event payload, omitted when a dataset_id is given",
+        "content": {
+            JSON: {"schema": {"type": "array", "items": {"type": "object"}}},
+            ARROW_STREAM: {"schema": {"type": "string", "format": "binary"}},
+            MSGPACK: {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
 
 
 @app.get("/")
@@ -29,6 +206,24 @@ async def root():
     return {"status": "ok", "service": "analytics"}
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is serving requests"""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 until worker processes have started and imported the analysis stack"""
+    return TimedJSONResponse(status_code=200 if warm_up.ready else 503, content=warm_up.describe())
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.post("/process-events")
 async def process_events(
     file: UploadFile = File(...),
@@ -38,141 +233,251 @@ async def process_events(
     Process event log file and return aggregated data.
     Supports JSONL and Parquet formats.
     """
-    try:
-        # Read file
-        if format == "jsonl":
-            content = await file.read()
-            lines = content.decode("utf-8").strip().split("\n")
-            events = [json.loads(line) for line in lines if line]
-        elif format == "parquet":
-            df = pd.read_parquet(file.file)
-            events = df.to_dict("records")
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    if format not in ("jsonl", "parquet"):
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
 
-        # Process events
-        processed = processor.process_events(events)
-        
-        return JSONResponse(content={
-            "status": "success",
-            "events_processed": len(events),
-            "processed_data": processed,
-        })
+    with phase("read_body"):
+        content = await file.read()
+    result = await _offload(tasks.process_events, content, format)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return TimedJSONResponse(content={"status": "success", **result})
 
 
-@app.post("/sna/analyze")
+@app.post("/sna/analyze", openapi_extra=EVENTS_BODY)
 async def analyze_sna(
-    events: List[Dict[str, Any]],
+    events: Union[EncodedEvents, DatasetRef] = Depends(read_conditional_events),
     window_size: Optional[int] = None,
 ):
     """
     Perform social network analysis on event data.
     
     Args:
-        events: List of event dictionaries
+        events: Event payload (JSON, Arrow IPC stream or msgpack) or dataset_id
         window_size: Optional time window for analysis
     """
-    try:
-        # Build network graph
-        graph = sna_analyzer.build_graph(events, window_size=window_size)
-        
-        # Compute metrics
-        metrics = sna_analyzer.compute_metrics(graph)
-        
-        # Community detection
-        communities = sna_analyzer.detect_communities(graph)
-        
-        return JSONResponse(content={
-            "status": "success",
-            "nodes": len(graph.nodes()),
-            "edges": len(graph.edges()),
-            "metrics": metrics,
-            "communities": communities,
-        })
+    result = await _offload(tasks.analyze_sna, events, window_size)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return TimedJSONResponse(content={"status": "success", **result})
 
 
-@app.post("/sna/centrality")
+@app.post("/sna/centrality", openapi_extra=EVENTS_BODY)
 async def compute_centrality(
-    events: List[Dict[str, Any]],
+    events: Union[EncodedEvents, DatasetRef] = Depends(read_conditional_events),
     metric: str = "all",
 ):
     """
     Compute centrality metrics for agents.
     
     Args:
-        events: List of event dictionaries
+        events: Event payload (JSON, Arrow IPC stream or msgpack) or dataset_id
         metric: 'degree', 'betweenness', 'closeness', 'all'
     """
-    try:
-        graph = sna_analyzer.build_graph(events)
-        centrality = sna_analyzer.compute_centrality(graph, metric=metric)
-        
-        return JSONResponse(content={
-            "status": "success",
-            "centrality": centrality,
-        })
+    result = await _offload(tasks.compute_centrality, events, metric)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return TimedJSONResponse(content={"status": "success", **result})
 
 
-@app.post("/stats/correlate")
+@app.post("/stats/correlate", openapi_extra=EVENTS_BODY)
 async def correlate_metrics(
-    events: List[Dict[str, Any]],
+    events: Union[EncodedEvents, DatasetRef] = Depends(read_conditional_events),
     target_metric: str = "win_rate",
 ):
     """
     Correlate SNA metrics with performance metrics.
     
     Args:
-        events: List of event dictionaries
+        events: Event payload (JSON, Arrow IPC stream or msgpack) or dataset_id
         target_metric: 'win_rate', 'episode_return', etc.
     """
-    try:
-        # Build graph and compute SNA metrics
-        graph = sna_analyzer.build_graph(events)
-        sna_metrics = sna_analyzer.compute_metrics(graph)
-        
-        # Correlate with performance
-        correlations = stats_analyzer.correlate_with_performance(
-            sna_metrics,
-            events,
-            target_metric=target_metric,
-        )
-        
-        return JSONResponse(content={
-            "status": "success",
-            "correlations": correlations,
-        })
+    result = await _offload(tasks.correlate_metrics, events, target_metric)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return TimedJSONResponse(content={"status": "success", **result})
 
 
-@app.post("/stats/learning-curves")
+@app.post("/stats/learning-curves", openapi_extra=EVENTS_BODY)
 async def analyze_learning_curves(
-    events: List[Dict[str, Any]],
+    events: Union[EncodedEvents, DatasetRef] = Depends(read_conditional_events),
     metric: str = "episode_return",
 ):
     """
     Analyze learning curves and return distributions.
     """
+    result = await _offload(tasks.analyze_learning_curves, events, metric)
+
+    return TimedJSONResponse(content={"status": "success", **result})
+
+
+@app.post("/sna/pairs", openapi_extra=EVENTS_BODY)
+async def stream_pairs(
+    events: Union[EncodedEvents, DatasetRef] = Depends(read_conditional_events),
+    window_size: Optional[int] = None,
+    format: str = "ndjson",
+    batch_rows: int = Query(DEFAULT_BATCH_ROWS, ge=1, le=MAX_BATCH_ROWS),
+):
+    """
+    Stream per-pair interaction weights, one row per agent pair and event type.
+    
+    Args:
+        events: Event payload (JSON, Arrow IPC stream or msgpack) or dataset_id
+        window_size: Optional time window for analysis
+        format: 'ndjson' or 'arrow' (Arrow IPC stream)
+        batch_rows: Rows per streamed chunk (1 to MAX_BATCH_ROWS)
+    """
+    return await _stream(tasks.stream_pairs, format, events, window_size, format, batch_rows)
+
+
+@app.post("/stats/episodes", openapi_extra=EVENTS_BODY)
+async def stream_episodes(
+    events: Union[EncodedEvents, DatasetRef] = Depends(read_conditional_events),
+    rolling_window: int = 100,
+    format: str = "ndjson",
+    batch_rows: int = Query(DEFAULT_BATCH_ROWS, ge=1, le=MAX_BATCH_ROWS),
+):
+    """
+    Stream per-episode metrics with a rolling mean of the episode return.
+    
+    Args:
+        events: Event payload (JSON, Arrow IPC stream or msgpack) or dataset_id
+        rolling_window: Episodes in the rolling mean
+        format: 'ndjson' or 'arrow' (Arrow IPC stream)
+        batch_rows: Rows per streamed chunk (1 to MAX_BATCH_ROWS)
+    """
+    return await _stream(tasks.stream_episodes, format, events, rolling_window, format, batch_rows)
+
+
+@app.post("/stats/windows", openapi_extra=EVENTS_BODY)
+async def stream_time_windows(
+    events: Union[EncodedEvents, DatasetRef] = Depends(read_conditional_events),
+    window_size: int = 100,
+    format: str = "ndjson",
+    batch_rows: int = Query(DEFAULT_BATCH_ROWS, ge=1, le=MAX_BATCH_ROWS),
+):
+    """
+    Stream event counts per time window and event type.
+    
+    Args:
+        events: Event payload (JSON, Arrow IPC stream or msgpack) or dataset_id
+        window_size: Ticks per window
+        format: 'ndjson' or 'arrow' (Arrow IPC stream)
+        batch_rows: Rows per streamed chunk (1 to MAX_BATCH_ROWS)
+    """
+    return await _stream(tasks.stream_time_windows, format, events, window_size, format, batch_rows)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    request: JobRequest = Body(...),
+):
+    """
+    Submit a long-running analysis and return immediately with a job id.
+    
+    Identical submissions that are still queued or running share one job.
+    """
+    if (request.events is None) == (request.dataset_id is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'events' or 'dataset_id'")
+    events = request.events if request.dataset_id is None else _dataset_ref(request.dataset_id)
+
     try:
-        analysis = stats_analyzer.analyze_learning_curves(events, metric=metric)
-        
-        return JSONResponse(content={
-            "status": "success",
-            "analysis": analysis,
-        })
+        # A new job pins the dataset itself for as long as it runs
+        job, deduplicated = await job_manager.submit(request.kind, events, request.params)
+    except PoolSaturatedError as e:
+        raise _too_many_requests(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if isinstance(events, DatasetRef):
+            await run_in_threadpool(dataset_registry.release, events)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return TimedJSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted",
+            "job_id": job.job_id,
+            "job_status": job.status,
+            "deduplicated": deduplicated,
+        },
+    )
+
+
+def _get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll job status and progress"""
+    return TimedJSONResponse(content=job_manager.describe(_get_job(job_id)))
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Fetch the persisted result of a finished job"""
+    job = _get_job(job_id)
+    path = job_manager.result_path(job)
+    if path is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job {job_id} has no result (status: {job.status})",
+        )
+
+    return FileResponse(path, media_type="application/json")
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = job_manager.cancel(_get_job(job_id).job_id)
+
+    return TimedJSONResponse(content={"status": "success", "job_id": job.job_id, "job_status": job.status})
+
+
+@app.post("/datasets", status_code=201, openapi_extra=EVENTS_BODY)
+async def upload_dataset(
+    events: EncodedEvents = Depends(read_body_events),
+):
+    """
+    Upload events once and reference them by dataset_id afterwards.
+    
+    Datasets are stored in columnar form under a hash of their content, so
+    uploading the same events again returns the same id.
+    """
+    meta = await _offload(tasks.store_dataset, events, str(dataset_registry.root))
+    meta = await run_in_threadpool(dataset_registry.register, meta)
+
+    return TimedJSONResponse(status_code=201, content={"status": "success", **meta})
+
+
+@app.get("/datasets")
+async def list_datasets():
+    """List stored datasets, most recently used first"""
+    return TimedJSONResponse(content={
+        "status": "success",
+        "total_bytes": dataset_registry.total_bytes,
+        "max_bytes": dataset_registry.max_bytes,
+        "datasets": dataset_registry.list(),
+    })
+
+
+@app.get("/datasets/{dataset_id}")
+async def get_dataset(dataset_id: str):
+    """Dataset metadata"""
+    meta = dataset_registry.get(dataset_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset_id}")
+
+    return TimedJSONResponse(content={"status": "success", **meta})
+
+
+@app.delete("/datasets/{dataset_id}")
+async def delete_dataset(dataset_id: str):
+    """Delete a stored dataset"""
+    if not await run_in_threadpool(dataset_registry.delete, dataset_id):
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset_id}")
+
+    return TimedJSONResponse(content={"status": "success", "dataset_id": dataset_id})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,389 @@
+"""Request instrumentation exported in the Prometheus text format
+
+``MetricsMiddleware`` times every request and records its payload sizes.
+Code running inside a request marks phases with ``phase()`` (a block) or
+``mark_phase()`` (everything until the next mark); work done in pool
+workers is captured with ``capture_phases()`` and recorded back into the
+request that submitted it. Clients can send ``X-Request-Timing: 1`` to get
+the phase breakdown of their own request in a ``Server-Timing`` header.
+
+The analytics and llm services carry identical copies of this module, as
+each image is built from its own service directory; CI fails if they drift.
+"""
+
+import bisect
+import math
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi.responses import JSONResponse
+
+# Seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Bytes
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(12))  # 256 B .. 1 GiB
+
+TIMING_REQUEST_HEADER = b"x-request-timing"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Phases = List[Tuple[str, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback at scrape time"""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_max(self, value: float, **labels):
+        """Keep the highest value seen (high-water mark)"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = max(self._values.get(key, value), value)
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        self._functions[self._key(labels)] = fn
+
+    def _samples(self) -> Iterator[str]:
+        values = dict(self._values)
+        for key, fn in self._functions.items():
+            values[key] = fn()
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts with a final +Inf bucket, sum)
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def _samples(self) -> Iterator[str]:
+        for key, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(state[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Collection of metrics rendered together on /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        # Re-registering returns the existing metric, so module reloads are harmless
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets=LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of the current process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Request latency until the last response byte",
+    ["method", "endpoint", "status"],
+)
+PHASE_LATENCY = REGISTRY.histogram(
+    "request_phase_duration_seconds",
+    "Time spent in each phase of a request or job",
+    ["endpoint", "phase"],
+)
+REQUEST_SIZE = REGISTRY.histogram(
+    "http_request_size_bytes",
+    "Request body size",
+    ["endpoint"],
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    "http_response_size_bytes",
+    "Response body size",
+    ["endpoint"],
+    buckets=SIZE_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+)
+PEAK_RSS = REGISTRY.gauge(
+    "process_peak_rss_bytes",
+    "Peak resident memory, of the API process or the largest worker",
+    ["process"],
+)
+PEAK_RSS.set_function(peak_rss_bytes, process="api")
+
+
+class Timeline:
+    """Ordered phase durations of one request, job or worker call"""
+
+    def __init__(self):
+        self.phases: Phases = []
+        self._open: Optional[Tuple[str, float]] = None
+
+    def add(self, name: str, seconds: float):
+        self.phases.append((name, seconds))
+
+    def mark(self, name: Optional[str]):
+        """End the open phase and start ``name`` (or none)"""
+        now = time.perf_counter()
+        if self._open is not None:
+            self.add(self._open[0], now - self._open[1])
+        self._open = (name, now) if name is not None else None
+
+    def close(self):
+        self.mark(None)
+
+
+_timeline: ContextVar[Optional[Timeline]] = ContextVar("metrics_timeline", default=None)
+
+
+@contextmanager
+def capture_phases() -> Iterator[Timeline]:
+    """Collect the phases marked within the block"""
+    timeline = Timeline()
+    token = _timeline.set(timeline)
+    try:
+        yield timeline
+    finally:
+        timeline.close()
+        _timeline.reset(token)
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as one phase of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+def mark_phase(name: str):
+    """Start a phase that lasts until the next mark or the end of the capture"""
+    timeline = _timeline.get()
+    if timeline is not None:
+        timeline.mark(name)
+
+
+def record_phase(name: str, seconds: float):
+    timeline = _timeline.get()
+    if timeline is not None:
+        timeline.add(name, seconds)
+
+
+def record_phases(phases: Phases):
+    for name, seconds in phases:
+        record_phase(name, seconds)
+
+
+def observe_phases(endpoint: str, phases: Phases):
+    for name, seconds in phases:
+        PHASE_LATENCY.observe(seconds, endpoint=endpoint, phase=name)
+
+
+def server_timing(phases: Phases, total: float) -> str:
+    """Format phases as a Server-Timing header value (milliseconds)"""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse whose encoding is recorded as the 'serialize' phase"""
+
+    def render(self, content: Any) -> bytes:
+        with phase("serialize"):
+            return super().render(content)
+
+
+def _route_path(scope: Dict[str, Any]) -> str:
+    """Route template for the matched endpoint, to keep label cardinality bounded"""
+    app = scope.get("app")
+    endpoint = scope.get("endpoint")
+    for route in getattr(app, "routes", ()):
+        if getattr(route, "endpoint", None) is endpoint and hasattr(route, "path"):
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, payload sizes and phases for each request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        want_timing = any(
+            name == TIMING_REQUEST_HEADER and value not in (b"", b"0", b"false")
+            for name, value in scope.get("headers", ())
+        )
+        state = {"status": 500, "request_bytes": 0, "response_bytes": 0, "endpoint": None}
+
+        def endpoint() -> str:
+            if state["endpoint"] is None:
+                state["endpoint"] = _route_path(scope)
+            return state["endpoint"]
+
+        async def receive_counted():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["request_bytes"] += len(message.get("body", b""))
+            return message
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                if want_timing:
+                    header = server_timing(timeline.phases, time.perf_counter() - started)
+                    message = {**message, "headers": list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1")),
+                    ]}
+            elif message["type"] == "http.response.body":
+                state["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        with capture_phases() as timeline:
+            try:
+                await self.app(scope, receive_counted, send_timed)
+            finally:
+                name = endpoint()
+                REQUESTS_IN_PROGRESS.dec()
+                REQUEST_LATENCY.observe(
+                    time.perf_counter() - started,
+                    method=scope["method"],
+                    endpoint=name,
+                    status=state["status"],
+                )
+                REQUEST_SIZE.observe(state["request_bytes"], endpoint=name)
+                RESPONSE_SIZE.observe(state["response_bytes"], endpoint=name)
+                observe_phases(name, timeline.phases)
@@ -0,0 +1,15 @@
+"""Pydantic models for analytics service"""
+
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
+
+
+class JobRequest(BaseModel):
+    """Request to run an analysis as a background job"""
+    kind: str = Field(
+        ...,
+        description="Job kind: 'sna_analyze', 'sna_centrality', 'stats_correlate' or 'stats_learning_curves'",
+    )
+    events: Optional[List[Dict[str, Any]]] = Field(None, description="Event logs to analyze")
+    dataset_id: Optional[str] = Field(None, description="Uploaded dataset to analyze instead of events")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Keyword parameters for the analysis")
@@ -1,6 +1,6 @@
 """Event log processing and aggregation"""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import pandas as pd
 from collections import defaultdict
 import json
@@ -64,7 +64,7 @@ class EventLogProcessor:
                     if target_agent and target_agent != agent_id:
                         pair = tuple(sorted([agent_id, target_agent]))
                         interactions[pair][event_type] += 1
-            elif target and target != agent_id:
+            elif target and pd.notna(target) and target != agent_id:
                 pair = tuple(sorted([agent_id, target]))
                 interactions[pair][event_type] += 1
 
@@ -103,6 +103,26 @@ class EventLogProcessor:
             "data": windowed,
         }
 
+    def iter_time_window_rows(
+        self,
+        df: pd.DataFrame,
+        window_size: int = 100,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield event counts per time window and event type, in window order"""
+        if "tick" not in df.columns or "event_type" not in df.columns:
+            return
+
+        windows = (df["tick"].fillna(0) // window_size).astype("int64")
+        counts = df.groupby([windows.rename("window"), df["event_type"]], sort=True).size()
+
+        for (window, event_type), count in counts.items():
+            yield {
+                "window": int(window),
+                "start_tick": int(window) * window_size,
+                "event_type": str(event_type),
+                "count": int(count),
+            }
+
     def _aggregate_by_event_type(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Aggregate events by type"""
         event_counts = df["event_type"].value_counts().to_dict()
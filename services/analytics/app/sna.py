@@ -1,9 +1,10 @@
 """Social Network Analysis using NetworkX"""
 
 import networkx as nx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Union
 from collections import defaultdict
 import numpy as np
+import pandas as pd
 
 
 class SocialNetworkAnalyzer:
@@ -23,16 +24,19 @@ class SocialNetworkAnalyzer:
 
     def build_graph(
         self,
-        events: List[Dict[str, Any]],
+        events: Union[List[Dict[str, Any]], pd.DataFrame],
         window_size: Optional[int] = None,
     ) -> nx.Graph:
         """
         Build NetworkX graph from events.
         
         Args:
-            events: List of event dictionaries
+            events: List of event dictionaries or a columnar event frame
             window_size: Optional time window for temporal analysis
         """
+        if isinstance(events, pd.DataFrame):
+            return self._build_graph_from_frame(events, window_size=window_size)
+
         G = nx.Graph()
 
         # Aggregate interactions
@@ -87,6 +91,91 @@ class SocialNetworkAnalyzer:
 
         return G
 
+    def _build_graph_from_frame(
+        self,
+        frame: pd.DataFrame,
+        window_size: Optional[int] = None,
+    ) -> nx.Graph:
+        """Vectorized build_graph for a columnar event frame"""
+        G = nx.Graph()
+        if frame.empty or "agent_id" not in frame.columns:
+            return G
+
+        if window_size and "tick" in frame.columns:
+            frame = frame[frame["tick"].fillna(0) <= window_size]
+
+        if "event_type" in frame.columns:
+            event_type = frame["event_type"].fillna("").astype(str)
+        else:
+            event_type = pd.Series("", index=frame.index)
+        type_codes, type_names = pd.factorize(event_type)
+        type_names = list(type_names)
+        if "proximity" not in type_names:
+            type_names.append("proximity")
+        proximity_code = type_names.index("proximity")
+
+        agent = frame["agent_id"].fillna("").astype(str).to_numpy(dtype=object)
+        weight = event_type.map(self.event_weights).fillna(1.0).to_numpy(dtype=float)
+
+        # One entry per (event, other agent): targets keep the event type,
+        # nearby agents count as proximity, both with the event's weight
+        order, rows, others, types = [], [], [], []
+        for column, source in (("target", 0), ("nearby_agents", 1)):
+            if column not in frame.columns:
+                continue
+            exploded = pd.Series(frame[column].to_numpy(dtype=object)).explode().dropna()
+            position = exploded.index.to_numpy()
+            other = exploded.astype(str).to_numpy(dtype=object)
+            valid = (other != "") & (other != agent[position])
+            position, other = position[valid], other[valid]
+
+            order.append(position * 2 + source)
+            rows.append(position)
+            others.append(other)
+            types.append(type_codes[position] if source == 0 else np.full(len(position), proximity_code))
+
+        if not rows or not sum(len(r) for r in rows):
+            return G
+
+        # Restore event order so nodes and edges appear as in build_graph
+        sequence = np.argsort(np.concatenate(order), kind="stable")
+        rows = np.concatenate(rows)[sequence]
+        other = np.concatenate(others)[sequence]
+        types = np.concatenate(types)[sequence]
+
+        # Sorted codes make min/max match the sorted() pair order of build_graph
+        codes, names = pd.factorize(np.concatenate([agent[rows], other]), sort=True)
+        first, second = codes[: len(rows)], codes[len(rows):]
+        low, high = np.minimum(first, second), np.maximum(first, second)
+
+        keys = (low.astype(np.int64) * len(names) + high) * len(type_names) + types
+        unique_keys, first_seen, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        sums = np.bincount(inverse.ravel(), weights=weight[rows])
+
+        for index in np.argsort(first_seen, kind="stable"):
+            pair, type_code = divmod(int(unique_keys[index]), len(type_names))
+            agent1, agent2 = names[pair // len(names)], names[pair % len(names)]
+            value = float(sums[index])
+            if G.has_edge(agent1, agent2):
+                G[agent1][agent2]["weight"] += value
+                G[agent1][agent2]["events"][type_names[type_code]] = value
+            else:
+                G.add_edge(agent1, agent2, weight=value, events={type_names[type_code]: value})
+
+        return G
+
+    def iter_pair_rows(self, graph: nx.Graph) -> Iterator[Dict[str, Any]]:
+        """Yield one row per interacting agent pair and event type"""
+        for agent1, agent2, data in graph.edges(data=True):
+            for event_type, weight in data.get("events", {}).items():
+                yield {
+                    "agent_1": agent1,
+                    "agent_2": agent2,
+                    "event_type": event_type,
+                    "weight": float(weight),
+                    "pair_weight": float(data["weight"]),
+                }
+
     def compute_metrics(self, graph: nx.Graph) -> Dict[str, Any]:
         """Compute SNA metrics for the graph"""
         if len(graph.nodes()) == 0:
@@ -118,7 +207,8 @@ class SocialNetworkAnalyzer:
         # Assortativity (homophily)
         try:
             assortativity = nx.assortativity.degree_assortativity_coefficient(graph)
-            metrics["assortativity"] = assortativity
+            # Undefined (NaN) when every node has the same degree
+            metrics["assortativity"] = assortativity if np.isfinite(assortativity) else None
         except:
             metrics["assortativity"] = None
 
@@ -1,19 +1,28 @@
 """Statistical modeling and analysis"""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Union
 import numpy as np
 import pandas as pd
 from scipy import stats
 from collections import defaultdict
 
 
+def _data_field(df: pd.DataFrame, key: str, default: Any = 0) -> pd.Series:
+    """Read ``data.<key>`` from a flattened event frame or a column of data dicts"""
+    if f"data.{key}" in df.columns:
+        return df[f"data.{key}"].fillna(default)
+    if "data" in df.columns:
+        return df["data"].map(lambda d: d.get(key, default) if isinstance(d, dict) else default)
+    return pd.Series(default, index=df.index)
+
+
 class StatisticalAnalyzer:
     """Statistical analysis and modeling"""
 
     def correlate_with_performance(
         self,
         sna_metrics: Dict[str, Any],
-        events: List[Dict[str, Any]],
+        events: Union[List[Dict[str, Any]], pd.DataFrame],
         target_metric: str = "win_rate",
     ) -> Dict[str, Any]:
         """
@@ -21,7 +30,7 @@ class StatisticalAnalyzer:
         
         Args:
             sna_metrics: SNA metrics dictionary
-            events: Event list
+            events: Event list or columnar event frame
             target_metric: 'win_rate', 'episode_return', etc.
         """
         # Extract agent performance
@@ -50,19 +59,28 @@ class StatisticalAnalyzer:
 
     def _extract_agent_performance(
         self,
-        events: List[Dict[str, Any]],
+        events: Union[List[Dict[str, Any]], pd.DataFrame],
         metric: str,
     ) -> Dict[str, float]:
         """Extract performance metrics per agent"""
         agent_stats = defaultdict(lambda: {"wins": 0, "losses": 0, "returns": []})
 
         # Process episode_end events
-        for event in events:
-            if event.get("event_type") == "episode_end":
-                winner = event.get("data", {}).get("winner", "")
-                # Extract agent IDs from winner team
-                # This is simplified - adjust based on actual event structure
-                pass
+        if isinstance(events, pd.DataFrame):
+            has_type = "event_type" in events.columns
+            episode_ends = events[events["event_type"] == "episode_end"] if has_type else events.iloc[0:0]
+            winners = _data_field(episode_ends, "winner", "").tolist()
+        else:
+            winners = [
+                event.get("data", {}).get("winner", "")
+                for event in events
+                if event.get("event_type") == "episode_end"
+            ]
+
+        for winner in winners:
+            # Extract agent IDs from winner team
+            # This is simplified - adjust based on actual event structure
+            pass
 
         # Compute win rates
         performance = {}
@@ -78,34 +96,31 @@ class StatisticalAnalyzer:
 
     def analyze_learning_curves(
         self,
-        events: List[Dict[str, Any]],
+        events: Union[List[Dict[str, Any]], pd.DataFrame],
         metric: str = "episode_return",
     ) -> Dict[str, Any]:
         """
         Analyze learning curves and return distributions.
         
         Args:
-            events: Event list
+            events: Event list or columnar event frame
             metric: Metric to analyze
         """
-        df = pd.DataFrame(events)
+        df = events if isinstance(events, pd.DataFrame) else pd.DataFrame(events)
 
         # Extract episode data
-        episode_data = []
-        current_episode = None
-
-        for _, row in df.iterrows():
-            if row.get("event_type") == "episode_end":
-                episode_data.append({
-                    "episode": row.get("tick", 0) // 1000,  # Approximate episode number
-                    "return": row.get("data", {}).get("return", 0),
-                    "duration": row.get("data", {}).get("duration", 0),
-                })
-
-        if not episode_data:
+        if "event_type" not in df.columns:
+            return {"error": "No episode data found"}
+        episodes = df[df["event_type"] == "episode_end"]
+        if episodes.empty:
             return {"error": "No episode data found"}
 
-        episode_df = pd.DataFrame(episode_data)
+        ticks = episodes["tick"].fillna(0) if "tick" in episodes.columns else pd.Series(0, index=episodes.index)
+        episode_df = pd.DataFrame({
+            "episode": (ticks // 1000).to_numpy(),  # Approximate episode number
+            "return": _data_field(episodes, "return").to_numpy(),
+            "duration": _data_field(episodes, "duration").to_numpy(),
+        })
 
         # Compute statistics
         analysis = {
@@ -134,6 +149,32 @@ class StatisticalAnalyzer:
 
         return analysis
 
+    def iter_episode_rows(
+        self,
+        events: Union[List[Dict[str, Any]], pd.DataFrame],
+        rolling_window: int = 100,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield per-episode metrics with a trailing rolling mean of the return"""
+        df = events if isinstance(events, pd.DataFrame) else pd.DataFrame(events)
+        if "event_type" not in df.columns:
+            return
+        episodes = df[df["event_type"] == "episode_end"]
+
+        ticks = episodes["tick"].fillna(0) if "tick" in episodes.columns else pd.Series(0, index=episodes.index)
+        returns = _data_field(episodes, "return").astype(float)
+        rolling = returns.rolling(window=rolling_window, min_periods=1).mean()
+        durations = _data_field(episodes, "duration").astype(float)
+
+        for index, (tick, ret, duration, mean) in enumerate(zip(ticks, returns, durations, rolling)):
+            yield {
+                "index": index,
+                "episode": int(tick) // 1000,  # Approximate episode number
+                "tick": int(tick),
+                "return": float(ret),
+                "duration": float(duration),
+                "rolling_mean": float(mean),
+            }
+
     def compute_action_entropy(
         self,
         events: List[Dict[str, Any]],
@@ -0,0 +1,85 @@
+"""Row-oriented streaming encoders for large analytics results
+
+Results are produced as an iterator of flat row dictionaries and encoded
+in fixed-size batches, so the first bytes go out as soon as the first batch
+is ready and only one batch is held in memory at a time.
+"""
+
+import json
+import math
+from io import BytesIO
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator
+
+NDJSON = "application/x-ndjson"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+MEDIA_TYPES = {
+    "ndjson": NDJSON,
+    "arrow": ARROW_STREAM,
+}
+
+DEFAULT_BATCH_ROWS = 1000
+# Upper bound on rows per chunk, so one chunk cannot hold a whole large result
+MAX_BATCH_ROWS = 100_000
+
+
+def _batches(rows: Iterable[Dict[str, Any]], batch_rows: int) -> Iterator[list]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_rows))
+        if not batch:
+            return
+        yield batch
+
+
+def _json_safe(value: Any) -> Any:
+    # NaN and infinities are not valid JSON
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def ndjson_chunks(rows: Iterable[Dict[str, Any]], batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, one chunk per batch"""
+    for batch in _batches(rows, batch_rows):
+        lines = [json.dumps({k: _json_safe(v) for k, v in row.items()}, default=str) for row in batch]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def arrow_chunks(rows: Iterable[Dict[str, Any]], batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[bytes]:
+    """Encode rows as an Arrow IPC stream, one record batch per chunk"""
+    import pyarrow as pa
+
+    buffer = BytesIO()
+    writer = None
+
+    def drain() -> bytes:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    for batch in _batches(rows, batch_rows):
+        if writer is None:
+            record_batch = pa.RecordBatch.from_pylist(batch)
+            writer = pa.ipc.new_stream(buffer, record_batch.schema)
+        else:
+            record_batch = pa.RecordBatch.from_pylist(batch, schema=record_batch.schema)
+        writer.write_batch(record_batch)
+        yield drain()
+
+    if writer is None:
+        # Empty result: still a valid stream
+        writer = pa.ipc.new_stream(buffer, pa.schema([]))
+    writer.close()
+    yield drain()
+
+
+def encode_rows(rows: Iterable[Dict[str, Any]], format: str, batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[bytes]:
+    """Encode rows in the requested streaming format ('ndjson' or 'arrow')"""
+    if format == "ndjson":
+        return ndjson_chunks(rows, batch_rows)
+    if format == "arrow":
+        return arrow_chunks(rows, batch_rows)
+    raise ValueError(f"Unsupported stream format: {format}")
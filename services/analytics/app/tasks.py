@@ -0,0 +1,227 @@
+"""Analytics computations executed inside the compute pool workers
+
+Functions here are module-level so they can be pickled into worker
+processes. pandas, networkx and scipy are only imported when a worker
+builds its analyzers, once, in ``warm_up`` or on first use; importing this
+module stays cheap for the API process, which only submits these functions.
+"""
+
+import json
+import time
+from functools import lru_cache
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Union
+
+from .codecs import EncodedEvents, as_event_frame
+from .datasets import DatasetRef, write_dataset
+from .metrics import mark_phase
+from .streaming import encode_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .processors import EventLogProcessor
+    from .sna import SocialNetworkAnalyzer
+    from .stats import StatisticalAnalyzer
+
+# Optional progress hook: progress(fraction, phase)
+ProgressCallback = Optional[Callable[[float, str], None]]
+
+# Raw request bodies and stored datasets are loaded inside the worker into a columnar frame
+Events = Union[EncodedEvents, DatasetRef, "pd.DataFrame", List[Dict[str, Any]]]
+
+
+@lru_cache(maxsize=None)
+def processor() -> "EventLogProcessor":
+    from .processors import EventLogProcessor
+
+    return EventLogProcessor()
+
+
+@lru_cache(maxsize=None)
+def sna_analyzer() -> "SocialNetworkAnalyzer":
+    from .sna import SocialNetworkAnalyzer
+
+    return SocialNetworkAnalyzer()
+
+
+@lru_cache(maxsize=None)
+def stats_analyzer() -> "StatisticalAnalyzer":
+    from .stats import StatisticalAnalyzer
+
+    return StatisticalAnalyzer()
+
+
+def warm_up() -> float:
+    """
+    Import the analysis stack and build the analyzers, returning the seconds taken.
+
+    Runs as the initializer of every pool worker, so requests never pay for it.
+    """
+    started = time.perf_counter()
+    processor()
+    sna_analyzer()
+    stats_analyzer()
+    return time.perf_counter() - started
+
+
+def _report(progress: ProgressCallback, fraction: float, phase: str):
+    mark_phase(phase)
+    if progress is not None:
+        progress(fraction, phase)
+
+
+def _load_frame(events: Events) -> "pd.DataFrame":
+    if isinstance(events, DatasetRef):
+        return events.load()
+    return as_event_frame(events)
+
+
+def process_events(content: bytes, format: str = "jsonl") -> Dict[str, Any]:
+    """Parse an uploaded event log and aggregate it"""
+    _report(None, 0.0, "parse")
+    if format == "jsonl":
+        lines = content.decode("utf-8").strip().split("\n")
+        events = [json.loads(line) for line in lines if line]
+    elif format == "parquet":
+        import pandas as pd
+
+        events = pd.read_parquet(BytesIO(content)).to_dict("records")
+    else:
+        raise ValueError(f"Unsupported format: {format}")
+
+    _report(None, 0.5, "aggregate")
+    return {
+        "events_processed": len(events),
+        "processed_data": processor().process_events(events),
+    }
+
+
+def store_dataset(events: Events, root: str) -> Dict[str, Any]:
+    """Decode an uploaded event payload and store it as a dataset"""
+    _report(None, 0.0, "load_events")
+    frame = as_event_frame(events)
+    _report(None, 0.5, "write_dataset")
+    return write_dataset(frame, root)
+
+
+def analyze_sna(
+    events: Events,
+    window_size: Optional[int] = None,
+    progress: ProgressCallback = None,
+) -> Dict[str, Any]:
+    """Build the interaction graph and compute metrics and communities"""
+    _report(progress, 0.0, "load_events")
+    frame = _load_frame(events)
+    _report(progress, 0.1, "build_graph")
+    graph = sna_analyzer().build_graph(frame, window_size=window_size)
+    _report(progress, 0.3, "compute_metrics")
+    metrics = sna_analyzer().compute_metrics(graph)
+    _report(progress, 0.8, "detect_communities")
+    communities = sna_analyzer().detect_communities(graph)
+
+    return {
+        "nodes": len(graph.nodes()),
+        "edges": len(graph.edges()),
+        "metrics": metrics,
+        "communities": communities,
+    }
+
+
+def compute_centrality(
+    events: Events,
+    metric: str = "all",
+    progress: ProgressCallback = None,
+) -> Dict[str, Any]:
+    """Compute centrality metrics for agents"""
+    _report(progress, 0.0, "load_events")
+    frame = _load_frame(events)
+    _report(progress, 0.1, "build_graph")
+    graph = sna_analyzer().build_graph(frame)
+    _report(progress, 0.3, "compute_centrality")
+    return {"centrality": sna_analyzer().compute_centrality(graph, metric=metric)}
+
+
+def correlate_metrics(
+    events: Events,
+    target_metric: str = "win_rate",
+    progress: ProgressCallback = None,
+) -> Dict[str, Any]:
+    """Correlate SNA metrics with performance metrics"""
+    _report(progress, 0.0, "load_events")
+    frame = _load_frame(events)
+    _report(progress, 0.1, "build_graph")
+    graph = sna_analyzer().build_graph(frame)
+    _report(progress, 0.3, "compute_metrics")
+    sna_metrics = sna_analyzer().compute_metrics(graph)
+    _report(progress, 0.8, "correlate")
+    correlations = stats_analyzer().correlate_with_performance(
+        sna_metrics,
+        frame,
+        target_metric=target_metric,
+    )
+    return {"correlations": correlations}
+
+
+def analyze_learning_curves(
+    events: Events,
+    metric: str = "episode_return",
+    progress: ProgressCallback = None,
+) -> Dict[str, Any]:
+    """Analyze learning curves and return distributions"""
+    _report(progress, 0.0, "load_events")
+    frame = _load_frame(events)
+    _report(progress, 0.1, "analyze_learning_curves")
+    return {"analysis": stats_analyzer().analyze_learning_curves(frame, metric=metric)}
+
+
+def stream_pairs(
+    events: Events,
+    window_size: Optional[int] = None,
+    format: str = "ndjson",
+    batch_rows: int = 1000,
+) -> Iterator[bytes]:
+    """Encoded per-pair, per-event-type interaction weights"""
+    _report(None, 0.0, "load_events")
+    frame = _load_frame(events)
+    _report(None, 0.1, "build_graph")
+    graph = sna_analyzer().build_graph(frame, window_size=window_size)
+    _report(None, 0.5, "stream_rows")
+    return encode_rows(sna_analyzer().iter_pair_rows(graph), format, batch_rows)
+
+
+def stream_episodes(
+    events: Events,
+    rolling_window: int = 100,
+    format: str = "ndjson",
+    batch_rows: int = 1000,
+) -> Iterator[bytes]:
+    """Encoded per-episode metrics"""
+    _report(None, 0.0, "load_events")
+    frame = _load_frame(events)
+    _report(None, 0.1, "stream_rows")
+    rows = stats_analyzer().iter_episode_rows(frame, rolling_window=rolling_window)
+    return encode_rows(rows, format, batch_rows)
+
+
+def stream_time_windows(
+    events: Events,
+    window_size: int = 100,
+    format: str = "ndjson",
+    batch_rows: int = 1000,
+) -> Iterator[bytes]:
+    """Encoded per-window event counts"""
+    _report(None, 0.0, "load_events")
+    frame = _load_frame(events)
+    _report(None, 0.1, "stream_rows")
+    rows = processor().iter_time_window_rows(frame, window_size=window_size)
+    return encode_rows(rows, format, batch_rows)
+
+
+# Analyses that can be submitted as background jobs, by job kind
+TASKS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "sna_analyze": analyze_sna,
+    "sna_centrality": compute_centrality,
+    "stats_correlate": correlate_metrics,
+    "stats_learning_curves": analyze_learning_curves,
+}
@@ -0,0 +1,95 @@
+"""Background warm-up and readiness
+
+Expensive start-up work (importing heavy libraries, starting worker
+processes, loading models) runs as a background task after the server is
+listening. ``/health/live`` answers as soon as the process serves
+requests; ``/health/ready`` answers 503 until every warm-up step has
+finished, so orchestrators can hold traffic back without restarting a
+slow-starting instance.
+
+Kept identical in the analytics and llm services; CI diffs the copies.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+WARM_UP_SECONDS = REGISTRY.gauge(
+    "warm_up_seconds",
+    "Duration of each start-up warm-up step",
+    ["step"],
+)
+SERVICE_READY = REGISTRY.gauge(
+    "service_ready",
+    "1 once every start-up warm-up step has finished, else 0",
+)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class WarmUp:
+    """Named start-up steps, run in order in the background"""
+
+    def __init__(self):
+        self.steps: List[Tuple[str, Callable[[], Awaitable[Any]]]] = []
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+        SERVICE_READY.set_function(lambda: 1.0 if self.ready else 0.0)
+
+    def add(self, name: str, step: Callable[[], Awaitable[Any]]):
+        """Register ``step``, an async callable; call before ``start``"""
+        self.steps.append((name, step))
+        self.status[name] = PENDING
+
+    def start(self):
+        """Run the steps in a background task (requires a running event loop)"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        for name, step in self.steps:
+            self.status[name] = RUNNING
+            started = time.perf_counter()
+            try:
+                await step()
+            except Exception as e:
+                print(f"Warm-up step {name} failed: {e}")
+                self.status[name] = FAILED
+                self.errors[name] = str(e)
+            else:
+                self.status[name] = DONE
+            WARM_UP_SECONDS.set(time.perf_counter() - started, step=name)
+        self.finished_at = time.time()
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None and all(status == DONE for status in self.status.values())
+
+    def describe(self) -> Dict[str, Any]:
+        """Readiness and per-step status, for the readiness endpoint"""
+        if self.ready:
+            status = "ready"
+        elif self.errors:
+            status = FAILED
+        else:
+            status = "starting"
+        finished_at = self.finished_at or time.time()
+        return {
+            "status": status,
+            "steps": dict(self.status),
+            "errors": dict(self.errors),
+            "warm_up_seconds": round(finished_at - self.started_at, 3),
+        }
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Benchmark event request decoding: JSON + validation vs Arrow IPC / msgpack
+
+Compares the original path (json.loads, FastAPI/pydantic validation of
+List[Dict[str, Any]], dict-based build_graph) against decoding each body
+format straight into the columnar event frame.
+
+    python benchmarks/bench_request_codecs.py --events 200000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.codecs import ARROW_STREAM, JSON, MSGPACK, decode_events, encode_arrow, events_to_frame  # noqa: E402
+from app.sna import SocialNetworkAnalyzer  # noqa: E402
+from synthetic_events import EventGenerator  # noqa: E402
+
+
+def _time(fn: Callable[[], Any], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    import msgpack
+    from pydantic import TypeAdapter
+
+    events = EventGenerator().events(args.events)
+    frame = events_to_frame(events)
+    names = sorted({name for event in events for name in event})
+    columns = {name: [event.get(name) for event in events] for name in names}
+
+    bodies = {
+        "json": (json.dumps(events).encode(), JSON),
+        "arrow": (encode_arrow(frame), ARROW_STREAM),
+        "msgpack (rows)": (msgpack.packb(events), MSGPACK),
+        "msgpack (columns)": (msgpack.packb(columns), MSGPACK),
+    }
+
+    sna = SocialNetworkAnalyzer()
+    validator = TypeAdapter(List[Dict[str, Any]])
+
+    print(f"{args.events:,} events, best of {args.repeats}\n")
+    print(f"{'path':<28}{'body MB':>10}{'decode s':>11}{'graph s':>10}{'total s':>10}")
+
+    json_body = bodies["json"][0]
+    parsed = validator.validate_python(json.loads(json_body))
+    decode = _time(lambda: validator.validate_python(json.loads(json_body)), args.repeats)
+    graph = _time(lambda: sna.build_graph(parsed), args.repeats)
+    print(
+        f"{'json + validation (before)':<28}{len(json_body) / 1e6:>10.1f}"
+        f"{decode:>11.3f}{graph:>10.3f}{decode + graph:>10.3f}"
+    )
+
+    for name, (body, media_type) in bodies.items():
+        decoded = decode_events(body, media_type)
+        decode = _time(lambda: decode_events(body, media_type), args.repeats)
+        graph = _time(lambda: sna.build_graph(decoded), args.repeats)
+        print(f"{name + ' -> frame':<28}{len(body) / 1e6:>10.1f}{decode:>11.3f}{graph:>10.3f}{decode + graph:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
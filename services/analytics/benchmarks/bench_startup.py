@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Benchmark service cold start: import time, time to live and time to ready
+
+Imports ``app.main`` in fresh interpreters and reports the wall time, the
+slowest top-level imports (from ``python -X importtime``) and, with
+``--serve``, how long a uvicorn process takes to answer ``/health/live``
+and ``/health/ready``. Uses only the standard library, so it also runs
+inside the Docker image of either service (the analytics and llm copies
+of this script are kept identical; CI diffs them):
+
+    python benchmarks/bench_startup.py --repeats 5 --serve
+    docker run --rm -v "$PWD/benchmarks:/app/benchmarks" noxus-ionia-llm:latest \
+        python benchmarks/bench_startup.py --serve
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SERVICE_DIR = Path(__file__).parent.parent
+MODULE = "app.main"
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def time_imports(repeats: int) -> List[float]:
+    """Wall seconds of ``import app.main`` in ``repeats`` fresh interpreters"""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {MODULE}"], cwd=SERVICE_DIR, check=True)
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def slowest_imports(top: int) -> List[Tuple[str, float]]:
+    """Direct imports of ``app.main`` and its dependencies by cumulative seconds, slowest first"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        cwd=SERVICE_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    modules: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        # Top-level packages and the service's own modules, not their submodules
+        if match and (len(match.group(3)) <= 3 or match.group(4).startswith("app.")):
+            name = match.group(4)
+            modules[name] = max(modules.get(name, 0.0), int(match.group(2)) / 1e6)
+    return sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def free_port() -> int:
+    """A local port nothing is listening on, so benchmarks of both services can run at once"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _status(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=1.0) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def time_serve(port: int, timeout: float) -> Dict[str, Optional[float]]:
+    """Seconds from launching uvicorn until /health/live and /health/ready answer 200"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{MODULE}:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE_DIR,
+        env=os.environ.copy(),
+    )
+    timings: Dict[str, Optional[float]] = {"live": None, "ready": None}
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline and timings["ready"] is None:
+            for probe in ("live", "ready"):
+                if timings[probe] is None and _status(f"http://127.0.0.1:{port}/health/{probe}") == 200:
+                    timings[probe] = time.perf_counter() - started
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters timed importing the app")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports listed")
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn until live and ready")
+    parser.add_argument("--port", type=int, default=None, help="Port for --serve (default: a free one)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for readiness")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object, for tracking across builds")
+    args = parser.parse_args()
+
+    imports = time_imports(args.repeats)
+    slowest = slowest_imports(args.top)
+    report = {
+        "python": sys.version.split()[0],
+        "import_seconds_min": min(imports),
+        "import_seconds_median": statistics.median(imports),
+        "slowest_imports": dict(slowest),
+    }
+    if args.serve:
+        serve = time_serve(args.port or free_port(), args.timeout)
+        report["live_seconds"] = serve["live"]
+        report["ready_seconds"] = serve["ready"]
+
+    if args.json:
+        print(json.dumps(report))
+        return
+
+    print(f"import {MODULE}: min {min(imports) * 1000:.0f} ms, median {statistics.median(imports) * 1000:.0f} ms")
+    for name, seconds in slowest:
+        print(f"  {name:<40}{seconds * 1000:9.1f} ms")
+    if args.serve:
+        for probe in ("live", "ready"):
+            seconds = report[f"{probe}_seconds"]
+            print(f"/health/{probe:<6}" + (f"{seconds:8.2f} s" if seconds is not None else "  timed out"))
+
+
+if __name__ == "__main__":
+    main()
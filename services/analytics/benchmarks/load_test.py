@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""Load test every analytics endpoint at a fixed concurrency
+
+Generates a synthetic event stream once, then for each endpoint sends
+``--requests`` requests with ``--concurrency`` in flight and reports
+throughput, latency percentiles (time to first byte as well for streaming
+endpoints), error counts and the service's peak RSS from ``/metrics``.
+
+    # Against a running service
+    python benchmarks/load_test.py --url http://localhost:8001 --events 200000 --concurrency 8
+
+    # Start a local service for the run, with Arrow bodies and an uploaded dataset
+    ANALYTICS_WORKERS=4 python benchmarks/load_test.py --spawn --body-format arrow --use-dataset
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic_events import EventGenerator, to_records  # noqa: E402
+
+SERVICE_DIR = Path(__file__).parent.parent
+
+# name -> (path, query parameters, request kind)
+ENDPOINTS = {
+    "process_events": ("/process-events", {"format": "jsonl"}, "upload"),
+    "sna_analyze": ("/sna/analyze", {}, "events"),
+    "sna_centrality": ("/sna/centrality", {"metric": "all"}, "events"),
+    "stats_correlate": ("/stats/correlate", {}, "events"),
+    "stats_learning_curves": ("/stats/learning-curves", {}, "events"),
+    "sna_pairs": ("/sna/pairs", {"format": "ndjson"}, "stream"),
+    "stats_episodes": ("/stats/episodes", {"format": "ndjson"}, "stream"),
+    "stats_windows": ("/stats/windows", {"format": "ndjson", "window_size": 10}, "stream"),
+    "datasets": ("/datasets", {}, "events"),
+    "jobs": ("/jobs", {}, "job"),
+}
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "msgpack": "application/msgpack",
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Payloads:
+    """Request bodies for every endpoint, encoded once up front"""
+
+    def __init__(self, generator: EventGenerator, num_events: int, body_format: str):
+        import pyarrow as pa
+
+        table = pa.Table.from_batches(list(generator.batches(num_events)))
+        self.num_events = num_events
+        self.events = [event for batch in table.to_batches() for event in to_records(batch)]
+        self.jsonl = "\n".join(json.dumps(event) for event in self.events).encode()
+
+        if body_format == "json":
+            self.body = json.dumps(self.events).encode()
+        elif body_format == "arrow":
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            self.body = sink.getvalue().to_pybytes()
+        else:
+            import msgpack
+
+            self.body = msgpack.packb(self.events)
+        self.content_type = CONTENT_TYPES[body_format]
+
+
+class Result:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.ttfb: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.bytes_received = 0
+        self.errors: List[str] = []
+        self.elapsed = 0.0
+        self.peak_rss: Dict[str, float] = {}
+
+    def record(self, status: int, latency: float, size: int, ttfb: Optional[float] = None):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if 200 <= status < 300:
+            self.latencies.append(latency)
+            self.bytes_received += size
+            if ttfb is not None:
+                self.ttfb.append(ttfb)
+
+    def summary(self, num_events: int) -> Dict[str, Any]:
+        ok = len(self.latencies)
+        return {
+            "endpoint": self.name,
+            "requests": sum(self.statuses.values()),
+            "ok": ok,
+            "statuses": self.statuses,
+            "throughput_rps": ok / self.elapsed if self.elapsed else 0.0,
+            "events_per_second": ok * num_events / self.elapsed if self.elapsed else 0.0,
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p90": percentile(self.latencies, 90),
+            "latency_p99": percentile(self.latencies, 99),
+            "latency_max": max(self.latencies) if self.latencies else float("nan"),
+            "ttfb_p50": percentile(self.ttfb, 50) if self.ttfb else None,
+            "ttfb_p99": percentile(self.ttfb, 99) if self.ttfb else None,
+            "mb_received": self.bytes_received / 1e6,
+            "peak_rss_mb": {name: value / 1e6 for name, value in self.peak_rss.items()},
+            "errors": self.errors[:5],
+        }
+
+
+async def scrape_peak_rss(client) -> Dict[str, float]:
+    """Read process_peak_rss_bytes samples from /metrics"""
+    try:
+        response = await client.get("/metrics")
+    except Exception:
+        return {}
+    peaks = {}
+    for match in re.finditer(r'^process_peak_rss_bytes\{process="(\w+)"\} (\S+)$', response.text, re.MULTILINE):
+        peaks[match.group(1)] = float(match.group(2))
+    return peaks
+
+
+async def send(client, name: str, payloads: Payloads, dataset_id: Optional[str], index: int, result: Result):
+    path, params, kind = ENDPOINTS[name]
+    params = dict(params)
+    headers = {"Content-Type": payloads.content_type}
+    started = time.perf_counter()
+
+    if kind == "upload":
+        response = await client.post(path, params=params, files={"file": ("events.jsonl", payloads.jsonl)})
+        result.record(response.status_code, time.perf_counter() - started, len(response.content))
+    elif kind == "job":
+        # Distinct parameters per request, otherwise identical jobs are deduplicated
+        job = {"kind": "sna_analyze", "params": {"window_size": 10**12 + index}}
+        if dataset_id:
+            job["dataset_id"] = dataset_id
+        else:
+            job["events"] = payloads.events
+        response = await client.post(path, json=job)
+        if response.status_code != 202:
+            result.record(response.status_code, time.perf_counter() - started, 0)
+            return
+        job_id = response.json()["job_id"]
+        while True:
+            status = (await client.get(f"/jobs/{job_id}")).json()["status"]
+            if status in ("succeeded", "failed", "cancelled"):
+                break
+            await asyncio.sleep(0.05)
+        response = await client.get(f"/jobs/{job_id}/result")
+        result.record(response.status_code, time.perf_counter() - started, len(response.content))
+    else:
+        content = payloads.body
+        if dataset_id and name != "datasets":
+            params["dataset_id"] = dataset_id
+            content = None
+        async with client.stream("POST", path, params=params, content=content, headers=headers) as response:
+            ttfb = None
+            size = 0
+            head = b""
+            async for chunk in response.aiter_bytes():
+                if ttfb is None:
+                    ttfb = time.perf_counter() - started
+                    head = chunk[:200]
+                size += len(chunk)
+            result.record(
+                response.status_code,
+                time.perf_counter() - started,
+                size,
+                ttfb if kind == "stream" else None,
+            )
+        if not 200 <= response.status_code < 300 and len(result.errors) < 5:
+            result.errors.append(f"{response.status_code}: {head.decode(errors='replace')}")
+        return
+
+    if not 200 <= response.status_code < 300 and len(result.errors) < 5:
+        result.errors.append(f"{response.status_code}: {response.text[:200]}")
+
+
+async def run_endpoint(client, name: str, payloads: Payloads, dataset_id: Optional[str], args) -> Result:
+    result = Result(name)
+    counter = iter(range(args.requests))
+
+    async def worker():
+        for index in counter:
+            try:
+                await send(client, name, payloads, dataset_id, index, result)
+            except Exception as e:
+                result.statuses[0] = result.statuses.get(0, 0) + 1
+                result.errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    result.elapsed = time.perf_counter() - started
+    result.peak_rss = await scrape_peak_rss(client)
+    return result
+
+
+def spawn_service(port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE_DIR,
+        env=os.environ.copy(),
+    )
+
+
+async def wait_until_ready(client, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Service did not become ready")
+
+
+def print_table(summaries: List[Dict[str, Any]]):
+    header = (
+        f"{'endpoint':<24}{'ok/total':>10}{'req/s':>9}{'Mev/s':>8}{'p50 ms':>9}"
+        f"{'p90 ms':>9}{'p99 ms':>9}{'ttfb p50':>10}{'rss api MB':>12}{'rss wkr MB':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        ttfb = f"{s['ttfb_p50'] * 1000:>10.1f}" if s["ttfb_p50"] is not None else f"{'-':>10}"
+        print(
+            f"{s['endpoint']:<24}{s['ok']:>5}/{s['requests']:<4}{s['throughput_rps']:>9.2f}"
+            f"{s['events_per_second'] / 1e6:>8.2f}{s['latency_p50'] * 1000:>9.1f}"
+            f"{s['latency_p90'] * 1000:>9.1f}{s['latency_p99'] * 1000:>9.1f}{ttfb}"
+            f"{s['peak_rss_mb'].get('api', float('nan')):>12.0f}"
+            f"{s['peak_rss_mb'].get('worker', float('nan')):>12.0f}"
+        )
+        for status, count in sorted(s["statuses"].items()):
+            if not 200 <= status < 300:
+                print(f"{'':<24}{count} x {'connection error' if status == 0 else status}")
+
+
+async def main_async(args):
+    import httpx
+
+    generator = EventGenerator(
+        agents_per_team=args.agents_per_team,
+        episode_length=args.episode_length,
+        seed=args.seed,
+    )
+    print(f"Generating {args.events:,} events ...", file=sys.stderr)
+    payloads = Payloads(generator, args.events, args.body_format)
+    print(f"Body: {len(payloads.body) / 1e6:.1f} MB {args.body_format}", file=sys.stderr)
+
+    process = spawn_service(args.port) if args.spawn else None
+    url = f"http://127.0.0.1:{args.port}" if args.spawn else args.url
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+
+    try:
+        async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+            await wait_until_ready(client)
+
+            dataset_id = None
+            if args.use_dataset:
+                response = await client.post(
+                    "/datasets", content=payloads.body, headers={"Content-Type": payloads.content_type}
+                )
+                response.raise_for_status()
+                dataset_id = response.json()["dataset_id"]
+                print(f"Dataset {dataset_id}", file=sys.stderr)
+
+            summaries = []
+            for name in args.endpoints:
+                print(f"{name} ...", file=sys.stderr)
+                result = await run_endpoint(client, name, payloads, dataset_id, args)
+                summaries.append(result.summary(args.events))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print(f"\n{args.events:,} events, {args.requests} requests per endpoint, concurrency {args.concurrency}\n")
+    print_table(summaries)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": summaries}, f, indent=2, default=str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--spawn", action="store_true", help="Start a local service for the run")
+    parser.add_argument("--port", type=int, default=8011, help="Port for --spawn")
+    parser.add_argument("--events", type=int, default=100000, help="Events per request")
+    parser.add_argument("--agents-per-team", type=int, default=5)
+    parser.add_argument("--episode-length", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--body-format", choices=list(CONTENT_TYPES), default="json")
+    parser.add_argument("--use-dataset", action="store_true", help="Upload once and send dataset_id")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument(
+        "--endpoints",
+        type=lambda value: value.split(","),
+        default=list(ENDPOINTS),
+        help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}",
+    )
+    parser.add_argument("-o", "--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
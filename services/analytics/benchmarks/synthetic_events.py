@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Synthetic Noxus/Ionia event streams in the EventLogger schema
+
+Events carry the EventLogger envelope (``tick``, ``timestamp``,
+``agent_id`` as ``<Team>_<id>``, ``team``, ``event_type``) with
+interaction targets at the top level and event details under ``data``,
+the shape the analytics service reads. Each episode ends with an
+``episode_end`` event (``winner``, ``duration``, ``return``) whose win
+rate drifts over time, so learning-curve and correlation analyses have
+something to find.
+
+Generation is vectorized in Arrow record batches, so streams of 100M
+events can be written to disk without holding them in memory:
+
+    python benchmarks/synthetic_events.py --events 100000000 --format parquet -o events.parquet
+    python benchmarks/synthetic_events.py --events 10000 --mix attack=0.3,ping=0.2 -o events.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+TEAMS = ("Noxus", "Ionia")
+
+# Share of non-episode_end events per type
+DEFAULT_EVENT_MIX = {
+    "proximity": 0.25,
+    "attack": 0.15,
+    "ping": 0.12,
+    "pickup": 0.10,
+    "deposit": 0.06,
+    "heal": 0.06,
+    "assist": 0.06,
+    "follow": 0.05,
+    "joint_attack": 0.04,
+    "pass_mana": 0.04,
+    "block": 0.02,
+    "death": 0.05,
+}
+
+# Event types whose target is a teammate; attack targets an enemy
+TEAMMATE_EVENTS = ("heal", "assist", "pass_mana", "follow", "joint_attack", "block")
+
+# Unity's fixed timestep
+SECONDS_PER_TICK = 0.02
+
+START_TIME = np.datetime64("2025-01-01T00:00:00", "us")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse 'attack=0.3,ping=0.2' into an event mix"""
+    mix = {}
+    for part in spec.split(","):
+        if part.strip():
+            name, _, share = part.partition("=")
+            mix[name.strip()] = float(share)
+    return mix
+
+
+class EventGenerator:
+    """
+    Deterministic generator of synthetic match events.
+
+    Args:
+        agents_per_team: Agents on each team
+        episode_length: Ticks per episode
+        events_per_tick: Average events logged per tick
+        event_mix: Relative frequency of each event type (normalized)
+        seed: Random seed; the same seed and settings give the same stream
+    """
+
+    def __init__(
+        self,
+        agents_per_team: int = 5,
+        episode_length: int = 1000,
+        events_per_tick: float = 2.0,
+        event_mix: Optional[Dict[str, float]] = None,
+        seed: int = 0,
+    ):
+        if agents_per_team < 2:
+            raise ValueError("agents_per_team must be at least 2")
+        mix = dict(event_mix or DEFAULT_EVENT_MIX)
+        mix.pop("episode_end", None)
+        total = sum(mix.values())
+        if total <= 0:
+            raise ValueError("event_mix must have a positive share")
+
+        self.agents_per_team = agents_per_team
+        self.episode_length = episode_length
+        self.events_per_tick = events_per_tick
+        self.event_types = list(mix)
+        self.event_probs = np.array(list(mix.values()), dtype=float) / total
+        self.seed = seed
+
+        # One episode_end closes every episode's worth of events
+        self.events_per_episode = max(2, int(round(episode_length * events_per_tick)) + 1)
+
+        # Agent ids per team, -1 being the team-level id used by episode_end
+        self.agent_ids = [f"{team}_{i}" for team in TEAMS for i in range(-1, agents_per_team)]
+
+    def batches(self, num_events: int, batch_size: int = 1_000_000) -> Iterator[Any]:
+        """Yield the stream as Arrow record batches of at most ``batch_size`` events"""
+        for start in range(0, num_events, batch_size):
+            yield self._batch(start, min(batch_size, num_events - start))
+
+    def _batch(self, start: int, size: int):
+        import pyarrow as pa
+        import pyarrow.compute  # noqa: F401
+
+        # Strings are gathered from small lookup arrays by Arrow rather than built per event
+        agent_ids = pa.array(self.agent_ids)
+        teams = pa.array(TEAMS)
+        event_names = pa.array(list(self.event_types) + ["episode_end"])
+
+        def agent(team, local_id):
+            return agent_ids.take(pa.array(team * (self.agents_per_team + 1) + local_id + 1))
+
+        # Seeding per batch keeps batches independent and the stream reproducible
+        rng = np.random.default_rng([self.seed, start])
+        n_agents = self.agents_per_team
+        index = np.arange(start, start + size, dtype=np.int64)
+
+        episode = index // self.events_per_episode
+        position = index % self.events_per_episode
+        is_end = position == self.events_per_episode - 1
+        tick = episode * self.episode_length + np.minimum(
+            (position / self.events_per_tick).astype(np.int64), self.episode_length
+        )
+
+        team = rng.integers(0, 2, size)
+        local_id = rng.integers(0, n_agents, size)
+        event_code = rng.choice(len(self.event_types), size, p=self.event_probs)
+
+        # Episode outcome: Ionia starts ahead, Noxus improves as training goes on
+        noxus_win_prob = 1.0 / (1.0 + np.exp(-(episode - 200) / 100.0))
+        winner = np.where(rng.random(size) < noxus_win_prob, 0, 1)
+        team = np.where(is_end, winner, team)
+        local_id = np.where(is_end, -1, local_id)
+        event_code = np.where(is_end, len(self.event_types), event_code)
+        event_type = event_names.take(pa.array(event_code))
+
+        def is_type(*names):
+            codes = [i for i, name in enumerate(self.event_types) if name in names]
+            return np.isin(event_code, codes)
+
+        # Targets: a different teammate, or an enemy for attacks
+        is_attack = is_type("attack")
+        has_target = is_type(*TEAMMATE_EVENTS) | is_attack
+        target_team = np.where(is_attack, 1 - team, team)
+        target_id = np.where(
+            is_attack,
+            rng.integers(0, n_agents, size),
+            (local_id + rng.integers(1, n_agents, size)) % n_agents,
+        )
+
+        # Two other agents nearby for proximity events
+        is_proximity = is_type("proximity")
+        slot = (team * n_agents + local_id)[:, None] + rng.integers(1, 2 * n_agents, (size, 2))
+        slot = (slot % (2 * n_agents)).ravel()
+        offsets = np.arange(size + 1, dtype=np.int32) * 2
+        nearby_agents = pa.ListArray.from_arrays(
+            pa.array(offsets),
+            agent(slot // n_agents, slot % n_agents),
+            mask=pa.array(~is_proximity),
+        )
+
+        seconds = tick * SECONDS_PER_TICK
+        timestamp = pa.array(
+            START_TIME + (seconds * 1e6).astype("timedelta64[us]"),
+            type=pa.timestamp("us", tz="UTC"),
+        )
+
+        duration = (self.episode_length + rng.normal(0, self.episode_length * 0.05, size)) * SECONDS_PER_TICK
+        returns = np.where(winner == 0, 1.0, -1.0) + rng.normal(0, 0.25, size) + np.tanh(episode / 500.0)
+
+        def column(values, mask):
+            return pa.array(values, mask=~mask)
+
+        is_ping = is_type("ping")
+        is_death = is_type("death")
+        is_deposit = is_type("deposit")
+        is_pickup = is_type("pickup")
+
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.array(tick),
+                timestamp,
+                agent(team, local_id),
+                teams.take(pa.array(team)),
+                event_type,
+                pa.compute.if_else(pa.array(has_target), agent(target_team, target_id), None),
+                nearby_agents,
+                column(np.full(size, 25), is_attack),
+                column(np.ones(size, dtype=bool), is_attack),
+                column(rng.integers(0, 5, size), is_ping),
+                column(rng.integers(0, n_agents, size), is_death),
+                column(rng.integers(1, 6, size), is_deposit),
+                column(rng.integers(0, 1 << 20, size), is_pickup),
+                pa.compute.if_else(pa.array(is_end), teams.take(pa.array(winner)), None),
+                column(np.round(duration, 2), is_end),
+                column(np.round(returns, 3), is_end),
+            ],
+            names=[
+                "tick",
+                "timestamp",
+                "agent_id",
+                "team",
+                "event_type",
+                "target",
+                "nearby_agents",
+                "data.damage",
+                "data.is_enemy",
+                "data.intent",
+                "data.killer",
+                "data.amount",
+                "data.mana_id",
+                "data.winner",
+                "data.duration",
+                "data.return",
+            ],
+        )
+
+    def frame(self, num_events: int):
+        """The stream as one columnar event frame, as the service decodes it"""
+        import pyarrow as pa
+
+        table = pa.Table.from_batches(list(self.batches(num_events)))
+        return table.to_pandas()
+
+    def events(self, num_events: int) -> List[Dict[str, Any]]:
+        """The stream as a list of event dictionaries (JSON request body shape)"""
+        events = []
+        for batch in self.batches(num_events):
+            events.extend(to_records(batch))
+        return events
+
+
+def to_records(batch) -> Iterator[Dict[str, Any]]:
+    """Convert a record batch to event dictionaries, omitting absent fields"""
+    for row in batch.to_pylist():
+        event: Dict[str, Any] = {}
+        data: Dict[str, Any] = {}
+        for key, value in row.items():
+            if value is None:
+                continue
+            if isinstance(value, datetime):
+                value = value.isoformat().replace("+00:00", "Z")
+            if key.startswith("data."):
+                data[key[5:]] = value
+            else:
+                event[key] = value
+        if data:
+            event["data"] = data
+        yield event
+
+
+def write_events(
+    path: str,
+    generator: EventGenerator,
+    num_events: int,
+    format: str = "jsonl",
+    batch_size: int = 1_000_000,
+):
+    """Write the stream to ``path`` batch by batch"""
+    import pyarrow as pa
+
+    batches = generator.batches(num_events, batch_size)
+    if format == "jsonl":
+        with open(path, "w") as f:
+            for batch in batches:
+                f.writelines(json.dumps(event) + "\n" for event in to_records(batch))
+    elif format == "arrow":
+        first = next(batches, None)
+        if first is None:
+            return
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_stream(sink, first.schema) as writer:
+            writer.write_batch(first)
+            for batch in batches:
+                writer.write_batch(batch)
+    elif format == "parquet":
+        import pyarrow.parquet as pq
+
+        first = next(batches, None)
+        if first is None:
+            return
+        with pq.ParquetWriter(path, first.schema, compression="zstd") as writer:
+            writer.write_batch(first)
+            for batch in batches:
+                writer.write_batch(batch)
+    else:
+        raise ValueError(f"Unsupported format: {format}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--agents-per-team", type=int, default=5)
+    parser.add_argument("--episode-length", type=int, default=1000, help="Ticks per episode")
+    parser.add_argument("--events-per-tick", type=float, default=2.0)
+    parser.add_argument("--mix", type=parse_mix, default=None, help="e.g. attack=0.3,ping=0.2,proximity=0.5")
+    parser.add_argument("--format", choices=("jsonl", "arrow", "parquet"), default="jsonl")
+    parser.add_argument("--batch-size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+
+    generator = EventGenerator(
+        agents_per_team=args.agents_per_team,
+        episode_length=args.episode_length,
+        events_per_tick=args.events_per_tick,
+        event_mix=args.mix,
+        seed=args.seed,
+    )
+
+    started = time.perf_counter()
+    write_events(args.output, generator, args.events, args.format, args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(
+        f"Wrote {args.events:,} events to {args.output} in {elapsed:.1f}s "
+        f"({args.events / max(elapsed, 1e-9):,.0f} events/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
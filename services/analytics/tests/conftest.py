@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import the service as `app`, like the benchmarks do
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture
+def events():
+    """Twelve episodes of two agents, with an attack per episode"""
+    events = []
+    for episode in range(12):
+        tick = episode * 1000
+        events.append({
+            "tick": tick,
+            "agent_id": "Noxus_0",
+            "team": "Noxus",
+            "event_type": "attack",
+            "target": "Ionia_1",
+        })
+        events.append({
+            "tick": tick + 999,
+            "agent_id": "Noxus_0",
+            "team": "Noxus",
+            "event_type": "episode_end",
+            "data": {"winner": "Noxus" if episode % 3 else "Ionia", "duration": 30.0, "return": float(episode)},
+        })
+    return events
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """Client for the app running with single-worker pools and its state under tmp_path"""
+    from fastapi.testclient import TestClient
+
+    from app import main
+    from app.datasets import DatasetRegistry
+    from app.executor import ComputePool
+    from app.jobs import JobManager
+    from app.warmup import WarmUp
+
+    datasets = DatasetRegistry(root=str(tmp_path / "datasets"))
+    monkeypatch.setattr(main, "compute_pool", ComputePool(max_workers=1, name="requests"))
+    monkeypatch.setattr(main, "dataset_registry", datasets)
+    jobs = JobManager(job_dir=str(tmp_path / "jobs"), max_workers=1, datasets=datasets)
+    monkeypatch.setattr(main, "job_manager", jobs)
+    monkeypatch.setattr(main, "warm_up", WarmUp())
+    with TestClient(main.app) as client:
+        yield client
@@ -0,0 +1,98 @@
+"""Event request bodies: JSON, Arrow IPC and msgpack"""
+
+import json
+
+import msgpack
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from app.codecs import (
+    ARROW_STREAM,
+    JSON,
+    MSGPACK,
+    EventDecodeError,
+    decode_events,
+    encode_arrow,
+    events_to_frame,
+    normalize_media_type,
+)
+
+
+def columns(events):
+    keys = sorted({key for event in events for key in event})
+    return {key: [event.get(key) for event in events] for key in keys}
+
+
+def arrow_body(events):
+    """Arrow IPC stream with ``data`` as a struct column, as a client would write it"""
+    table = pa.Table.from_pydict(columns(events))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def sorted_columns(frame):
+    return frame[sorted(frame.columns)]
+
+
+@pytest.mark.parametrize(
+    "encode, media_type",
+    [
+        (arrow_body, ARROW_STREAM),
+        (lambda events: encode_arrow(events_to_frame(events)), ARROW_STREAM),
+        (lambda events: msgpack.packb(events), MSGPACK),
+        (lambda events: msgpack.packb(columns(events)), MSGPACK),
+    ],
+)
+def test_bodies_decode_to_the_json_frame(events, encode, media_type):
+    expected = sorted_columns(decode_events(json.dumps(events).encode(), JSON))
+    assert "data.winner" in expected.columns and "data" not in expected.columns
+
+    decoded = sorted_columns(decode_events(encode(events), media_type))
+    pd.testing.assert_frame_equal(decoded, expected, check_dtype=False)
+
+
+def test_media_type_aliases_and_parameters():
+    assert normalize_media_type("application/json; charset=utf-8") == JSON
+    assert normalize_media_type("application/x-arrow-stream") == ARROW_STREAM
+    assert normalize_media_type("Application/X-Msgpack") == MSGPACK
+    assert normalize_media_type("") == JSON
+    with pytest.raises(EventDecodeError, match="Unsupported content type: text/csv"):
+        normalize_media_type("text/csv")
+
+
+@pytest.mark.parametrize(
+    "body, media_type",
+    [
+        (b"{not json", JSON),
+        (b'{"event_type": "attack"}', JSON),
+        (b"not an arrow stream", ARROW_STREAM),
+        (msgpack.packb(42), MSGPACK),
+        (msgpack.packb({"tick": [1, 2], "agent_id": ["a"]}), MSGPACK),
+        (b"\xc1", MSGPACK),
+    ],
+)
+def test_malformed_bodies_raise_decode_errors(body, media_type):
+    with pytest.raises(EventDecodeError):
+        decode_events(body, media_type)
+
+
+def test_endpoints_accept_every_body_format(service, events):
+    expected = service.post("/stats/learning-curves", json=events).json()
+    assert expected["analysis"]["num_episodes"] == 12
+
+    for body, media_type in [(arrow_body(events), ARROW_STREAM), (msgpack.packb(events), MSGPACK)]:
+        response = service.post("/stats/learning-curves", content=body, headers={"Content-Type": media_type})
+        assert response.status_code == 200
+        assert response.json() == expected
+
+
+def test_unsupported_and_malformed_bodies(service, events):
+    response = service.post("/stats/learning-curves", content=b"tick,agent\n1,a", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 415
+
+    response = service.post("/stats/learning-curves", content=b"garbage", headers={"Content-Type": ARROW_STREAM})
+    assert response.status_code == 400
+    assert "Invalid Arrow IPC stream" in response.json()["detail"]
@@ -0,0 +1,143 @@
+"""Response compression and conditional requests"""
+
+import gzip
+import json
+
+import pytest
+import zstandard
+
+from app.caching import etag_matches, result_etag
+from app.codecs import EncodedEvents
+from app.compression import GZIP, ZSTD, negotiate
+from app.datasets import DatasetRef
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br, zstd", ZSTD),
+        ("gzip", GZIP),
+        ("zstd;q=0.5, gzip;q=0.8", GZIP),
+        ("zstd;q=0, gzip", GZIP),
+        ("*", ZSTD),
+        ("gzip;q=0, *;q=0.1", ZSTD),
+        ("br, deflate", None),
+        ("", None),
+    ],
+)
+def test_negotiate_prefers_zstd_among_accepted_encodings(accept_encoding, expected):
+    assert negotiate(accept_encoding) == expected
+
+
+def test_negotiate_falls_back_to_gzip_without_zstandard():
+    assert negotiate("zstd, gzip", available=(GZIP,)) == GZIP
+    assert negotiate("zstd", available=(GZIP,)) is None
+
+
+def crowd():
+    """Events whose SNA result is well over the compression threshold"""
+    return [
+        {"tick": i, "agent_id": f"Noxus_{i % 40}", "team": "Noxus", "event_type": "attack", "target": f"Ionia_{i % 13}"}
+        for i in range(200)
+    ]
+
+
+def post_raw(client, path, **kwargs):
+    """Headers and still-encoded body, as a client without decompression sees them"""
+    with client.stream("POST", path, **kwargs) as response:
+        return response.headers, b"".join(response.iter_raw())
+
+
+def decode(headers, body):
+    encoding = headers.get("content-encoding")
+    if encoding == GZIP:
+        return gzip.decompress(body)
+    if encoding == ZSTD:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return body
+
+
+@pytest.mark.parametrize("encoding", [GZIP, ZSTD])
+def test_json_responses_are_compressed_when_accepted(service, encoding):
+    body = crowd()
+    plain_headers, plain = post_raw(service, "/sna/centrality", json=body, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain_headers
+    assert len(plain) > 1024
+
+    headers, compressed = post_raw(service, "/sna/centrality", json=body, headers={"Accept-Encoding": encoding})
+    assert headers["content-encoding"] == encoding
+    assert "Accept-Encoding" in headers["vary"]
+    assert int(headers["content-length"]) == len(compressed) < len(plain)
+    assert json.loads(decode(headers, compressed)) == json.loads(plain)
+
+
+@pytest.mark.parametrize("encoding", [GZIP, ZSTD])
+def test_streams_are_compressed_chunk_by_chunk(service, events, encoding):
+    kwargs = {"params": {"batch_rows": 2}, "json": events}
+    _, plain = post_raw(service, "/stats/episodes", headers={"Accept-Encoding": "identity"}, **kwargs)
+    headers, compressed = post_raw(service, "/stats/episodes", headers={"Accept-Encoding": encoding}, **kwargs)
+
+    assert headers["content-encoding"] == encoding
+    assert "Accept-Encoding" in headers["vary"]
+    assert "content-length" not in headers
+    assert decode(headers, compressed) == plain
+
+
+def test_small_responses_are_not_compressed(service):
+    response = service.get("/health/live", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_etag_depends_on_path_params_and_events():
+    body = EncodedEvents(b"[]")
+    etag = result_etag("/sna/analyze", [("window_size", "10")], body)
+
+    assert etag.startswith('W/"')
+    assert etag == result_etag("/sna/analyze", [("window_size", "10")], EncodedEvents(b"[]"))
+    assert etag != result_etag("/sna/analyze", [("window_size", "20")], body)
+    assert etag != result_etag("/sna/centrality", [("window_size", "10")], body)
+    assert etag != result_etag("/sna/analyze", [("window_size", "10")], EncodedEvents(b"[{}]"))
+    assert etag != result_etag("/sna/analyze", [("window_size", "10")], EncodedEvents(b"[]", "application/msgpack"))
+    assert result_etag("/sna/analyze", [], DatasetRef("abc", "x.parquet")) == result_etag(
+        "/sna/analyze", [], DatasetRef("abc", "elsewhere.parquet")
+    )
+
+
+def test_etag_matching_is_weak():
+    etag = 'W/"abc"'
+    assert etag_matches(etag, 'W/"abc"')
+    assert etag_matches(etag, '"abc"')
+    assert etag_matches(etag, '"other", W/"abc"')
+    assert etag_matches(etag, "*")
+    assert not etag_matches(etag, '"abcd"')
+
+
+def test_repeated_request_with_etag_gets_304(service, events):
+    first = service.post("/stats/learning-curves", json=events)
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+
+    repeat = service.post("/stats/learning-curves", json=events, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.headers["etag"] == etag
+    assert repeat.content == b""
+
+    changed = service.post(
+        "/stats/learning-curves", params={"metric": "win_rate"}, json=events, headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_etag_is_shared_by_every_encoding(service):
+    body = crowd()
+    gzipped = service.post("/sna/centrality", json=body, headers={"Accept-Encoding": "gzip"})
+    plain = service.post("/sna/centrality", json=body, headers={"Accept-Encoding": "identity"})
+    assert gzipped.headers["content-encoding"] == GZIP
+    assert gzipped.headers["etag"] == plain.headers["etag"]
+
+    repeat = service.post(
+        "/sna/centrality", json=body, headers={"Accept-Encoding": "zstd", "If-None-Match": plain.headers["etag"]}
+    )
+    assert repeat.status_code == 304
@@ -0,0 +1,133 @@
+"""Dataset registry: content addressing, eviction, pinning and persistence"""
+
+import time
+
+import pandas as pd
+import pytest
+
+from app.datasets import DatasetRegistry, write_dataset
+from test_jobs import wait_for
+
+
+def frame(episodes, start=0):
+    return pd.DataFrame({
+        "tick": range(start, start + episodes),
+        "event_type": ["episode_end"] * episodes,
+        "data.return": [float(i) for i in range(episodes)],
+    })
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = DatasetRegistry(root=str(tmp_path))
+    registry.start()
+    return registry
+
+
+def store(registry, episodes, start=0):
+    meta = registry.register(write_dataset(frame(episodes, start), str(registry.root)))
+    time.sleep(0.01)  # Distinct last-use times
+    return meta
+
+
+def test_identical_content_is_stored_once(registry):
+    first = store(registry, 10)
+    second = store(registry, 10)
+
+    assert second["dataset_id"] == first["dataset_id"]
+    assert second["created_at"] == first["created_at"]
+    assert second["last_used_at"] > first["last_used_at"]
+    assert len(registry.list()) == 1
+    assert len(list(registry.root.glob("*.parquet"))) == 1
+    assert store(registry, 11)["dataset_id"] != first["dataset_id"]
+
+
+def test_stored_dataset_loads_back(registry):
+    meta = store(registry, 5)
+    ref = registry.ref(meta["dataset_id"])
+    try:
+        pd.testing.assert_frame_equal(ref.load(), frame(5))
+    finally:
+        registry.release(ref)
+    assert meta["num_events"] == 5 and meta["columns"] == ["tick", "event_type", "data.return"]
+
+
+def test_least_recently_used_datasets_are_evicted(registry):
+    a, b = store(registry, 10), store(registry, 20)
+    registry.release(registry.ref(a["dataset_id"]))  # a is now the most recently used
+    registry.max_bytes = a["size_bytes"] + b["size_bytes"] * 3 // 2
+
+    c = store(registry, 20, start=100)
+
+    assert [meta["dataset_id"] for meta in registry.list()] == [c["dataset_id"], a["dataset_id"]]
+    assert registry.ref(b["dataset_id"]) is None
+    assert not (registry.root / f"{b['dataset_id']}.parquet").exists()
+
+
+def test_pinned_datasets_are_evicted_only_once_released(registry):
+    a = store(registry, 10)
+    ref = registry.ref(a["dataset_id"])
+    registry.max_bytes = 1
+
+    b = store(registry, 20)
+    c = store(registry, 30)
+    # b went instead of the pinned a; the most recently used c is always kept
+    assert {meta["dataset_id"] for meta in registry.list()} == {a["dataset_id"], c["dataset_id"]}
+    assert registry.ref(b["dataset_id"]) is None
+    pd.testing.assert_frame_equal(ref.load(), frame(10))
+
+    registry.release(ref)
+    assert [meta["dataset_id"] for meta in registry.list()] == [c["dataset_id"]]
+    assert not (registry.root / f"{a['dataset_id']}.parquet").exists()
+
+
+def test_delete_waits_for_the_last_reference(registry):
+    meta = store(registry, 10)
+    path = registry.root / f"{meta['dataset_id']}.parquet"
+    request = job = registry.ref(meta["dataset_id"])
+    registry.pin(job)
+
+    assert registry.delete(meta["dataset_id"])
+    assert registry.get(meta["dataset_id"]) is None and registry.ref(meta["dataset_id"]) is None
+    registry.release(request)
+    assert path.exists()
+    registry.release(job)
+    assert not path.exists()
+    assert not registry.delete(meta["dataset_id"])
+
+
+def test_registry_survives_a_restart(tmp_path, registry):
+    a, b, c = store(registry, 10), store(registry, 20), store(registry, 30)
+    registry.release(registry.ref(a["dataset_id"]))
+    registry.shutdown()
+    (tmp_path / f"{b['dataset_id']}.parquet").unlink()
+    (tmp_path / "leftover.parquet.123.tmp").write_bytes(b"partial")
+
+    restarted = DatasetRegistry(root=str(tmp_path))
+    restarted.start()
+
+    assert [meta["dataset_id"] for meta in restarted.list()] == [a["dataset_id"], c["dataset_id"]]
+    assert restarted.get(a["dataset_id"])["created_at"] == a["created_at"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_upload_and_analyze_by_dataset_id(service, events):
+    first = service.post("/datasets", json=events)
+    second = service.post("/datasets", json=events)
+    assert first.status_code == 201
+    dataset_id = first.json()["dataset_id"]
+    assert second.json()["dataset_id"] == dataset_id
+    assert len(service.get("/datasets").json()["datasets"]) == 1
+
+    response = service.post("/stats/learning-curves", params={"dataset_id": dataset_id})
+    assert response.status_code == 200
+    assert response.json()["analysis"]["num_episodes"] == 12
+
+    job = service.post("/jobs", json={"kind": "stats_learning_curves", "dataset_id": dataset_id}).json()
+    assert job["status"] == "accepted"
+
+    # The job keeps reading the dataset it pinned after the delete
+    assert service.delete(f"/datasets/{dataset_id}").status_code == 200
+    assert service.post("/stats/learning-curves", params={"dataset_id": dataset_id}).status_code == 404
+    assert service.get(f"/datasets/{dataset_id}").status_code == 404
+    assert wait_for(service, job["job_id"])["status"] == "succeeded"
@@ -0,0 +1,109 @@
+"""ComputePool admission, slot accounting and recovery"""
+
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.executor import ComputePool, PoolSaturatedError
+
+
+@pytest.fixture
+def pool():
+    pool = ComputePool(max_workers=1, max_queue=0, name="test")
+    yield pool
+    pool.shutdown()
+
+
+async def wait_until_idle(pool, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while pool.in_flight and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+
+def test_slot_is_released_after_success_and_failure(pool):
+    async def scenario():
+        assert await pool.run(divmod, 7, 2) == (3, 1)
+        assert pool.in_flight == 0
+        with pytest.raises(ValueError):
+            await pool.run(int, "seven")
+        assert pool.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_saturated_pool_rejects_with_retry_after(pool):
+    async def scenario():
+        busy = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+        await asyncio.sleep(0)
+        assert pool.in_flight == 1
+        with pytest.raises(PoolSaturatedError) as rejected:
+            await pool.run(divmod, 1, 1)
+        assert rejected.value.retry_after >= 1
+
+        await busy
+        assert pool.in_flight == 0
+        assert await pool.run(divmod, 1, 1) == (1, 0)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_run_keeps_its_slot_until_the_worker_finishes(pool):
+    async def scenario():
+        await pool.warm_up()
+        task = asyncio.ensure_future(pool.run(time.sleep, 1.0))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The worker is still sleeping, so its slot is still taken
+        assert pool.in_flight == 1
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(divmod, 1, 1)
+
+        await wait_until_idle(pool)
+        assert pool.in_flight == 0
+        assert await pool.run(divmod, 1, 1) == (1, 0)
+
+    asyncio.run(scenario())
+
+
+def test_pool_recovers_after_a_worker_dies(pool):
+    async def scenario():
+        with pytest.raises(BrokenProcessPool):
+            await pool.run(os._exit, 1)
+        assert pool.in_flight == 0
+        assert await pool.run(divmod, 9, 4) == (2, 1)
+
+    asyncio.run(scenario())
+
+
+def test_stream_yields_every_chunk_and_releases_its_slot(pool):
+    async def scenario():
+        chunks = [chunk async for chunk in pool.stream(range, 3)]
+        assert chunks == [0, 1, 2]
+        await wait_until_idle(pool)
+        assert pool.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_saturated_endpoint_answers_429_with_retry_after(monkeypatch, pool, events):
+    monkeypatch.setattr(main, "compute_pool", pool)
+    client = TestClient(main.app)
+
+    pool.acquire()  # A task holding the only worker, with no queue behind it
+    response = client.post("/stats/learning-curves", json=events)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    pool.release()
+    response = client.post("/stats/learning-curves", json=events)
+    assert response.status_code == 200
+    assert response.json()["analysis"]["num_episodes"] == 12
+    assert pool.in_flight == 0
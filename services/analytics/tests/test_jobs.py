@@ -0,0 +1,153 @@
+"""Background jobs: submission, polling, results, cancellation and restarts"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.executor import PoolSaturatedError
+from app.jobs import CANCELLED, FAILED, FINISHED_STATES, RUNNING, SUCCEEDED, Job, JobManager, check_params
+
+
+def wait_for(client, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = client.get(f"/jobs/{job_id}").json()
+        if info["status"] in FINISHED_STATES:
+            return info
+        time.sleep(0.1)
+    raise AssertionError(f"Job {job_id} did not finish: {info}")
+
+
+def test_submit_poll_and_fetch_result(service, events):
+    response = service.post("/jobs", json={"kind": "stats_learning_curves", "events": events})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["deduplicated"] is False
+
+    info = wait_for(service, job_id)
+    assert info["status"] == SUCCEEDED
+    assert info["progress"] == 1.0 and info["phase"] == "done"
+
+    result = service.get(f"/jobs/{job_id}/result").json()
+    assert result["status"] == "success"
+    assert result["analysis"]["num_episodes"] == 12
+
+
+def test_identical_submissions_share_a_job(service, events):
+    body = {"kind": "stats_learning_curves", "events": events, "params": {"metric": "episode_return"}}
+    first = service.post("/jobs", json=body).json()
+    second = service.post("/jobs", json=body).json()
+
+    assert second["job_id"] == first["job_id"]
+    assert second["deduplicated"] is True
+    wait_for(service, first["job_id"])
+    third = service.post("/jobs", json=body).json()
+    assert third["job_id"] != first["job_id"] and third["deduplicated"] is False
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"bogus": 1}, {"events": []}, {"progress": None}],
+)
+def test_invalid_params_are_rejected_before_the_job_runs(service, events, params):
+    response = service.post("/jobs", json={"kind": "stats_learning_curves", "events": events, "params": params})
+    assert response.status_code == 400
+    assert "Invalid params" in response.json()["detail"]
+
+
+def test_unknown_jobs_and_missing_results(service, events):
+    assert service.post("/jobs", json={"kind": "bogus", "events": events}).status_code == 400
+    assert service.post("/jobs", json={"kind": "sna_analyze"}).status_code == 400
+    assert service.get("/jobs/nope").status_code == 404
+    assert service.delete("/jobs/nope").status_code == 404
+
+
+def test_check_params_binds_against_the_task_signature():
+    check_params("sna_analyze", {"window_size": 10})
+    check_params("stats_correlate", {})
+    with pytest.raises(ValueError):
+        check_params("sna_centrality", {"window_size": 10})
+
+
+def test_accepted_jobs_hold_their_slot_and_overflow_is_rejected(tmp_path, events):
+    manager = JobManager(job_dir=str(tmp_path), max_workers=1, max_queue=1)
+
+    async def scenario():
+        manager.start()
+        first, _ = await manager.submit("stats_learning_curves", events, {})
+        second, _ = await manager.submit("stats_learning_curves", events, {"metric": "win_rate"})
+        assert manager.pool.in_flight == 2
+        with pytest.raises(PoolSaturatedError):
+            await manager.submit("sna_analyze", events, {})
+        assert len(manager.jobs) == 2
+
+        await asyncio.gather(*manager._runners.values())
+        assert manager.pool.in_flight == 0
+        # Both were admitted, so neither fails for lack of capacity
+        assert first.status == SUCCEEDED and second.status == SUCCEEDED
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        manager.shutdown()
+
+
+def test_cancel_before_the_job_starts_returns_its_slot(tmp_path, events):
+    manager = JobManager(job_dir=str(tmp_path), max_workers=1, max_queue=0)
+
+    async def scenario():
+        manager.start()
+        job, _ = await manager.submit("stats_learning_curves", events, {})
+        assert manager.cancel(job.job_id).status == CANCELLED
+        await asyncio.sleep(0.1)
+        assert manager.pool.in_flight == 0
+        assert not manager._runners
+
+        # The fingerprint is free again
+        again, deduplicated = await manager.submit("stats_learning_curves", events, {})
+        assert not deduplicated and again.job_id != job.job_id
+        manager.cancel(again.job_id)
+        await asyncio.sleep(0.1)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        manager.shutdown()
+    assert manager.pool.in_flight == 0
+
+
+def test_cancel_via_api(service, events):
+    job_id = service.post("/jobs", json={"kind": "stats_learning_curves", "events": events}).json()["job_id"]
+    response = service.delete(f"/jobs/{job_id}")
+    assert response.json()["job_status"] == CANCELLED
+
+    assert wait_for(service, job_id)["status"] == CANCELLED
+    assert service.get(f"/jobs/{job_id}/result").status_code == 409
+
+
+def test_restart_fails_interrupted_jobs_and_keeps_finished_ones(tmp_path):
+    def persist(job):
+        (tmp_path / job.job_id).mkdir()
+        (tmp_path / job.job_id / "job.json").write_text(json.dumps(job.to_dict()))
+
+    now = time.time()
+    persist(Job("running", "sna_analyze", {}, "a", status=RUNNING))
+    persist(Job("done", "sna_analyze", {}, "b", status=SUCCEEDED, finished_at=now))
+    persist(Job("expired", "sna_analyze", {}, "c", status=SUCCEEDED, finished_at=now - 7200))
+    (tmp_path / "done" / "result.json").write_text(json.dumps({"status": "success"}))
+
+    manager = JobManager(job_dir=str(tmp_path), max_workers=1, ttl_seconds=3600)
+    manager.start()
+    try:
+        assert manager.get("running").status == FAILED
+        assert manager.get("running").error == "Interrupted by service restart"
+        assert json.loads((tmp_path / "running" / "job.json").read_text())["status"] == FAILED
+        assert manager.result_path(manager.get("done")) == tmp_path / "done" / "result.json"
+        assert manager.get("expired") is None and not (tmp_path / "expired").exists()
+
+        # Interrupted jobs no longer block identical resubmissions
+        assert "a" not in manager._in_flight
+    finally:
+        manager.shutdown()
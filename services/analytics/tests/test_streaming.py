@@ -0,0 +1,83 @@
+"""Streamed results: NDJSON and Arrow IPC encodings and the streaming endpoints"""
+
+import json
+
+import pyarrow as pa
+import pytest
+
+from app.streaming import ARROW_STREAM, MAX_BATCH_ROWS, NDJSON, arrow_chunks, encode_rows, ndjson_chunks
+
+ROWS = [{"index": i, "value": float(i) / 2} for i in range(7)]
+
+
+def test_ndjson_chunks_hold_batch_rows_lines():
+    chunks = list(ndjson_chunks(ROWS, batch_rows=3))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [3, 3, 1]
+    assert [json.loads(line) for chunk in chunks for line in chunk.splitlines()] == ROWS
+
+
+def test_ndjson_writes_non_finite_floats_as_null():
+    (chunk,) = ndjson_chunks([{"a": float("nan"), "b": float("inf"), "c": 1.5}])
+    assert json.loads(chunk) == {"a": None, "b": None, "c": 1.5}
+
+
+def test_arrow_chunks_form_one_stream_of_record_batches():
+    chunks = list(arrow_chunks(ROWS, batch_rows=3))
+    reader = pa.ipc.open_stream(b"".join(chunks))
+
+    assert [batch.num_rows for batch in reader] == [3, 3, 1]
+    assert pa.ipc.open_stream(b"".join(chunks)).read_all().to_pylist() == ROWS
+
+
+def test_empty_results_are_still_valid_streams():
+    assert list(ndjson_chunks([])) == []
+    assert pa.ipc.open_stream(b"".join(arrow_chunks([]))).read_all().num_rows == 0
+    with pytest.raises(ValueError):
+        encode_rows(ROWS, "csv")
+
+
+def test_episode_stream_as_ndjson(service, events):
+    response = service.post("/stats/episodes", params={"batch_rows": 5, "rolling_window": 2}, json=events)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(NDJSON)
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["index"] for row in rows] == list(range(12))
+    assert rows[3] == {
+        "index": 3,
+        "episode": 3,
+        "tick": 3999,
+        "return": 3.0,
+        "duration": 30.0,
+        "rolling_mean": 2.5,
+    }
+
+
+def test_episode_stream_as_arrow(service, events):
+    response = service.post("/stats/episodes", params={"batch_rows": 5, "format": "arrow"}, json=events)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == ARROW_STREAM
+    batches = list(pa.ipc.open_stream(response.content))
+    assert [batch.num_rows for batch in batches] == [5, 5, 2]
+    assert batches[0].schema.names == ["index", "episode", "tick", "return", "duration", "rolling_mean"]
+
+
+@pytest.mark.parametrize("path", ["/sna/pairs", "/stats/windows"])
+def test_other_streams_share_the_row_encoding(service, events, path):
+    response = service.post(path, params={"format": "arrow"}, json=events)
+
+    assert response.status_code == 200
+    assert pa.ipc.open_stream(response.content).read_all().num_rows > 0
+
+
+@pytest.mark.parametrize("batch_rows", [0, -1, MAX_BATCH_ROWS + 1])
+def test_out_of_range_batch_rows_is_rejected(service, events, batch_rows):
+    response = service.post("/stats/episodes", params={"batch_rows": batch_rows}, json=events)
+    assert response.status_code == 422
+
+
+def test_unknown_stream_format_is_rejected(service, events):
+    response = service.post("/stats/episodes", params={"format": "csv"}, json=events)
+    assert response.status_code == 400
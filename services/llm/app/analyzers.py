@@ -1,19 +1,123 @@
 """Post-game analysis using LLMs"""
 
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Tuple, Union
+import asyncio
+import heapq
 import json
+import os
+
+from .cache import ResponseCache, fingerprint
+from .metrics import mark_phase, phase
+from .pipelines import PipelinePool, pipeline_pool
+from .providers import ProviderError, ProviderRegistry, provider_registry
+from .singleflight import SingleFlight
+
+# Bump whenever _build_analysis_prompt changes, so cached analyses are not reused
+PROMPT_VERSION = "2"
+
+# Key events in order of importance; higher priorities survive when the match has too many
+KEY_EVENT_PRIORITY = {"episode_end": 2, "deposit": 1, "death": 0}
+KEY_EVENT_LIMIT = int(os.getenv("LLM_KEY_EVENTS", 10))
+
+# Prompt size in tokens; local models count the prompt against max_length,
+# so a smaller prompt leaves room to generate and generates faster
+PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", 300))
+# Rough characters per token of English text and compact JSON
+CHARS_PER_TOKEN = 4
+
+# Shared by single and batched local generation
+HF_GENERATION_KWARGS = {"max_length": 500, "num_return_sequences": 1}
+
+FALLBACK_ANALYSIS = (
+    "LLM analysis unavailable. Using template-based summary. "
+    "Set OPENAI_API_KEY or install transformers for full analysis."
+)
+
+ANALYST_SYSTEM_PROMPT = "You are an expert game analyst specializing in team-based strategy games."
+
+
+def extract_statistics(
+    events: Iterable[Dict[str, Any]],
+    max_key_events: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Extract key statistics from events in a single pass.
+
+    Memory does not grow with the match: events are counted per team and
+    type, and only the ``max_key_events`` most important key events are
+    kept (episode ends before deposits before deaths, earlier before later).
+    ``events`` may be any iterable, including a generator. A module-level
+    function so batch analysis can run it in worker processes.
+    """
+    limit = KEY_EVENT_LIMIT if max_key_events is None else max_key_events
+    team_stats: Dict[str, Dict[str, int]] = {"Noxus": {}, "Ionia": {}}
+    # Min-heap of (priority, -position, event): the root is the first to evict
+    key_events: List[Tuple[int, int, Dict[str, Any]]] = []
+    stats: Dict[str, Any] = {}
+
+    total = 0
+    for event in events:
+        total += 1
+        event_type = event.get("event_type", "")
+
+        # Count events by team
+        counts = team_stats.get(event.get("team", ""))
+        if counts is not None:
+            counts[event_type] = counts.get(event_type, 0) + 1
+
+        priority = KEY_EVENT_PRIORITY.get(event_type)
+        if priority is None:
+            continue
+
+        # Winner and duration come from the first episode end
+        if event_type == "episode_end" and "winner" not in stats:
+            data = event.get("data") or {}
+            stats["winner"] = data.get("winner", "")
+            stats["duration"] = data.get("duration", 0)
+
+        if len(key_events) < limit:
+            heapq.heappush(key_events, (priority, -total, event))
+        elif limit and priority > key_events[0][0]:
+            # Equal priority never replaces the root: it is always the later event
+            heapq.heapreplace(key_events, (priority, -total, event))
+
+    stats["total_events"] = total
+    stats["team_stats"] = team_stats
+    # Chronological order for the prompt
+    stats["key_events"] = [event for _, _, event in sorted(key_events, key=lambda entry: -entry[1])]
+    return stats
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
 
 
 class PostGameAnalyzer:
     """Generates natural-language post-game analysis"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        pipelines: Optional[PipelinePool] = None,
+        prompt_token_budget: Optional[int] = None,
+        flights: Optional[SingleFlight] = None,
+        providers: Optional[ProviderRegistry] = None,
+    ):
         self.default_providers = {
             "openai": "gpt-3.5-turbo",
             "huggingface": "microsoft/DialoGPT-medium",
         }
-
-    def analyze(
+        # Local models are loaded once per process and shared
+        self.pipelines = pipelines or pipeline_pool
+        # Remote APIs, with pooled connections shared across requests
+        self.providers = providers or provider_registry
+        # Generated analyses, keyed by statistics, provider, model, prompt version and token budget
+        self.cache = cache
+        self.prompt_token_budget = prompt_token_budget or PROMPT_TOKEN_BUDGET
+        # Concurrent requests for the same prompt share one provider call
+        self.flights = flights or SingleFlight("analysis")
+
+    async def analyze(
         self,
         events: List[Dict[str, Any]],
         provider: str = "openai",
@@ -27,56 +131,107 @@ class PostGameAnalyzer:
             provider: 'openai' or 'huggingface'
             model: Model name (optional)
         """
-        # Extract key statistics
-        stats = self._extract_statistics(events)
-
-        # Build prompt
-        prompt = self._build_analysis_prompt(stats, events)
+        prepared = await self._prepare(events, provider, model)
+        if isinstance(prepared, str):
+            return prepared
+        model, key, prompt = prepared
 
         # Generate analysis
+        with phase("generate"):
+            analysis = await self.generate(provider, model, prompt)
+
+        # Provider failures fall back to a placeholder that must not be cached
+        if self.cache is not None and analysis != FALLBACK_ANALYSIS:
+            await self.cache.aset(key, analysis)
+        return analysis
+
+    async def analyze_stream(
+        self,
+        events: List[Dict[str, Any]],
+        provider: str = "openai",
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Like ``analyze``, but yield the analysis in pieces as they are generated.
+
+        Template and cached analyses arrive as a single piece. Provider
+        failures before the first piece yield the fallback text; later ones raise.
+        """
+        prepared = await self._prepare(events, provider, model)
+        if isinstance(prepared, str):
+            yield prepared
+            return
+        model, key, prompt = prepared
+
         if provider == "openai":
-            return self._analyze_openai(prompt, model or self.default_providers["openai"])
-        elif provider == "huggingface":
-            return self._analyze_huggingface(prompt, model or self.default_providers["huggingface"])
+            pieces = self._stream_openai(prompt, model)
         else:
+            pieces = self._stream_huggingface(prompt, model)
+
+        generated: List[str] = []
+        mark_phase("first_token")
+        async for piece in pieces:
+            if not generated:
+                mark_phase("generate")
+            generated.append(piece)
+            yield piece
+
+        analysis = "".join(generated).strip()
+        if self.cache is not None and analysis and analysis != FALLBACK_ANALYSIS:
+            await self.cache.aset(key, analysis)
+
+    async def _prepare(
+        self,
+        events: List[Dict[str, Any]],
+        provider: str,
+        model: Optional[str],
+    ) -> Union[str, Tuple[str, str, str]]:
+        """The finished analysis if no generation is needed, else (model, cache key, prompt)"""
+        # Extract key statistics
+        loop = asyncio.get_running_loop()
+        with phase("extract_statistics"):
+            stats = await loop.run_in_executor(None, self._extract_statistics, events)
+
+        if provider not in self.default_providers:
             # Fallback to template-based analysis
             return self._template_analysis(stats)
+        model = model or self.default_providers[provider]
 
-    def _extract_statistics(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Extract key statistics from events"""
-        stats = {
-            "total_events": len(events),
-            "team_stats": {"Noxus": {}, "Ionia": {}},
-            "key_events": [],
-        }
+        # Reuse a previous analysis of the same match
+        key = self.cache_key(stats, provider, model)
+        if self.cache is not None:
+            with phase("cache_lookup"):
+                cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
 
-        # Count events by team
-        for event in events:
-            team = event.get("team", "")
-            event_type = event.get("event_type", "")
+        # Build prompt
+        with phase("build_prompt"):
+            prompt = self._build_analysis_prompt(stats, events)
+        return model, key, prompt
 
-            if team in stats["team_stats"]:
-                if event_type not in stats["team_stats"][team]:
-                    stats["team_stats"][team][event_type] = 0
-                stats["team_stats"][team][event_type] += 1
+    def cache_key(self, stats: Dict[str, Any], provider: str, model: str) -> str:
+        """Key of the analysis generated for ``stats``; the budget changes which key events the prompt holds"""
+        return fingerprint(stats, provider, model, PROMPT_VERSION, self.prompt_token_budget)
 
-            # Track key events
-            if event_type in ["episode_end", "death", "deposit"]:
-                stats["key_events"].append(event)
+    async def generate(self, provider: str, model: str, prompt: str) -> str:
+        """Analysis for a built prompt; identical prompts in flight share one provider call"""
+        async def call() -> str:
+            if provider == "openai":
+                return await self._analyze_openai(prompt, model)
+            # Local generation is CPU/GPU bound and blocking
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._analyze_huggingface, prompt, model)
 
-        # Find winner
-        for event in events:
-            if event.get("event_type") == "episode_end":
-                winner = event.get("data", {}).get("winner", "")
-                stats["winner"] = winner
-                stats["duration"] = event.get("data", {}).get("duration", 0)
-                break
+        return await self.flights.do(fingerprint(provider, model, prompt), call)
 
-        return stats
+    def _extract_statistics(self, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract key statistics from events"""
+        return extract_statistics(events)
 
     def _build_analysis_prompt(self, stats: Dict[str, Any], events: List[Dict[str, Any]]) -> str:
-        """Build prompt for LLM"""
-        prompt = f"""Analyze this Noxus vs Ionia match and provide a natural-language summary.
+        """Build prompt for LLM, fitting as many key events as the token budget allows"""
+        header = f"""Analyze this Noxus vs Ionia match and provide a natural-language summary.
 
 Match Statistics:
 - Winner: {stats.get('winner', 'Unknown')}
@@ -84,51 +239,79 @@ Match Statistics:
 - Total Events: {stats['total_events']}
 
 Team Statistics:
-Noxus: {json.dumps(stats['team_stats'].get('Noxus', {}), indent=2)}
-Ionia: {json.dumps(stats['team_stats'].get('Ionia', {}), indent=2)}
+Noxus: {_compact_json(stats['team_stats'].get('Noxus', {}))}
+Ionia: {_compact_json(stats['team_stats'].get('Ionia', {}))}
 
 Key Events:
-{json.dumps(stats['key_events'][:10], indent=2)}
-
+"""
+        instructions = """
 Provide a concise analysis (2-3 paragraphs) covering:
 1. Overall match outcome and key turning points
 2. Team performance highlights (e.g., "Noxus lost skirmishes 12-15 due to split pushes")
 3. Notable agent contributions or coordination patterns
 """
-        return prompt
-
-    def _analyze_openai(self, prompt: str, model: str) -> str:
+        remaining = self.prompt_token_budget * CHARS_PER_TOKEN - len(header) - len(instructions)
+
+        # Most important events claim the budget first, then print in match order
+        lines = [f"- {_compact_json(event)}" for event in stats["key_events"]]
+        by_importance = sorted(
+            range(len(lines)),
+            key=lambda i: -KEY_EVENT_PRIORITY.get(stats["key_events"][i].get("event_type", ""), -1),
+        )
+        included = set()
+        for i in by_importance:
+            if len(lines[i]) + 1 <= remaining:
+                included.add(i)
+                remaining -= len(lines[i]) + 1
+
+        key_events = "\n".join(lines[i] for i in sorted(included)) or "- (none)"
+        return header + key_events + "\n" + instructions
+
+    async def _analyze_openai(self, prompt: str, model: str) -> str:
         """Generate analysis using OpenAI API"""
         try:
-            import openai
-
-            response = openai.ChatCompletion.create(
+            return await self.providers.get("openai").chat(
                 model=model,
                 messages=[
-                    {"role": "system", "content": "You are an expert game analyst specializing in team-based strategy games."},
+                    {"role": "system", "content": ANALYST_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 max_tokens=500,
                 temperature=0.7,
             )
 
-            return response.choices[0].message.content.strip()
-
-        except ImportError:
-            return self._template_analysis_from_prompt(prompt)
-        except Exception as e:
+        except ProviderError as e:
             print(f"OpenAI API error: {e}")
             return self._template_analysis_from_prompt(prompt)
 
+    async def _stream_openai(self, prompt: str, model: str) -> AsyncIterator[str]:
+        """Stream analysis from the OpenAI API"""
+        started = False
+        try:
+            async for piece in self.providers.get("openai").stream_chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": ANALYST_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=500,
+                temperature=0.7,
+            ):
+                started = True
+                yield piece
+
+        except ProviderError as e:
+            if started:
+                raise
+            print(f"OpenAI API error: {e}")
+            yield self._template_analysis_from_prompt(prompt)
+
     def _analyze_huggingface(self, prompt: str, model: str) -> str:
         """Generate analysis using HuggingFace Transformers"""
         try:
-            from transformers import pipeline
-
-            generator = pipeline("text-generation", model=model, max_length=500)
-            result = generator(prompt, max_length=500, num_return_sequences=1)
+            result = self.pipelines.generate(model, prompt, **HF_GENERATION_KWARGS)
 
-            return result[0]["generated_text"].replace(prompt, "").strip()
+            return self._huggingface_text(result, prompt)
 
         except ImportError:
             return self._template_analysis_from_prompt(prompt)
@@ -136,6 +319,33 @@ Provide a concise analysis (2-3 paragraphs) covering:
             print(f"HuggingFace error: {e}")
             return self._template_analysis_from_prompt(prompt)
 
+    async def _stream_huggingface(self, prompt: str, model: str) -> AsyncIterator[str]:
+        """Stream analysis from a local model, one decoded chunk at a time"""
+        loop = asyncio.get_running_loop()
+        pieces = self.pipelines.stream(model, prompt, **HF_GENERATION_KWARGS)
+        started = False
+        try:
+            while True:
+                # The streamer blocks until the generation thread decodes more text
+                piece = await loop.run_in_executor(None, next, pieces, None)
+                if piece is None:
+                    break
+                if piece:
+                    started = True
+                    yield piece
+
+        except Exception as e:
+            if started:
+                raise
+            if not isinstance(e, ImportError):
+                print(f"HuggingFace error: {e}")
+            yield self._template_analysis_from_prompt(prompt)
+
+    @staticmethod
+    def _huggingface_text(result: List[Dict[str, Any]], prompt: str) -> str:
+        """Generated continuation of ``prompt`` from a text-generation pipeline result"""
+        return result[0]["generated_text"].replace(prompt, "").strip()
+
     def _template_analysis(self, stats: Dict[str, Any]) -> str:
         """Fallback template-based analysis"""
         winner = stats.get("winner", "Unknown")
@@ -159,5 +369,5 @@ Key Highlights:
 
     def _template_analysis_from_prompt(self, prompt: str) -> str:
         """Template analysis when LLM unavailable"""
-        return "LLM analysis unavailable. Using template-based summary. Install openai or transformers package for full analysis."
+        return FALLBACK_ANALYSIS
 
@@ -0,0 +1,205 @@
+"""Post-game analysis for many matches in one request
+
+Statistics for large batches are extracted in worker processes, local
+models generate for several prompts per forward pass, and remote providers
+are called concurrently up to a fixed limit. A failing match is reported
+in its own result instead of failing the whole batch.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .analyzers import FALLBACK_ANALYSIS, HF_GENERATION_KWARGS, PostGameAnalyzer, extract_statistics
+from .metrics import REGISTRY, phase
+
+BATCH_ITEMS = REGISTRY.counter(
+    "llm_batch_items_total",
+    "Batch analysis items by outcome (generated, cached, failed)",
+    ["result"],
+)
+
+
+def _extract_all(matches: List[List[Dict[str, Any]]]) -> List[Any]:
+    """Statistics for each match, or the exception raised while extracting them"""
+    results: List[Any] = []
+    for events in matches:
+        try:
+            results.append(extract_statistics(events))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class BatchAnalyzer:
+    """
+    Runs PostGameAnalyzer over many matches at once.
+
+    Args:
+        analyzer: Supplies prompts, providers, pipelines and the analysis cache
+        stats_workers: Processes used to extract statistics for large batches
+        remote_concurrency: Remote provider calls in flight at once
+        batch_size: Prompts per local generation pass
+        parallel_min_events: Batches with fewer events in total are extracted in-process
+    """
+
+    def __init__(
+        self,
+        analyzer: PostGameAnalyzer,
+        stats_workers: Optional[int] = None,
+        remote_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        parallel_min_events: Optional[int] = None,
+    ):
+        self.analyzer = analyzer
+        self.stats_workers = stats_workers or int(os.getenv("LLM_BATCH_STATS_WORKERS", os.cpu_count() or 1))
+        self.remote_concurrency = remote_concurrency or int(os.getenv("LLM_BATCH_REMOTE_CONCURRENCY", 8))
+        self.batch_size = batch_size or int(os.getenv("LLM_BATCH_SIZE", 8))
+        self.parallel_min_events = (
+            parallel_min_events
+            if parallel_min_events is not None
+            else int(os.getenv("LLM_BATCH_PARALLEL_MIN_EVENTS", 50000))
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _stats_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.stats_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def extract(self, matches: List[List[Dict[str, Any]]]) -> List[Any]:
+        """Statistics for each match (or its exception), in worker processes when worth it"""
+        loop = asyncio.get_running_loop()
+        total_events = sum(len(events) for events in matches)
+        if self.stats_workers <= 1 or len(matches) < 2 or total_events < self.parallel_min_events:
+            # Shipping small matches to another process costs more than extracting them here
+            return await loop.run_in_executor(None, _extract_all, matches)
+
+        # One slice of matches per worker keeps pickling overhead per task low
+        executor = self._stats_executor()
+        slice_size = -(-len(matches) // self.stats_workers)
+        slices = [matches[i:i + slice_size] for i in range(0, len(matches), slice_size)]
+        parts = await asyncio.gather(*(loop.run_in_executor(executor, _extract_all, part) for part in slices))
+        return [stats for part in parts for stats in part]
+
+    async def analyze(
+        self,
+        matches: List[List[Dict[str, Any]]],
+        provider: str = "openai",
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze every match.
+
+        Returns one entry per match, in order, with ``status`` "success"
+        (plus ``analysis`` and ``cached``) or "error" (plus ``error``).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(matches)
+
+        with phase("extract_statistics"):
+            all_stats = await self.extract(matches)
+
+        templated = provider not in self.analyzer.default_providers
+        model = None if templated else (model or self.analyzer.default_providers[provider])
+        cache = self.analyzer.cache
+
+        # (index, cache key, prompt) of the matches that still need generating
+        pending = []
+        with phase("build_prompt"):
+            for index, stats in enumerate(all_stats):
+                if isinstance(stats, Exception):
+                    results[index] = self._failure(f"Could not extract statistics: {stats}")
+                    continue
+                if templated:
+                    try:
+                        analysis = self.analyzer._template_analysis(stats)
+                    except Exception as e:
+                        results[index] = self._failure(f"Could not build analysis: {e}")
+                    else:
+                        results[index] = self._success(analysis, cached=False)
+                    continue
+
+                key = self.analyzer.cache_key(stats, provider, model)
+                cached = await cache.aget(key) if cache is not None else None
+                if cached is not None:
+                    results[index] = self._success(cached, cached=True)
+                    continue
+                try:
+                    prompt = self.analyzer._build_analysis_prompt(stats, matches[index])
+                except Exception as e:
+                    results[index] = self._failure(f"Could not build prompt: {e}")
+                    continue
+                pending.append((index, key, prompt))
+
+        if pending:
+            prompts = [prompt for _, _, prompt in pending]
+            with phase("generate"):
+                if provider == "huggingface":
+                    generated = await self._generate_local(model, prompts, batch_size or self.batch_size)
+                else:
+                    generated = await self._generate_remote(model, prompts)
+
+            for (index, key, _), analysis in zip(pending, generated):
+                if isinstance(analysis, Exception):
+                    results[index] = self._failure(f"Generation failed: {analysis}")
+                elif analysis == FALLBACK_ANALYSIS:
+                    results[index] = self._failure(f"{provider} provider unavailable")
+                else:
+                    if cache is not None:
+                        await cache.aset(key, analysis)
+                    results[index] = self._success(analysis, cached=False)
+
+        return results
+
+    async def _generate_local(self, model: str, prompts: List[str], batch_size: int) -> List[Any]:
+        analyzer = self.analyzer
+
+        def generate():
+            try:
+                outputs = analyzer.pipelines.generate_batch(model, prompts, batch_size, **HF_GENERATION_KWARGS)
+            except ImportError:
+                return [FALLBACK_ANALYSIS] * len(prompts)
+            except Exception as e:
+                return [e] * len(prompts)
+            texts: List[Any] = []
+            for prompt, output in zip(prompts, outputs):
+                if isinstance(output, Exception):
+                    texts.append(output)
+                    continue
+                try:
+                    texts.append(analyzer._huggingface_text(output, prompt))
+                except Exception as e:
+                    texts.append(e)
+            return texts
+
+        return await asyncio.get_running_loop().run_in_executor(None, generate)
+
+    async def _generate_remote(self, model: str, prompts: List[str]) -> List[Any]:
+        slots = asyncio.Semaphore(self.remote_concurrency)
+
+        async def call(prompt: str):
+            async with slots:
+                return await self.analyzer.generate("openai", model, prompt)
+
+        return await asyncio.gather(*(call(prompt) for prompt in prompts), return_exceptions=True)
+
+    @staticmethod
+    def _success(analysis: str, cached: bool) -> Dict[str, Any]:
+        BATCH_ITEMS.inc(result="cached" if cached else "generated")
+        return {"status": "success", "analysis": analysis, "cached": cached}
+
+    @staticmethod
+    def _failure(error: str) -> Dict[str, Any]:
+        BATCH_ITEMS.inc(result="failed")
+        return {"status": "error", "error": error}
@@ -0,0 +1,182 @@
+"""Two-tier cache for generated analyses
+
+Generated text is keyed by a fingerprint of everything that determines it
+(extracted statistics, provider, model, prompt version and token budget).
+Lookups hit an in-memory LRU first, then a SQLite table on disk that
+survives restarts; entries in both tiers expire after a TTL. Async callers
+use aget() and aset(), which run SQLite in the default executor so disk
+reads and writes never block the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from .metrics import REGISTRY
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "llm_cache_lookups_total",
+    "Analysis cache lookups by outcome (memory_hit, disk_hit, miss)",
+    ["cache", "result"],
+)
+CACHE_ENTRIES = REGISTRY.gauge(
+    "llm_cache_entries",
+    "Entries held in each cache tier",
+    ["cache", "tier"],
+)
+
+_MISS = object()
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU memory tier in front of a SQLite tier with TTL.
+
+    Args:
+        name: Label for metrics, also the SQLite table name (letters, digits, underscores)
+        max_entries: Memory tier size
+        path: SQLite file; empty disables the disk tier
+        ttl_seconds: Lifetime of an entry in both tiers
+    """
+
+    def __init__(
+        self,
+        name: str = "analysis",
+        max_entries: Optional[int] = None,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        # Interpolated into SQL as the table name
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+            raise ValueError(f"Cache name must be an identifier: {name!r}")
+        self.name = name
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_SIZE", 256))
+        self.path = path if path is not None else os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite3")
+        self.ttl_seconds = ttl_seconds or float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+
+        # key -> (expires_at, value), least recently used first
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        # Separate locks, so memory hits never wait behind a disk query
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+
+        CACHE_ENTRIES.set_function(lambda: len(self._memory), cache=name, tier="memory")
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._db is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.name} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute(f"DELETE FROM {self.name} WHERE expires_at < ?", (time.time(),))
+        return self._db
+
+    def _memory_get(self, key: str, now: float) -> Any:
+        """Value from the memory tier, or _MISS"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return _MISS
+            if entry[0] <= now:
+                del self._memory[key]
+                return _MISS
+            self._memory.move_to_end(key)
+        CACHE_LOOKUPS.inc(cache=self.name, result="memory_hit")
+        return entry[1]
+
+    def _disk_get(self, key: str, now: float) -> Optional[Any]:
+        """Value from the disk tier, promoted to the memory tier, or None"""
+        row = None
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                row = db.execute(
+                    f"SELECT value, expires_at FROM {self.name} WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+        if row is None:
+            CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+            return None
+
+        value = json.loads(row[0])
+        self._remember(key, row[1], value)
+        CACHE_LOOKUPS.inc(cache=self.name, result="disk_hit")
+        return value
+
+    def _disk_set(self, key: str, value: Any, expires_at: float):
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                db.execute(
+                    f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for ``key``, or None"""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not _MISS:
+            return value
+        return self._disk_get(key, now)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Like get(), but reads the disk tier in a thread instead of blocking the event loop"""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not _MISS:
+            return value
+        return await asyncio.get_running_loop().run_in_executor(None, self._disk_get, key, now)
+
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable value in both tiers"""
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, value)
+        self._disk_set(key, value, expires_at)
+
+    async def aset(self, key: str, value: Any):
+        """Like set(), but writes the disk tier in a thread instead of blocking the event loop"""
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, value)
+        await asyncio.get_running_loop().run_in_executor(None, self._disk_set, key, value, expires_at)
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                db.execute(f"DELETE FROM {self.name}")
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
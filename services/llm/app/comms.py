@@ -0,0 +1,233 @@
+"""Per-tick agent communication from a precomputed codebook
+
+Every combination of intent and bucketed agent state (health, whether the
+agent carries mana, which third of the arena it is in) has its message
+built up front, so a tick's worth of agents costs one dict lookup each.
+When an LLM provider is requested, LLM-worded variants of codebook
+entries are generated in the background and kept in an LRU; until a
+variant exists the codebook message is returned, so the LLM is never on
+the per-tick path.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .metrics import REGISTRY
+
+# Same codes as BaseAgent.HandleSignal / StrategyGenerator.generate_comm
+INTENTS = ("collecting_mana", "depositing", "attacking", "defending", "retreating")
+UNKNOWN_INTENT = len(INTENTS)
+INTENT_NAMES = INTENTS + ("unknown",)
+
+HEALTH_LEVELS = ("low", "mid", "high")
+CARRY_LEVELS = ("empty", "mana")
+ZONES = ("west", "center", "east")
+
+# Half the arena's width in world units (BaseAgent normalizes positions by 50)
+ARENA_EXTENT = float(os.getenv("LLM_COMMS_ARENA_EXTENT", 50))
+
+# Seconds before a variant whose generation failed is requested again
+VARIANT_RETRY_SECONDS = 60.0
+
+# (intent, health, carry, zone) indices
+BucketKey = Tuple[int, int, int, int]
+
+COMMS_MESSAGES = REGISTRY.counter(
+    "llm_comms_messages_total",
+    "Agent messages served by source (codebook, variant)",
+    ["source"],
+)
+
+_INTENT_CODES: Dict[Any, int] = {}
+for _code, _name in enumerate(INTENTS):
+    _INTENT_CODES.update({_code: _code, str(_code): _code, _name: _code})
+
+
+def intent_code(intent: Any) -> int:
+    """Intent code 0-4 from a code, its string form or its name; UNKNOWN_INTENT otherwise"""
+    return _INTENT_CODES.get(intent, UNKNOWN_INTENT)
+
+
+def position_x(position: Any) -> Optional[float]:
+    """World x of a position given as [x, y, z], {"x": ...} or "(x, y, z)" """
+    try:
+        if isinstance(position, dict):
+            return float(position["x"])
+        if isinstance(position, str):
+            position = position.strip("()[] ").split(",")
+        return float(position[0])
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def position_xz(position: Any) -> Optional[Tuple[float, float]]:
+    """World (x, z) of a position in any form ``position_x`` accepts; [x, z] pairs are taken as is"""
+    try:
+        if isinstance(position, dict):
+            return float(position["x"]), float(position.get("z", 0.0))
+        if isinstance(position, str):
+            position = position.strip("()[] ").split(",")
+        return float(position[0]), float(position[-1] if len(position) > 1 else 0.0)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _number(value: Any) -> Optional[float]:
+    """``value`` as a float, or None if it is missing or not numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def bucket(agent_state: Dict[str, Any], arena_extent: float = ARENA_EXTENT) -> Tuple[int, int, int]:
+    """
+    (health, carry, zone) bucket indices of an agent state.
+
+    Missing or unparsable fields count as high/empty/center, so one bad
+    agent state never fails a whole batch.
+    """
+    health = _number(agent_state.get("health"))
+    if health is None:
+        health_level = 2
+    else:
+        if health > 1:
+            # Hit points rather than a fraction
+            max_health = _number(agent_state.get("max_health", 100))
+            health /= max_health if max_health and max_health > 0 else 100.0
+        health_level = 0 if health < 1 / 3 else 1 if health < 2 / 3 else 2
+
+    mana = _number(agent_state.get("mana", agent_state.get("carried_mana", 0)))
+    carry_level = 1 if mana is not None and mana > 0 else 0
+
+    x = position_x(agent_state.get("position"))
+    if x is None:
+        zone = 1
+    else:
+        third = 2 * arena_extent / 3
+        zone = 0 if x < -arena_extent + third else 1 if x < arena_extent - third else 2
+
+    return health_level, carry_level, zone
+
+
+def describe(key: BucketKey) -> Dict[str, str]:
+    """Named fields of a bucket key"""
+    intent, health, carry, zone = key
+    return {
+        "intent": INTENT_NAMES[intent],
+        "health": HEALTH_LEVELS[health],
+        "carrying": CARRY_LEVELS[carry],
+        "zone": ZONES[zone],
+    }
+
+
+def codebook_message(key: BucketKey) -> str:
+    """Template message for a bucket key, e.g. ``depositing:east:low:mana``"""
+    fields = describe(key)
+    message = f"{fields['intent']}:{fields['zone']}:{fields['health']}"
+    return message + ":mana" if fields["carrying"] == "mana" else message
+
+
+class CommsCodebook:
+    """
+    Messages for whole ticks of agents.
+
+    Args:
+        variant_generator: ``(situation, provider) -> message or None``, used to fill the variant LRU
+        max_variants: LLM-worded variants kept per process
+        arena_extent: Half the arena width, for the zone bucket
+    """
+
+    def __init__(
+        self,
+        variant_generator: Optional[Callable[[Dict[str, str], str], Awaitable[Optional[str]]]] = None,
+        max_variants: Optional[int] = None,
+        arena_extent: Optional[float] = None,
+    ):
+        self.variant_generator = variant_generator
+        self.max_variants = max_variants or int(os.getenv("LLM_COMMS_VARIANTS", 1024))
+        self.arena_extent = arena_extent or ARENA_EXTENT
+
+        self.codebook: Dict[BucketKey, str] = {
+            (intent, health, carry, zone): codebook_message((intent, health, carry, zone))
+            for intent in range(len(INTENT_NAMES))
+            for health in range(len(HEALTH_LEVELS))
+            for carry in range(len(CARRY_LEVELS))
+            for zone in range(len(ZONES))
+        }
+        # (provider, key) -> message, least recently used first
+        self._variants: "OrderedDict[Tuple[str, BucketKey], str]" = OrderedDict()
+        self._pending: Set[Tuple[str, BucketKey]] = set()
+        # (provider, key) -> monotonic time before which a failed variant is not retried
+        self._failed: Dict[Tuple[str, BucketKey], float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def key(self, intent: Any, agent_state: Dict[str, Any]) -> BucketKey:
+        return (intent_code(intent),) + bucket(agent_state, self.arena_extent)
+
+    def messages(
+        self,
+        intents: Sequence[Any],
+        agent_states: Sequence[Dict[str, Any]],
+        provider: str = "template",
+    ) -> List[str]:
+        """
+        One message per agent.
+
+        With an LLM provider, cached variants replace codebook messages and
+        missing variants are generated in the background (requires a running event loop).
+        """
+        keys = [self.key(intent, state) for intent, state in zip(intents, agent_states)]
+        if provider not in ("openai", "huggingface") or self.variant_generator is None:
+            COMMS_MESSAGES.inc(len(keys), source="codebook")
+            return [self.codebook[key] for key in keys]
+
+        messages = []
+        variants = 0
+        for key in keys:
+            variant = self._variants.get((provider, key))
+            if variant is None:
+                self._request_variant(provider, key)
+                messages.append(self.codebook[key])
+            else:
+                self._variants.move_to_end((provider, key))
+                messages.append(variant)
+                variants += 1
+        COMMS_MESSAGES.inc(len(keys) - variants, source="codebook")
+        COMMS_MESSAGES.inc(variants, source="variant")
+        return messages
+
+    def _request_variant(self, provider: str, key: BucketKey):
+        entry = (provider, key)
+        if entry in self._pending or self._failed.get(entry, 0.0) > time.monotonic():
+            return
+        self._pending.add(entry)
+        task = asyncio.get_running_loop().create_task(self._generate_variant(provider, key))
+        # Keep a reference until done so the task is not garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _generate_variant(self, provider: str, key: BucketKey):
+        entry = (provider, key)
+        try:
+            variant = await self.variant_generator(describe(key), provider)
+        except Exception as e:
+            print(f"Comms variant error: {e}")
+            variant = None
+        finally:
+            self._pending.discard(entry)
+        if not variant:
+            now = time.monotonic()
+            # Drop lapsed entries, so failures across many buckets don't accumulate
+            for stale in [stale for stale, until in self._failed.items() if until <= now]:
+                del self._failed[stale]
+            self._failed[entry] = now + VARIANT_RETRY_SECONDS
+            return
+        self._failed.pop(entry, None)
+        self._variants[entry] = variant
+        self._variants.move_to_end(entry)
+        while len(self._variants) > self.max_variants:
+            self._variants.popitem(last=False)
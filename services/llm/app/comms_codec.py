@@ -0,0 +1,149 @@
+"""Fixed-size encodings of agent communication messages
+
+A message is an intent code (0-4 as in ``BaseAgent.HandleSignal``, 7 for
+unknown), a priority (0-7) and an x/z position in the arena. It packs into
+a 5-byte record for the wire, or into an 8-float vector that can be
+appended to an agent's observations. Every function works on whole
+batches with NumPy; nothing loops per agent.
+
+Record layout (little-endian)::
+
+    byte 0      intent (bits 0-2) | priority (bits 3-5)
+    bytes 1-2   x as int16, -32767..32767 over -extent..extent
+    bytes 3-4   z as int16, likewise
+
+Vector layout: one-hot intent (5 floats, all zero for unknown), x / extent,
+z / extent, priority / 7.
+"""
+
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .comms import ARENA_EXTENT, INTENTS, _number, intent_code, position_xz
+
+UNKNOWN_CODE = 7
+MAX_PRIORITY = 7
+
+RECORD_DTYPE = np.dtype([("header", "u1"), ("x", "<i2"), ("z", "<i2")])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+VECTOR_SIZE = len(INTENTS) + 3
+
+_QUANT = 32767
+
+
+def signal_arrays(
+    intents: Sequence[Any],
+    agent_states: Sequence[Dict[str, Any]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (intents, positions, priorities) arrays for ``encode_batch``/``to_vectors`` from request-style agent signals.
+
+    Intents may be codes or names; a missing or unparsable position counts as
+    the arena centre and a missing or unparsable ``priority`` as 0, so one bad
+    agent state never fails a whole batch.
+    """
+    count = len(intents)
+    codes = np.fromiter((intent_code(intent) for intent in intents), dtype=np.int64, count=count)
+    positions = np.zeros((count, 2), dtype=np.float64)
+    priorities = np.zeros(count, dtype=np.int64)
+    for i, state in enumerate(agent_states):
+        xz = position_xz(state.get("position"))
+        if xz is not None and math.isfinite(xz[0]) and math.isfinite(xz[1]):
+            positions[i] = xz
+        priority = _number(state.get("priority"))
+        if priority is not None and math.isfinite(priority):
+            priorities[i] = min(max(int(priority), 0), MAX_PRIORITY)
+    return codes, positions, priorities
+
+
+def _columns(intents, positions, priorities):
+    intents = np.asarray(intents, dtype=np.int64).reshape(-1)
+    positions = np.asarray(positions, dtype=np.float64).reshape(len(intents), -1)
+    # [x, y, z] rows carry z in the last column; [x, z] rows already match
+    xz = positions[:, [0, -1]]
+    if priorities is None:
+        priorities = np.zeros(len(intents), dtype=np.int64)
+    priorities = np.clip(np.asarray(priorities, dtype=np.int64).reshape(-1), 0, MAX_PRIORITY)
+    intents = np.where((intents >= 0) & (intents < len(INTENTS)), intents, UNKNOWN_CODE)
+    return intents, xz, priorities
+
+
+def encode_batch(
+    intents,
+    positions,
+    priorities=None,
+    extent: float = ARENA_EXTENT,
+) -> bytes:
+    """
+    Pack a batch of messages into ``RECORD_SIZE`` bytes each.
+
+    Args:
+        intents: (N,) intent codes; anything outside 0-4 becomes unknown
+        positions: (N, 2) x/z or (N, 3) x/y/z world positions
+        priorities: (N,) priorities, clipped to 0-7 (default 0)
+        extent: Half the arena width; positions beyond it are clipped
+    """
+    intents, xz, priorities = _columns(intents, positions, priorities)
+    quantized = np.rint(np.clip(xz / extent, -1.0, 1.0) * _QUANT).astype("<i2")
+
+    records = np.empty(len(intents), dtype=RECORD_DTYPE)
+    records["header"] = intents | (priorities << 3)
+    records["x"] = quantized[:, 0]
+    records["z"] = quantized[:, 1]
+    return records.tobytes()
+
+
+def decode_batch(data: bytes, extent: float = ARENA_EXTENT) -> Dict[str, np.ndarray]:
+    """
+    Unpack records from ``encode_batch``.
+
+    Returns ``intent`` (N,) with 7 for unknown, ``priority`` (N,) and
+    ``position`` (N, 2) x/z in world units.
+    """
+    if len(data) % RECORD_SIZE:
+        raise ValueError(f"Comms payload of {len(data)} bytes is not a multiple of {RECORD_SIZE}")
+    records = np.frombuffer(data, dtype=RECORD_DTYPE)
+    position = np.stack([records["x"], records["z"]], axis=1).astype(np.float32) * (extent / _QUANT)
+    return {
+        "intent": (records["header"] & 0x07).astype(np.int8),
+        "priority": (records["header"] >> 3 & 0x07).astype(np.int8),
+        "position": position,
+    }
+
+
+def to_vectors(
+    intents,
+    positions,
+    priorities=None,
+    extent: float = ARENA_EXTENT,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    (N, VECTOR_SIZE) float32 observation vectors for a batch of messages.
+
+    Args:
+        out: Preallocated (N, VECTOR_SIZE) float32 array to fill instead of allocating
+    """
+    intents, xz, priorities = _columns(intents, positions, priorities)
+    if out is None:
+        out = np.empty((len(intents), VECTOR_SIZE), dtype=np.float32)
+    out[:, :len(INTENTS)] = 0.0
+    known = intents != UNKNOWN_CODE
+    out[np.flatnonzero(known), intents[known]] = 1.0
+    out[:, len(INTENTS):len(INTENTS) + 2] = np.clip(xz / extent, -1.0, 1.0)
+    out[:, -1] = priorities / MAX_PRIORITY
+    return out
+
+
+def from_vectors(vectors: np.ndarray, extent: float = ARENA_EXTENT) -> Dict[str, np.ndarray]:
+    """Inverse of ``to_vectors``, with the same fields as ``decode_batch``"""
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, VECTOR_SIZE)
+    one_hot = vectors[:, :len(INTENTS)]
+    intent = np.where(one_hot.max(axis=1) > 0.5, one_hot.argmax(axis=1), UNKNOWN_CODE).astype(np.int8)
+    return {
+        "intent": intent,
+        "priority": np.rint(vectors[:, -1] * MAX_PRIORITY).astype(np.int8),
+        "position": vectors[:, len(INTENTS):len(INTENTS) + 2] * extent,
+    }
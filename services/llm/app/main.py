@@ -1,13 +1,23 @@
 """FastAPI service for LLM-powered analysis and strategy"""
 
 from fastapi import FastAPI, HTTPException, Body
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Dict, Any, Optional
+import asyncio
 import os
 
 from .analyzers import PostGameAnalyzer
+from .batch import BatchAnalyzer
+from .cache import ResponseCache
+from .comms import CommsCodebook
+from .pipelines import pipeline_pool, preload_models_from_env
+from .playbooks import PlaybookCache
+from .providers import provider_registry
 from .strategies import StrategyGenerator
-from .models import AnalysisRequest, StrategyRequest, CommsRequest
+from .streaming import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event
+from .warmup import WarmUp
+from .metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, MetricsMiddleware, TimedJSONResponse
+from .models import AnalysisRequest, BatchAnalysisRequest, StrategyRequest, CommsRequest, CommsBatchRequest
 
 app = FastAPI(
     title="Noxus-Ionia LLM Service",
@@ -15,14 +25,55 @@ app = FastAPI(
     version="0.1.0",
 )
 
+# Per-endpoint and per-phase latency and payload sizes on /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Initialize analyzers
-analyzer = PostGameAnalyzer()
-strategy_gen = StrategyGenerator()
+analysis_cache = ResponseCache("analysis")
+analyzer = PostGameAnalyzer(cache=analysis_cache, pipelines=pipeline_pool)
+batch_analyzer = BatchAnalyzer(analyzer)
+strategy_gen = StrategyGenerator(pipelines=pipeline_pool)
+playbook_cache = PlaybookCache(strategy_gen)
+comms_codebook = CommsCodebook(variant_generator=strategy_gen.generate_comm_variant)
+
+# Largest batch accepted by /analyze/batch
+MAX_BATCH_MATCHES = int(os.getenv("LLM_BATCH_MAX_MATCHES", 1000))
 
 # Feature flags
 ENABLE_COMMS = os.getenv("ENABLE_LLM_COMMS", "false").lower() == "true"
 
 
+async def import_transformers():
+    await asyncio.get_running_loop().run_in_executor(None, pipeline_pool.import_transformers)
+
+
+async def preload_models():
+    await asyncio.get_running_loop().run_in_executor(None, pipeline_pool.preload, preload_models_from_env())
+
+
+# Heavy imports and model loads run after the server is listening; /health/ready waits for them
+warm_up = WarmUp()
+if os.getenv("LLM_WARM_UP_TRANSFORMERS", "true").lower() == "true" and pipeline_pool.transformers_installed():
+    warm_up.add("import_transformers", import_transformers)
+if preload_models_from_env():
+    warm_up.add("preload_models", preload_models)
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Import transformers and load LLM_PRELOAD_MODELS in the background so no request pays for it"""
+    warm_up.start()
+
+
+@app.on_event("shutdown")
+async def close_resources():
+    warm_up.cancel()
+    batch_analyzer.close()
+    analysis_cache.close()
+    playbook_cache.close()
+    await provider_registry.close()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -33,6 +84,24 @@ async def root():
     }
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is serving requests"""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 until transformers is imported and preloaded models are loaded"""
+    return TimedJSONResponse(status_code=200 if warm_up.ready else 503, content=warm_up.describe())
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.post("/analyze")
 async def analyze_match(
     request: AnalysisRequest = Body(...),
@@ -44,13 +113,13 @@ async def analyze_match(
         request: AnalysisRequest with events and optional LLM provider
     """
     try:
-        analysis = analyzer.analyze(
+        analysis = await analyzer.analyze(
             events=request.events,
             provider=request.provider,
             model=request.model,
         )
         
-        return JSONResponse(content={
+        return TimedJSONResponse(content={
             "status": "success",
             "analysis": analysis,
         })
@@ -59,6 +128,78 @@ async def analyze_match(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/analyze/stream")
+async def analyze_match_stream(
+    request: AnalysisRequest = Body(...),
+):
+    """
+    Stream post-game analysis as server-sent events.
+    
+    Sends a ``token`` event per piece of generated text, then ``done`` with
+    the whole analysis, or ``error`` if generation fails part-way.
+    
+    Args:
+        request: AnalysisRequest with events and optional LLM provider
+    """
+    async def events():
+        pieces = []
+        try:
+            async for piece in analyzer.analyze_stream(
+                events=request.events,
+                provider=request.provider,
+                model=request.model,
+            ):
+                pieces.append(piece)
+                yield sse_event("token", {"text": piece})
+            yield sse_event("done", {"analysis": "".join(pieces).strip()})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
+@app.post("/analyze/batch")
+async def analyze_matches(
+    request: BatchAnalysisRequest = Body(...),
+):
+    """
+    Generate post-game analyses for many matches at once.
+    
+    Each match gets its own result; a match that fails does not fail the batch.
+    
+    Args:
+        request: BatchAnalysisRequest with the matches and optional LLM provider
+    """
+    if len(request.matches) > MAX_BATCH_MATCHES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BATCH_MATCHES} matches per batch (got {len(request.matches)})",
+        )
+
+    try:
+        outcomes = await batch_analyzer.analyze(
+            [match.events for match in request.matches],
+            provider=request.provider,
+            model=request.model,
+            batch_size=request.batch_size,
+        )
+
+        results = [
+            {"index": index, "match_id": match.match_id, **outcome}
+            for index, (match, outcome) in enumerate(zip(request.matches, outcomes))
+        ]
+        failed = sum(1 for result in results if result["status"] != "success")
+        return TimedJSONResponse(content={
+            "status": "success",
+            "results": results,
+            "succeeded": len(results) - failed,
+            "failed": failed,
+        })
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/strategy")
 async def generate_strategy(
     request: StrategyRequest = Body(...),
@@ -66,19 +207,31 @@ async def generate_strategy(
     """
     Generate JSON playbook (roles, priorities, tactics) based on performance.
     
+    Playbooks are reused for similar performance data and refreshed in the
+    background; ``source`` says how this one was answered.
+
     Args:
         request: StrategyRequest with performance data
     """
     try:
-        playbook = strategy_gen.generate(
-            performance_data=request.performance_data,
-            recent_matches=request.recent_matches,
-            provider=request.provider,
-        )
+        if request.use_cache:
+            playbook, source = await playbook_cache.get(
+                performance_data=request.performance_data,
+                recent_matches=request.recent_matches,
+                provider=request.provider,
+            )
+        else:
+            playbook = await strategy_gen.generate(
+                performance_data=request.performance_data,
+                recent_matches=request.recent_matches,
+                provider=request.provider,
+            )
+            source = "uncached"
         
-        return JSONResponse(content={
+        return TimedJSONResponse(content={
             "status": "success",
             "playbook": playbook,
+            "source": source,
         })
 
     except Exception as e:
@@ -102,14 +255,14 @@ async def generate_communication(
         )
 
     try:
-        message = strategy_gen.generate_comm(
+        message = await strategy_gen.generate_comm(
             agent_state=request.agent_state,
             intent=request.intent,
             context=request.context,
             provider=request.provider,
         )
         
-        return JSONResponse(content={
+        return TimedJSONResponse(content={
             "status": "success",
             "message": message,
         })
@@ -118,6 +271,61 @@ async def generate_communication(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/comms/batch")
+async def generate_communications(
+    request: CommsBatchRequest = Body(...),
+):
+    """
+    Generate messages for every agent in a tick (optional, feature-flagged).
+    
+    Messages come from a precomputed intent × state-bucket codebook, or from
+    cached LLM variants of it; the LLM is never called while answering.
+    With format 'binary' or 'vector' the response instead carries each
+    agent's intent, position and priority packed by ``comms_codec``.
+    
+    Args:
+        request: CommsBatchRequest with each agent's intent and state
+    """
+    if not ENABLE_COMMS:
+        raise HTTPException(
+            status_code=403,
+            detail="LLM communication is disabled. Set ENABLE_LLM_COMMS=true to enable.",
+        )
+
+    if request.format not in ("text", "binary", "vector"):
+        raise HTTPException(status_code=400, detail=f"Unknown comms format: {request.format}")
+
+    intents = [agent.intent for agent in request.agents]
+    agent_states = [agent.agent_state for agent in request.agents]
+
+    try:
+        if request.format != "text":
+            # NumPy is only needed for packed formats
+            from .comms_codec import RECORD_SIZE, encode_batch, signal_arrays, to_vectors
+
+        if request.format == "binary":
+            return Response(
+                content=encode_batch(*signal_arrays(intents, agent_states)),
+                media_type="application/octet-stream",
+                headers={"X-Comms-Record-Size": str(RECORD_SIZE)},
+            )
+        if request.format == "vector":
+            return TimedJSONResponse(content={
+                "status": "success",
+                "vectors": to_vectors(*signal_arrays(intents, agent_states)).tolist(),
+            })
+
+        messages = comms_codebook.messages(intents, agent_states, provider=request.provider)
+
+        return TimedJSONResponse(content={
+            "status": "success",
+            "messages": messages,
+        })
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8002)
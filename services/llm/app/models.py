@@ -11,11 +11,28 @@ class AnalysisRequest(BaseModel):
     model: Optional[str] = Field(None, description="Model name (default based on provider)")
 
 
+class MatchEvents(BaseModel):
+    """Event logs of one match in a batch"""
+    match_id: Optional[str] = Field(None, description="Caller's identifier, echoed in the results")
+    events: List[Dict[str, Any]] = Field(..., description="Match event logs")
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Request for post-game analysis of many matches"""
+    matches: List[MatchEvents] = Field(..., description="Matches to analyze")
+    provider: Optional[str] = Field("openai", description="LLM provider: 'openai' or 'huggingface'")
+    model: Optional[str] = Field(None, description="Model name (default based on provider)")
+    batch_size: Optional[int] = Field(None, ge=1, description="Prompts per local generation pass")
+
+
 class StrategyRequest(BaseModel):
     """Request for strategy generation"""
     performance_data: Dict[str, Any] = Field(..., description="Agent/team performance metrics")
     recent_matches: Optional[List[Dict[str, Any]]] = Field(None, description="Recent match results")
     provider: Optional[str] = Field("openai", description="LLM provider")
+    use_cache: Optional[bool] = Field(
+        True, description="Reuse the playbook of similar performance data; false always calls the LLM"
+    )
 
 
 class CommsRequest(BaseModel):
@@ -25,3 +42,21 @@ class CommsRequest(BaseModel):
     context: Optional[Dict[str, Any]] = Field(None, description="Additional context")
     provider: Optional[str] = Field("openai", description="LLM provider")
 
+
+class AgentSignal(BaseModel):
+    """One agent's intent and state in a comms batch"""
+    intent: str = Field(..., description="Agent intent code")
+    agent_state: Dict[str, Any] = Field(..., description="Current agent state (health, mana, position)")
+
+
+class CommsBatchRequest(BaseModel):
+    """Request for every agent's communication in one tick"""
+    agents: List[AgentSignal] = Field(..., description="Agents to generate messages for")
+    provider: Optional[str] = Field(
+        "template",
+        description="'template' for codebook messages only; 'openai' or 'huggingface' to use cached LLM variants",
+    )
+    format: Optional[str] = Field(
+        "text",
+        description="'text' for messages; 'binary' for packed 5-byte records; 'vector' for observation vectors",
+    )
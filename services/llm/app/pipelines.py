@@ -0,0 +1,206 @@
+"""Process-wide pool of HuggingFace text-generation pipelines
+
+Each model is loaded once and shared by every analyzer, instead of being
+rebuilt from disk on every request. Generations are bounded by a
+semaphore so concurrent requests queue for the model rather than
+competing for the same CPU/GPU.
+"""
+
+import importlib.util
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .metrics import REGISTRY
+
+MODEL_LOAD_SECONDS = REGISTRY.gauge(
+    "llm_model_load_seconds",
+    "Time taken to load each local model",
+    ["model"],
+)
+GENERATIONS = REGISTRY.gauge(
+    "llm_local_generations",
+    "Local generations running or waiting for a slot",
+    ["state"],
+)
+
+
+class PipelinePool:
+    """
+    Loads text-generation pipelines on first use and keeps them warm.
+
+    Args:
+        max_concurrent: Generations allowed to run at once across all models
+        device: Passed to ``transformers.pipeline`` (e.g. -1 for CPU, 0 for the first GPU)
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, device: Optional[str] = None):
+        self.max_concurrent = max_concurrent or int(os.getenv("LLM_MAX_CONCURRENT_GENERATIONS", 1))
+        self.device = device if device is not None else os.getenv("LLM_DEVICE")
+
+        self._pipelines: Dict[str, Any] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._running = 0
+        self._waiting = 0
+
+        GENERATIONS.set_function(lambda: self._running, state="running")
+        GENERATIONS.set_function(lambda: self._waiting, state="waiting")
+
+    @property
+    def loaded_models(self) -> List[str]:
+        return list(self._pipelines)
+
+    def get(self, model: str):
+        """The pipeline for ``model``, loading it on first use (raises ImportError without transformers)"""
+        pipe = self._pipelines.get(model)
+        if pipe is not None:
+            return pipe
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(model, threading.Lock())
+        # Concurrent first requests for one model wait for a single load
+        with load_lock:
+            pipe = self._pipelines.get(model)
+            if pipe is None:
+                pipe = self._load(model)
+                self._pipelines[model] = pipe
+        return pipe
+
+    def _load(self, model: str):
+        from transformers import pipeline
+
+        kwargs = {}
+        if self.device not in (None, ""):
+            device = str(self.device)
+            kwargs["device"] = int(device) if device.lstrip("-").isdigit() else device
+
+        started = time.perf_counter()
+        pipe = pipeline("text-generation", model=model, **kwargs)
+        MODEL_LOAD_SECONDS.set(time.perf_counter() - started, model=model)
+        return pipe
+
+    @staticmethod
+    def transformers_installed() -> bool:
+        return importlib.util.find_spec("transformers") is not None
+
+    def import_transformers(self):
+        """Import the pipeline and streaming machinery (and torch) ahead of the first local generation"""
+        from transformers import TextIteratorStreamer, pipeline  # noqa: F401
+
+    def preload(self, models: Iterable[str]):
+        """Load models ahead of the first request"""
+        for model in models:
+            self.get(model)
+
+    def generate(self, model: str, prompts, **kwargs) -> Any:
+        """Run the model's pipeline once a generation slot is free"""
+        return self._run(self.get(model), prompts, **kwargs)
+
+    def stream(self, model: str, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Yield generated text (without the prompt) as the model produces it.
+
+        Generation runs in a background thread feeding a TextIteratorStreamer;
+        a failure there is raised here once the streamed text runs out.
+
+        Raises:
+            ImportError: If transformers is not installed
+        """
+        from transformers import TextIteratorStreamer
+
+        pipe = self.get(model)
+        streamer = TextIteratorStreamer(pipe.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        failures: List[Exception] = []
+
+        def run():
+            try:
+                self._run(pipe, prompt, streamer=streamer, **kwargs)
+            except Exception as e:
+                failures.append(e)
+                # Unblock the reader
+                streamer.end()
+
+        thread = threading.Thread(target=run, name=f"stream-{model}", daemon=True)
+        thread.start()
+        yield from streamer
+        thread.join()
+        if failures:
+            raise failures[0]
+
+    def generate_batch(self, model: str, prompts: List[str], batch_size: int = 8, **kwargs) -> List[Any]:
+        """
+        Generate for many prompts, ``batch_size`` prompts per forward pass.
+
+        Prompts are grouped by token length so each batch pads as little as
+        possible, and each batch takes its own generation slot so single
+        requests are not starved behind a large batch. Results come back in
+        the order of ``prompts``; prompts of a batch that failed get the
+        exception instead of a result.
+
+        Raises:
+            ImportError: If transformers is not installed
+        """
+        pipe = self.get(model)
+        self._prepare_padding(pipe)
+
+        lengths = self._token_lengths(pipe, prompts)
+        order = sorted(range(len(prompts)), key=lambda i: lengths[i])
+        batch_size = max(1, batch_size)
+
+        results: List[Any] = [None] * len(prompts)
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            try:
+                outputs = self._run(pipe, [prompts[i] for i in indices], batch_size=len(indices), **kwargs)
+            except Exception as e:
+                outputs = [e] * len(indices)
+            for i, output in zip(indices, outputs):
+                results[i] = output
+        return results
+
+    def _prepare_padding(self, pipe):
+        """Decoder-only models often ship without a pad token and must be padded on the left"""
+        tokenizer = getattr(pipe, "tokenizer", None)
+        if tokenizer is None:
+            return
+        with self._lock:
+            if getattr(tokenizer, "pad_token", None) is None:
+                tokenizer.pad_token = tokenizer.eos_token
+            tokenizer.padding_side = "left"
+
+    @staticmethod
+    def _token_lengths(pipe, prompts: List[str]) -> List[int]:
+        tokenizer = getattr(pipe, "tokenizer", None)
+        if tokenizer is not None:
+            try:
+                return [len(ids) for ids in tokenizer(prompts, add_special_tokens=False)["input_ids"]]
+            except Exception:
+                pass
+        # Characters are a fair proxy when the tokenizer cannot be used directly
+        return [len(prompt) for prompt in prompts]
+
+    def _run(self, pipe, prompts, **kwargs) -> Any:
+        with self._lock:
+            self._waiting += 1
+        self._slots.acquire()
+        with self._lock:
+            self._waiting -= 1
+            self._running += 1
+        try:
+            return pipe(prompts, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._slots.release()
+
+
+def preload_models_from_env() -> List[str]:
+    """Models listed in LLM_PRELOAD_MODELS (comma-separated)"""
+    return [name.strip() for name in os.getenv("LLM_PRELOAD_MODELS", "").split(",") if name.strip()]
+
+
+# Shared by all analyzers in the process
+pipeline_pool = PipelinePool()
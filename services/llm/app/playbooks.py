@@ -0,0 +1,214 @@
+"""Strategy playbooks reused across similar performance data
+
+Training posts performance data far more often than it changes in any way
+that matters, so playbooks are cached per bucket of ``performance_data``:
+fractions in fields named like rates (``win_rate``, ``kill_ratio``, ...)
+are floored to ``LLM_STRATEGY_RATE_STEP`` and other numbers rounded to
+``LLM_STRATEGY_SIGNIFICANT_DIGITS`` significant digits. Recent matches
+only feed the prompt, not the key.
+
+A request whose bucket has a playbook younger than ``LLM_STRATEGY_TTL``
+gets it straight away. An older playbook is still returned, with a
+refresh started in the background. A bucket without a playbook gets the
+latest playbook for that provider while its own is generated in the
+background; only the very first request per provider waits for the LLM,
+and while that provider is backing off after a failure it gets the
+template playbook instead. Only LLM output that parses and has every
+playbook field is cached.
+"""
+
+import asyncio
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .cache import ResponseCache, fingerprint
+from .metrics import REGISTRY
+from .strategies import StrategyGenerator
+
+PLAYBOOK_LOOKUPS = REGISTRY.counter(
+    "llm_playbook_lookups_total",
+    "Strategy requests by how they were answered (fresh, stale, previous, generated, template)",
+    ["result"],
+)
+
+# Seconds before a bucket (or, without any playbook yet, a provider) whose generation failed is tried again
+RETRY_SECONDS = 60.0
+
+# Field name endings, ignoring case and a plural s, of values bucketed as rates when in [0, 1]
+RATE_FIELD_SUFFIXES = ("rate", "ratio", "fraction", "share", "pct", "percent", "percentage", "accuracy")
+
+
+def is_rate_field(name: str) -> bool:
+    return name.lower().rstrip("s").endswith(RATE_FIELD_SUFFIXES)
+
+
+def bucket_value(value: Any, rate_step: float, digits: int, name: str = "") -> Any:
+    """
+    Quantized copy of a JSON value; strings, booleans and None are kept.
+
+    ``name`` is the field holding the value (list items share their list's);
+    only fractions in rate fields are floored to ``rate_step``, so e.g. 0.9
+    seconds keeps its significant digits.
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            return str(value)
+        if 0.0 <= value <= 1.0 and is_rate_field(name):
+            # Nudge so values on a bucket edge (0.6 / 0.05 = 11.999...) land in that bucket
+            return round(math.floor(value / rate_step + 1e-9) * rate_step, 6)
+        return float(f"{value:.{digits}g}")
+    if isinstance(value, dict):
+        return {str(k): bucket_value(v, rate_step, digits, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [bucket_value(v, rate_step, digits, name) for v in value]
+    return str(value)
+
+
+def drop_expired(deadlines: Dict[Any, float], now: float):
+    """Remove entries of a key -> retry-after-time map whose time has passed"""
+    for key in [key for key, until in deadlines.items() if until <= now]:
+        del deadlines[key]
+
+
+class PlaybookCache:
+    """
+    Bucketed, asynchronously refreshed playbooks in front of a StrategyGenerator.
+
+    Args:
+        generator: Produces validated playbooks (``generate_validated``) and the template fallback
+        cache: Storage for playbooks; defaults to a ResponseCache named "playbooks"
+        ttl_seconds: Age after which a bucket's playbook is refreshed in the background
+        rate_step: Bucket width for fractions in [0, 1] in rate fields
+        significant_digits: Significant digits kept of other numbers
+    """
+
+    def __init__(
+        self,
+        generator: StrategyGenerator,
+        cache: Optional[ResponseCache] = None,
+        ttl_seconds: Optional[float] = None,
+        rate_step: Optional[float] = None,
+        significant_digits: Optional[int] = None,
+    ):
+        self.generator = generator
+        self.cache = cache or ResponseCache(name="playbooks")
+        self.ttl_seconds = ttl_seconds or float(os.getenv("LLM_STRATEGY_TTL", 900))
+        self.rate_step = rate_step or float(os.getenv("LLM_STRATEGY_RATE_STEP", 0.05))
+        self.significant_digits = significant_digits or int(os.getenv("LLM_STRATEGY_SIGNIFICANT_DIGITS", 2))
+
+        # provider -> most recently generated playbook, served while a new bucket's playbook is generated
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._pending: Set[str] = set()
+        # key -> monotonic time before which a failed bucket is not retried
+        self._failed: Dict[str, float] = {}
+        # provider -> monotonic time before which a provider without playbooks is not waited for again
+        self._failed_providers: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def bucket(self, performance_data: Dict[str, Any]) -> Dict[str, Any]:
+        return bucket_value(performance_data, self.rate_step, self.significant_digits)
+
+    def key(self, performance_data: Dict[str, Any], provider: str) -> str:
+        model = self.generator.default_providers.get(provider)
+        return fingerprint("playbook", provider, model, self.bucket(performance_data))
+
+    async def get(
+        self,
+        performance_data: Dict[str, Any],
+        recent_matches: Optional[List[Dict[str, Any]]] = None,
+        provider: str = "openai",
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Playbook for ``performance_data`` and how it was answered.
+
+        The second item is "fresh" or "stale" (this bucket's playbook, within or past
+        its TTL), "previous" (another bucket's, while this one is generated),
+        "generated" (waited for the LLM) or "template".
+        """
+        if provider not in self.generator.default_providers:
+            PLAYBOOK_LOOKUPS.inc(result="template")
+            return self.generator._template_strategy(performance_data), "template"
+
+        key = self.key(performance_data, provider)
+        entry = await self.cache.aget(key)
+        if entry is not None:
+            if time.time() - entry["generated_at"] < self.ttl_seconds:
+                result = "fresh"
+            else:
+                result = "stale"
+                self._refresh(key, performance_data, recent_matches, provider)
+            PLAYBOOK_LOOKUPS.inc(result=result)
+            return entry["playbook"], result
+
+        previous = self._latest.get(provider)
+        if previous is not None:
+            self._refresh(key, performance_data, recent_matches, provider)
+            PLAYBOOK_LOOKUPS.inc(result="previous")
+            return previous, "previous"
+
+        # Nothing to serve yet for this provider; don't wait on it again while it is failing
+        now = time.monotonic()
+        if self._failed_providers.get(provider, 0.0) > now or self._failed.get(key, 0.0) > now:
+            PLAYBOOK_LOOKUPS.inc(result="template")
+            return self.generator._template_strategy(performance_data), "template"
+        playbook = await self._generate(key, performance_data, recent_matches, provider)
+        if playbook is None:
+            drop_expired(self._failed_providers, now)
+            self._failed_providers[provider] = time.monotonic() + RETRY_SECONDS
+            PLAYBOOK_LOOKUPS.inc(result="template")
+            return self.generator._template_strategy(performance_data), "template"
+        self._failed_providers.pop(provider, None)
+        PLAYBOOK_LOOKUPS.inc(result="generated")
+        return playbook, "generated"
+
+    def _refresh(
+        self,
+        key: str,
+        performance_data: Dict[str, Any],
+        recent_matches: Optional[List[Dict[str, Any]]],
+        provider: str,
+    ):
+        if key in self._pending or self._failed.get(key, 0.0) > time.monotonic():
+            return
+        self._pending.add(key)
+        task = asyncio.get_running_loop().create_task(
+            self._generate(key, performance_data, recent_matches, provider)
+        )
+        # Keep a reference until done so the task is not garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _generate(
+        self,
+        key: str,
+        performance_data: Dict[str, Any],
+        recent_matches: Optional[List[Dict[str, Any]]],
+        provider: str,
+    ) -> Optional[Dict[str, Any]]:
+        self._pending.add(key)
+        try:
+            playbook = await self.generator.generate_validated(performance_data, recent_matches, provider)
+        except Exception as e:
+            print(f"Playbook generation error: {e}")
+            playbook = None
+        finally:
+            self._pending.discard(key)
+
+        if playbook is None:
+            now = time.monotonic()
+            drop_expired(self._failed, now)
+            self._failed[key] = now + RETRY_SECONDS
+            return None
+        self._failed.pop(key, None)
+        await self.cache.aset(key, {"playbook": playbook, "generated_at": time.time()})
+        self._latest[provider] = playbook
+        return playbook
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self.cache.close()
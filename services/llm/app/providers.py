@@ -0,0 +1,356 @@
+"""Async clients for remote chat-completion providers
+
+Each provider keeps one pooled HTTP client for the life of the process and
+limits how many requests it has in flight and how many it starts per
+second. Timeouts, connection errors, 429s and 5xx responses are retried
+with exponentially growing, fully jittered delays (or the server's
+Retry-After). Any OpenAI-compatible ``/chat/completions`` endpoint works,
+including a local stand-in pointed at by the provider's base URL.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from .metrics import REGISTRY
+
+PROVIDER_REQUESTS = REGISTRY.counter(
+    "llm_provider_requests_total",
+    "Remote provider attempts by outcome (success, retry, error)",
+    ["provider", "outcome"],
+)
+PROVIDER_LATENCY = REGISTRY.histogram(
+    "llm_provider_request_seconds",
+    "Remote provider attempt latency",
+    ["provider"],
+)
+PROVIDER_IN_FLIGHT = REGISTRY.gauge(
+    "llm_provider_requests_in_flight",
+    "Remote provider requests in flight",
+    ["provider"],
+)
+
+DEFAULT_BASE_URLS = {"openai": "https://api.openai.com/v1"}
+
+# Worth another attempt; anything else 4xx is the request's fault
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class ProviderError(Exception):
+    """A provider request failed for good (after any retries)"""
+
+
+class RateLimiter:
+    """
+    Token bucket: ``rate`` requests per second with bursts of ``burst``.
+
+    Args:
+        rate: Sustained requests per second
+        burst: Requests allowed at once after an idle period (default: max(1, rate))
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ChatProvider:
+    """
+    Client for one OpenAI-compatible chat-completions API.
+
+    Args:
+        name: Provider name, used in metrics and for its ``LLM_<NAME>_*`` settings
+        base_url: API root, e.g. ``https://api.openai.com/v1``
+        api_key: Sent as a bearer token when set
+        max_concurrency: Requests in flight at once
+        rate_limit: Requests started per second; 0 for no limit
+        timeout: Seconds per attempt
+        max_retries: Attempts after the first
+        backoff: Base delay in seconds, doubled per retry before jitter
+        max_backoff: Cap on a single delay
+        transport: httpx transport to use instead of the network (e.g. an in-process stand-in)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 16,
+        rate_limit: float = 0,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit > 0 else None
+        self.transport = transport
+
+        # Created on first use, inside the serving event loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+
+        PROVIDER_IN_FLIGHT.set_function(lambda: self._in_flight, provider=name)
+
+    @classmethod
+    def from_env(cls, name: str) -> "ChatProvider":
+        """
+        Provider configured by ``LLM_<NAME>_BASE_URL``, ``_API_KEY``, ``_MAX_CONCURRENCY``,
+        ``_RATE_LIMIT``, ``_TIMEOUT`` and ``_MAX_RETRIES`` (OpenAI also reads ``OPENAI_*``)
+        """
+        prefix = f"LLM_{name.upper()}_"
+        vendor = f"{name.upper()}_"
+
+        def setting(key: str, default: Any = None) -> Any:
+            return os.getenv(prefix + key, os.getenv(vendor + key, default))
+
+        base_url = setting("BASE_URL", DEFAULT_BASE_URLS.get(name))
+        if not base_url:
+            raise ProviderError(f"No base URL configured for provider '{name}' (set {prefix}BASE_URL)")
+        api_key = setting("API_KEY")
+        if not api_key and base_url == DEFAULT_BASE_URLS.get(name):
+            # The hosted API rejects anonymous requests; fail without a round trip
+            raise ProviderError(f"No API key configured for provider '{name}' (set {vendor}API_KEY)")
+        return cls(
+            name=name,
+            base_url=base_url,
+            api_key=api_key,
+            max_concurrency=int(setting("MAX_CONCURRENCY", 16)),
+            rate_limit=float(setting("RATE_LIMIT", 0)),
+            timeout=float(setting("TIMEOUT", 30)),
+            max_retries=int(setting("MAX_RETRIES", 3)),
+        )
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                transport=self.transport,
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+    ) -> str:
+        """
+        Completion text for ``messages``.
+
+        Raises:
+            ProviderError: If the request still fails after retries
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        response = await self._post("/chat/completions", payload)
+        try:
+            return response.json()["choices"][0]["message"]["content"].strip()
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            raise ProviderError(f"{self.name}: malformed completion response") from e
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+    ) -> AsyncIterator[str]:
+        """
+        Completion text for ``messages``, in pieces as the provider produces them.
+
+        Failures before the stream starts are retried like ``chat``.
+
+        Raises:
+            ProviderError: If the request still fails after retries, or the stream breaks off
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+        }
+        client = self._ensure_client()
+        attempt = 0
+        while True:
+            await self._throttle()
+            retry_after = None
+            streaming = False
+            async with self._slots:
+                self._in_flight += 1
+                started = time.perf_counter()
+                try:
+                    async with client.stream("POST", "/chat/completions", json=payload) as response:
+                        if response.status_code >= 400:
+                            await response.aread()
+                        error, retry_after = self._check(response)
+                        if error is None:
+                            PROVIDER_REQUESTS.inc(provider=self.name, outcome="success")
+                            streaming = True
+                            async for piece in _iter_deltas(response, self.name):
+                                yield piece
+                            return
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    if streaming:
+                        raise ProviderError(f"{self.name}: stream interrupted: {type(e).__name__}") from e
+                    error = _transport_error(e)
+                finally:
+                    self._in_flight -= 1
+                    PROVIDER_LATENCY.observe(time.perf_counter() - started, provider=self.name)
+
+            await self._backoff(attempt, error, retry_after)
+            attempt += 1
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        client = self._ensure_client()
+        attempt = 0
+        while True:
+            await self._throttle()
+            retry_after = None
+            async with self._slots:
+                self._in_flight += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.post(path, json=payload)
+                    error, retry_after = self._check(response)
+                except (httpx.TimeoutException, httpx.TransportError) as e:
+                    error = _transport_error(e)
+                finally:
+                    self._in_flight -= 1
+                    PROVIDER_LATENCY.observe(time.perf_counter() - started, provider=self.name)
+
+            if error is None:
+                PROVIDER_REQUESTS.inc(provider=self.name, outcome="success")
+                return response
+            await self._backoff(attempt, error, retry_after)
+            attempt += 1
+
+    async def _throttle(self):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+    def _check(self, response: httpx.Response) -> Tuple[Optional[str], Optional[float]]:
+        """Transient error (and Retry-After) of a response, or (None, None); raises on permanent errors"""
+        if response.status_code in RETRY_STATUSES:
+            return f"HTTP {response.status_code}", _retry_after(response)
+        if response.status_code >= 400:
+            PROVIDER_REQUESTS.inc(provider=self.name, outcome="error")
+            raise ProviderError(f"{self.name}: HTTP {response.status_code}: {response.text[:200]}")
+        return None, None
+
+    async def _backoff(self, attempt: int, error: str, retry_after: Optional[float]):
+        """Wait before the next attempt, or give up once retries are used up"""
+        if attempt >= self.max_retries:
+            PROVIDER_REQUESTS.inc(provider=self.name, outcome="error")
+            raise ProviderError(f"{self.name}: {error} after {attempt + 1} attempts")
+
+        PROVIDER_REQUESTS.inc(provider=self.name, outcome="retry")
+        # Full jitter keeps retries from many requests from arriving together
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        await asyncio.sleep(max(delay, retry_after or 0))
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _transport_error(error: Exception) -> str:
+    if isinstance(error, httpx.TimeoutException):
+        return "timed out"
+    return f"{type(error).__name__}: {error}"
+
+
+async def _iter_deltas(response: httpx.Response, provider: str) -> AsyncIterator[str]:
+    """Content pieces of a chat-completions event stream"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        try:
+            piece = json.loads(data)["choices"][0].get("delta", {}).get("content")
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            raise ProviderError(f"{provider}: malformed stream chunk") from e
+        if piece:
+            yield piece
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    try:
+        return min(float(value), 60.0) if value is not None else None
+    except ValueError:
+        return None
+
+
+class ProviderRegistry:
+    """Remote providers by name, created from the environment on first use"""
+
+    def __init__(self):
+        self._providers: Dict[str, ChatProvider] = {}
+
+    def get(self, name: str) -> ChatProvider:
+        provider = self._providers.get(name)
+        if provider is None:
+            provider = ChatProvider.from_env(name)
+            self._providers[name] = provider
+        return provider
+
+    def register(self, provider: ChatProvider):
+        """Use ``provider`` for its name instead of the environment's settings"""
+        self._providers[provider.name] = provider
+
+    async def close(self):
+        for provider in self._providers.values():
+            await provider.close()
+
+
+# Shared by all analyzers in the process
+provider_registry = ProviderRegistry()
@@ -0,0 +1,63 @@
+"""Coalescing of concurrent identical provider calls
+
+When several requests need the same prompt at the same time (dashboard
+users opening one match, a retrying strategy loop), the first caller runs
+the provider call and the others await its result instead of sending the
+prompt again. Nothing is kept once the call finishes; completed results
+are the analysis cache's job.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from .metrics import REGISTRY
+
+T = TypeVar("T")
+
+COALESCED = REGISTRY.counter(
+    "llm_coalesced_requests_total",
+    "Requests that shared an identical provider call already in flight",
+    ["group"],
+)
+IN_FLIGHT = REGISTRY.gauge(
+    "llm_inflight_provider_calls",
+    "Distinct provider calls in flight",
+    ["group"],
+)
+
+
+def _retrieve(call: "asyncio.Future"):
+    """Mark a failure as retrieved, so it is not logged when every waiter has gone"""
+    if not call.cancelled():
+        call.exception()
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time and shares its outcome.
+
+    Args:
+        name: Label for metrics
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, "asyncio.Future"] = {}
+        IN_FLIGHT.set_function(lambda: len(self._calls), group=name)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Result of ``fn()``, or of the call already running for ``key``"""
+        call = self._calls.get(key)
+        if call is None:
+            # A task of its own, so a caller that disconnects does not cancel the call for the others
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._forget(key, call))
+            call.add_done_callback(_retrieve)
+        else:
+            COALESCED.inc(group=self.name)
+        return await asyncio.shield(call)
+
+    def _forget(self, key: str, call: "asyncio.Future"):
+        if self._calls.get(key) is call:
+            del self._calls[key]
@@ -1,19 +1,52 @@
 """Strategy generation using LLMs"""
 
 from typing import Dict, Any, Optional, List
+import asyncio
 import json
 
+from .cache import fingerprint
+from .metrics import phase
+from .pipelines import PipelinePool, pipeline_pool
+from .providers import ProviderError, ProviderRegistry, provider_registry
+from .singleflight import SingleFlight
+
+# Fields every playbook needs, with their JSON types
+PLAYBOOK_FIELDS = {
+    "roles": dict,
+    "priorities": list,
+    "tactics": dict,
+    "team_coordination": str,
+}
+
+
+def validate_playbook(playbook: Any) -> bool:
+    """Whether a parsed playbook has every field, with the right type"""
+    return isinstance(playbook, dict) and all(
+        isinstance(playbook.get(field), kind) for field, kind in PLAYBOOK_FIELDS.items()
+    )
+
 
 class StrategyGenerator:
     """Generates strategy playbooks and agent communications"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        pipelines: Optional[PipelinePool] = None,
+        flights: Optional[SingleFlight] = None,
+        providers: Optional[ProviderRegistry] = None,
+    ):
         self.default_providers = {
             "openai": "gpt-3.5-turbo",
             "huggingface": "microsoft/DialoGPT-medium",
         }
+        # Local models are loaded once per process and shared
+        self.pipelines = pipelines or pipeline_pool
+        # Remote APIs, with pooled connections shared across requests
+        self.providers = providers or provider_registry
+        # Concurrent requests for the same prompt share one provider call
+        self.flights = flights or SingleFlight("strategy")
 
-    def generate(
+    async def generate(
         self,
         performance_data: Dict[str, Any],
         recent_matches: Optional[List[Dict[str, Any]]] = None,
@@ -28,15 +61,15 @@ class StrategyGenerator:
             provider: LLM provider
         """
         # Build prompt
-        prompt = self._build_strategy_prompt(performance_data, recent_matches)
+        with phase("build_prompt"):
+            prompt = self._build_strategy_prompt(performance_data, recent_matches)
 
         # Generate strategy
-        if provider == "openai":
-            strategy_json = self._generate_openai(prompt, provider)
-        elif provider == "huggingface":
-            strategy_json = self._generate_huggingface(prompt, provider)
-        else:
-            strategy_json = self._template_strategy(performance_data)
+        with phase("generate"):
+            if provider in self.default_providers:
+                strategy_json = await self._generate_shared(prompt, provider)
+            else:
+                strategy_json = self._template_strategy(performance_data)
 
         # Parse and validate
         try:
@@ -49,6 +82,42 @@ class StrategyGenerator:
 
         return strategy
 
+    async def generate_validated(
+        self,
+        performance_data: Dict[str, Any],
+        recent_matches: Optional[List[Dict[str, Any]]] = None,
+        provider: str = "openai",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Playbook from the LLM, or None if its output is not a valid playbook.
+
+        Unlike ``generate`` this never substitutes the template, so callers can
+        tell a generated playbook from a fallback (e.g. before caching it).
+        """
+        prompt = self._build_strategy_prompt(performance_data, recent_matches)
+        with phase("generate"):
+            strategy_json = await self._generate_shared(prompt, provider)
+        try:
+            strategy = json.loads(strategy_json) if isinstance(strategy_json, str) else strategy_json
+        except ValueError:
+            return None
+        # Provider errors come back as the template playbook
+        if not validate_playbook(strategy) or strategy == self._template_strategy(performance_data):
+            return None
+        return strategy
+
+    async def _generate_shared(self, prompt: str, provider: str) -> str:
+        """Run a provider call, sharing it with identical prompts already in flight"""
+
+        async def call() -> str:
+            if provider == "openai":
+                return await self._generate_openai(prompt, provider)
+            # Local generation is CPU/GPU bound and blocking
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._generate_huggingface, prompt, provider)
+
+        return await self.flights.do(fingerprint(provider, self.default_providers[provider], prompt), call)
+
     def _build_strategy_prompt(
         self,
         performance_data: Dict[str, Any],
@@ -80,12 +149,10 @@ Return a JSON object with:
 """
         return prompt
 
-    def _generate_openai(self, prompt: str, provider: str) -> str:
+    async def _generate_openai(self, prompt: str, provider: str) -> str:
         """Generate strategy using OpenAI"""
         try:
-            import openai
-
-            response = openai.ChatCompletion.create(
+            return await self.providers.get("openai").chat(
                 model=self.default_providers["openai"],
                 messages=[
                     {"role": "system", "content": "You are a strategic game coach. Return only valid JSON."},
@@ -95,21 +162,16 @@ Return a JSON object with:
                 temperature=0.5,
             )
 
-            return response.choices[0].message.content.strip()
-
-        except ImportError:
-            return json.dumps(self._template_strategy({}))
-        except Exception as e:
+        except ProviderError as e:
             print(f"OpenAI API error: {e}")
             return json.dumps(self._template_strategy({}))
 
     def _generate_huggingface(self, prompt: str, provider: str) -> str:
         """Generate strategy using HuggingFace"""
         try:
-            from transformers import pipeline
-
-            generator = pipeline("text-generation", model=self.default_providers["huggingface"])
-            result = generator(prompt, max_length=500, num_return_sequences=1)
+            result = self.pipelines.generate(
+                self.default_providers["huggingface"], prompt, max_length=500, num_return_sequences=1
+            )
 
             return result[0]["generated_text"]
 
@@ -139,7 +201,45 @@ Return a JSON object with:
             "team_coordination": "Maintain proximity for support",
         }
 
-    def generate_comm(
+    async def generate_comm_variant(self, situation: Dict[str, str], provider: str) -> Optional[str]:
+        """
+        LLM-worded message (at most 50 characters) for a bucketed agent situation.
+
+        Returns None when the provider fails, so the caller keeps its template message.
+        """
+        prompt = f"Generate a compact agent communication message. Situation: {json.dumps(situation)}"
+        if provider == "openai":
+            try:
+                text = await self.providers.get("openai").chat(
+                    model=self.default_providers["openai"],
+                    messages=[
+                        {"role": "system", "content": "Reply with one message of at most 50 characters."},
+                        {"role": "user", "content": prompt},
+                    ],
+                    max_tokens=20,
+                    temperature=0.7,
+                )
+            except ProviderError as e:
+                print(f"OpenAI API error: {e}")
+                return None
+        else:
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(
+                    None,
+                    lambda: self.pipelines.generate(
+                        self.default_providers["huggingface"], prompt, max_new_tokens=20, num_return_sequences=1
+                    ),
+                )
+                text = result[0]["generated_text"].replace(prompt, "")
+            except Exception as e:
+                print(f"HuggingFace error: {e}")
+                return None
+
+        lines = text.strip().splitlines()
+        return lines[0][:50] if lines else None
+
+    async def generate_comm(
         self,
         agent_state: Dict[str, Any],
         intent: str,
@@ -173,9 +273,10 @@ Return a JSON object with:
             try:
                 prompt = f"Generate a compact agent communication message. Intent: {intent_name}, State: {json.dumps(agent_state)}"
                 if provider == "openai":
-                    return self._generate_openai(prompt, provider)[:50]  # Limit length
+                    return (await self._generate_openai(prompt, provider))[:50]  # Limit length
                 else:
-                    return self._generate_huggingface(prompt, provider)[:50]
+                    loop = asyncio.get_running_loop()
+                    return (await loop.run_in_executor(None, self._generate_huggingface, prompt, provider))[:50]
             except:
                 pass
 
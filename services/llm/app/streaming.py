@@ -0,0 +1,18 @@
+"""Server-sent events for streamed generations
+
+Each event carries a JSON payload on a single ``data:`` line, so generated
+text containing newlines survives the framing.
+"""
+
+import json
+from typing import Any, Dict
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# Keep proxies from buffering the stream and clients from caching it
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark per-tick agent messaging: batched codebook vs one request per agent
+
+Times the comms codebook on its own and through ``/comms/batch`` (in
+process, no sockets) for a tick of ``--agents`` agents, against the
+original ``/comms`` endpoint called once per agent, plus the binary codec's
+encode and decode.
+
+    python benchmarks/bench_comms.py --agents 2000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("ENABLE_LLM_COMMS", "true")
+
+from app.comms import CommsCodebook  # noqa: E402
+from app.comms_codec import RECORD_SIZE, decode_batch, encode_batch, signal_arrays  # noqa: E402
+
+
+def make_agents(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "intent": str(rng.randrange(5)),
+            "agent_state": {
+                "health": rng.randrange(101),
+                "mana": rng.randrange(3),
+                "position": [rng.uniform(-50, 50), 0.0, rng.uniform(-50, 50)],
+            },
+        }
+        for _ in range(count)
+    ]
+
+
+def best_of(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def time_endpoints(agents: List[Dict[str, Any]], repeats: int, single_requests: int):
+    import httpx
+
+    from app import main as service
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=service.app), base_url="http://llm") as client:
+        batch = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            response = await client.post("/comms/batch", json={"agents": agents})
+            batch = min(batch, time.perf_counter() - start)
+            response.raise_for_status()
+
+        start = time.perf_counter()
+        for agent in agents[:single_requests]:
+            response = await client.post("/comms", json={**agent, "provider": "template"})
+            response.raise_for_status()
+        single = (time.perf_counter() - start) / single_requests
+    return batch, single
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=2000, help="Agents per tick")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--single-requests", type=int, default=200, help="Agents timed through /comms one by one")
+    args = parser.parse_args()
+
+    agents = make_agents(args.agents)
+    intents = [agent["intent"] for agent in agents]
+    states = [agent["agent_state"] for agent in agents]
+    codebook = CommsCodebook()
+
+    direct = best_of(lambda: codebook.messages(intents, states), args.repeats)
+    arrays = signal_arrays(intents, states)
+    packed = encode_batch(*arrays)
+    encode = best_of(lambda: encode_batch(*arrays), args.repeats)
+    decode = best_of(lambda: decode_batch(packed), args.repeats)
+    batch, single = asyncio.run(time_endpoints(agents, args.repeats, min(args.single_requests, args.agents)))
+
+    print(f"{args.agents:,} agents per tick")
+    for name, seconds in (
+        ("codebook", direct),
+        ("/comms/batch", batch),
+        ("/comms x1", single * args.agents),
+        ("codec encode", encode),
+        ("codec decode", decode),
+    ):
+        print(
+            f"  {name:<14}{seconds * 1000:9.2f} ms/tick  {seconds / args.agents * 1e6:8.2f} us/agent"
+            f"  {args.agents / seconds:12,.0f} agents/s"
+        )
+    print(f"  packed tick: {len(packed):,} bytes ({RECORD_SIZE} per agent)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark statistics extraction and prompt size for large matches
+
+Compares the original two-pass extraction (every key event kept, prompt
+built from indented JSON) with the single-pass bounded extraction and the
+token-budgeted prompt. Events are generated lazily, so the streaming
+figures show the extractor's own memory, not the match's.
+
+    python benchmarks/bench_statistics.py --events 1000000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.analyzers import CHARS_PER_TOKEN, PostGameAnalyzer, extract_statistics  # noqa: E402
+
+EVENT_TYPES = ["move", "attack", "pickup", "death", "deposit"]
+
+
+def generate_events(num_events: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for tick in range(num_events - 1):
+        team = "Noxus" if tick % 2 else "Ionia"
+        yield {
+            "tick": tick,
+            "agent_id": f"{team}_{rng.randrange(5)}",
+            "team": team,
+            "event_type": rng.choice(EVENT_TYPES),
+            "data": {"x": rng.random(), "z": rng.random()},
+        }
+    yield {"tick": num_events, "team": "", "event_type": "episode_end", "data": {"winner": "Ionia", "duration": 300.0}}
+
+
+def legacy_extract_statistics(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The original two-pass extraction, for comparison"""
+    stats = {"total_events": len(events), "team_stats": {"Noxus": {}, "Ionia": {}}, "key_events": []}
+    for event in events:
+        team = event.get("team", "")
+        event_type = event.get("event_type", "")
+        if team in stats["team_stats"]:
+            stats["team_stats"][team][event_type] = stats["team_stats"][team].get(event_type, 0) + 1
+        if event_type in ["episode_end", "death", "deposit"]:
+            stats["key_events"].append(event)
+    for event in events:
+        if event.get("event_type") == "episode_end":
+            stats["winner"] = event.get("data", {}).get("winner", "")
+            stats["duration"] = event.get("data", {}).get("duration", 0)
+            break
+    return stats
+
+
+def measure(fn):
+    """Result, wall time, and peak traced allocation (from a second, traced run)"""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    args = parser.parse_args()
+
+    analyzer = PostGameAnalyzer()
+    events = list(generate_events(args.events))
+
+    legacy, legacy_time, legacy_peak = measure(lambda: legacy_extract_statistics(events))
+    legacy_prompt = json.dumps(legacy["key_events"][:10], indent=2)
+    stats, list_time, list_peak = measure(lambda: extract_statistics(events))
+    _, stream_time, stream_peak = measure(lambda: extract_statistics(generate_events(args.events)))
+    prompt = analyzer._build_analysis_prompt(stats, events)
+
+    print(f"{args.events:,} events")
+    print(f"  original     {legacy_time:7.3f}s  peak {legacy_peak / 2**20:8.2f} MiB  "
+          f"key events kept {len(legacy['key_events']):,}")
+    print(f"  single pass  {list_time:7.3f}s  peak {list_peak / 2**20:8.2f} MiB  "
+          f"key events kept {len(stats['key_events']):,}")
+    print(f"  streamed     {stream_time:7.3f}s  peak {stream_peak / 2**20:8.2f} MiB  (includes event generation)")
+    print(f"  prompt       ~{len(prompt) // CHARS_PER_TOKEN} tokens (budget {analyzer.prompt_token_budget}); "
+          f"original key events alone ~{len(legacy_prompt) // CHARS_PER_TOKEN} tokens")
+
+
+if __name__ == "__main__":
+    main()
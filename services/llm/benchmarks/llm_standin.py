@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Deterministic stand-in for an OpenAI-compatible chat-completions API
+
+Replies are derived from a hash of the request, so the same prompt always
+gets the same text, and timing follows the configured time to first token
+and tokens per second. A configurable share of requests fails with a
+retryable status; which ones is decided by the prompt and how often it was
+seen, not by arrival order, so runs are reproducible under concurrency.
+Strategy-style prompts (system prompt asking for JSON) get a JSON playbook.
+
+Use it in-process through ``StandinTransport`` or over HTTP:
+
+    # Serve on :8100 and point the LLM service at it
+    python benchmarks/llm_standin.py --port 8100 --latency 0.3 --tokens-per-second 40 --failure-rate 0.02
+    LLM_OPENAI_BASE_URL=http://localhost:8100/v1 uvicorn app.main:app --port 8002
+
+    # In-process
+    provider_registry.register(ChatProvider("openai", "http://standin/v1", transport=StandinTransport(StandinLLM())))
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple, Union
+
+import httpx
+
+VOCABULARY = (
+    "Noxus Ionia pushed the mid lane while supports rotated to collect mana and deposit it in the "
+    "heal zone early skirmishes favoured the team with better spacing late game coordination decided "
+    "who held the objective after a decisive fight near the river"
+).split()
+
+ROLES = ["collector", "defender", "attacker", "support", "scout"]
+
+
+class StandinLLM:
+    """
+    Simulated chat-completions backend.
+
+    Args:
+        latency: Seconds before the first token
+        jitter: Latency varies by up to this fraction either way, per request
+        tokens_per_second: Generation speed after the first token (0 for instant)
+        failure_rate: Share of requests answered with ``failure_status``
+        failure_status: Status of simulated failures (503 and 429 are retried by clients)
+        reply_tokens: Tokens per reply, capped by the request's max_tokens
+        seed: Changes every reply and failure decision
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.0,
+        tokens_per_second: float = 50.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        reply_tokens: int = 60,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.reply_tokens = reply_tokens
+        self.seed = seed
+
+        self.requests = 0
+        self.failures = 0
+        self.tokens = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._seen: Dict[str, int] = {}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "tokens": self.tokens,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+    def reset(self):
+        self.requests = self.failures = self.tokens = self.peak_in_flight = 0
+        self._seen.clear()
+
+    def reply(self, messages: List[Dict[str, str]], max_tokens: int = 500) -> List[str]:
+        """Reply tokens for ``messages``; the same messages always get the same reply"""
+        digest = self._digest(messages)
+        rng = random.Random(f"{self.seed}:{digest}")
+        count = max(1, min(max_tokens, self.reply_tokens))
+
+        system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        if "json" in system.lower():
+            playbook = {
+                "roles": {f"agent_{i}": rng.choice(ROLES) for i in range(2)},
+                "priorities": [" ".join(rng.choices(VOCABULARY, k=3)) for _ in range(3)],
+                "tactics": {
+                    stage: " ".join(rng.choices(VOCABULARY, k=6))
+                    for stage in ("early_game", "mid_game", "late_game")
+                },
+                "team_coordination": " ".join(rng.choices(VOCABULARY, k=6)),
+            }
+            text = json.dumps(playbook)
+            # Roughly four characters per token
+            return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+        words = rng.choices(VOCABULARY, k=count)
+        words[0] = words[0].capitalize()
+        return [word + ("." if i == count - 1 else " ") for i, word in enumerate(words)]
+
+    async def respond(self, payload: Dict[str, Any]) -> Tuple[int, Dict[str, str], Union[bytes, AsyncIterator[bytes]]]:
+        """Status, headers and body (bytes, or chunks for streams) for a chat-completions request"""
+        messages = payload.get("messages") or []
+        model = payload.get("model", "standin")
+        digest = self._digest(messages)
+
+        self.requests += 1
+        seen = self._seen.get(digest, 0)
+        self._seen[digest] = seen + 1
+        rng = random.Random(f"{self.seed}:{digest}:{seen}")
+        delay = self.latency * (1 + self.jitter * (2 * rng.random() - 1))
+
+        if rng.random() < self.failure_rate:
+            self.failures += 1
+            await asyncio.sleep(delay)
+            body = json.dumps({"error": {"message": "simulated failure", "type": "standin"}}).encode()
+            return self.failure_status, {"content-type": "application/json", "retry-after": "0"}, body
+
+        tokens = self.reply(messages, int(payload.get("max_tokens") or 500))
+        interval = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        completion_id = f"chatcmpl-{digest[:12]}"
+
+        if payload.get("stream"):
+            stream = self._stream(tokens, delay, interval, model, completion_id)
+            return 200, {"content-type": "text/event-stream"}, stream
+
+        self._enter()
+        try:
+            await asyncio.sleep(delay + interval * (len(tokens) - 1))
+        finally:
+            self._leave()
+        self.tokens += len(tokens)
+        body = {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop"}
+            ],
+            "usage": {"completion_tokens": len(tokens)},
+        }
+        return 200, {"content-type": "application/json"}, json.dumps(body).encode()
+
+    async def _stream(
+        self, tokens: List[str], delay: float, interval: float, model: str, completion_id: str
+    ) -> AsyncIterator[bytes]:
+        self._enter()
+        try:
+            await asyncio.sleep(delay)
+            for i, token in enumerate(tokens):
+                if i:
+                    await asyncio.sleep(interval)
+                self.tokens += 1
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+        finally:
+            self._leave()
+
+    def _enter(self):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _leave(self):
+        self.in_flight -= 1
+
+    def _digest(self, messages: List[Dict[str, str]]) -> str:
+        return hashlib.sha256(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+
+
+class _ChunkStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._chunks:
+            yield chunk
+
+    async def aclose(self):
+        await self._chunks.aclose()
+
+
+class StandinTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering chat-completions requests from a StandinLLM, without a socket"""
+
+    def __init__(self, standin: StandinLLM):
+        self.standin = standin
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "POST" or not request.url.path.endswith("/chat/completions"):
+            return httpx.Response(404, json={"error": {"message": f"Unknown path {request.url.path}"}})
+        payload = json.loads(await request.aread())
+        # Honour the client's read timeout, as a real connection would
+        timeout = request.extensions.get("timeout", {}).get("read")
+        try:
+            status, headers, body = await asyncio.wait_for(self.standin.respond(payload), timeout)
+        except asyncio.TimeoutError:
+            raise httpx.ReadTimeout("Stand-in did not answer within the read timeout", request=request)
+        if isinstance(body, bytes):
+            return httpx.Response(status, headers=headers, content=body)
+        # Chunks reach the client as they are produced, like over a socket
+        return httpx.Response(status, headers=headers, stream=_ChunkStream(body))
+
+
+def create_app(standin: StandinLLM):
+    """FastAPI app serving ``standin`` under ``/v1``"""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import Response, StreamingResponse
+
+    app = FastAPI(title="LLM stand-in")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        status, headers, body = await standin.respond(await request.json())
+        if isinstance(body, bytes):
+            return Response(body, status_code=status, headers=headers)
+        return StreamingResponse(body, status_code=status, headers=headers)
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "standin", "object": "model"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return standin.stats
+
+    @app.post("/stats/reset")
+    async def reset():
+        standin.reset()
+        return standin.stats
+
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Stand-in options, shared with the load test"""
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds to first token")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency varies by this fraction either way")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def from_arguments(args: argparse.Namespace) -> StandinLLM:
+    return StandinLLM(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        reply_tokens=args.reply_tokens,
+        seed=args.seed,
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(from_arguments(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""Load test the LLM service against the deterministic provider stand-in
+
+For each endpoint sends ``--requests`` requests with ``--concurrency`` in
+flight and reports throughput, latency percentiles, time to first token
+for ``/analyze/stream``, how many calls reached the provider and how many
+requests were coalesced. ``--distinct`` controls how many different
+matches the requests cycle through, to exercise caching and coalescing.
+
+    # Stand-in and service as local subprocesses (real sockets, real streaming)
+    python benchmarks/load_test.py --spawn --latency 0.3 --tokens-per-second 40 --concurrency 16
+
+    # Everything in this process (no sockets; streamed bodies arrive at once, so no TTFT)
+    python benchmarks/load_test.py --in-process --failure-rate 0.05
+
+    # Against a running service (provider calls are not counted)
+    python benchmarks/load_test.py --url http://localhost:8002 --endpoints analyze
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import llm_standin  # noqa: E402
+from bench_statistics import generate_events  # noqa: E402
+
+SERVICE_DIR = Path(__file__).parent.parent
+
+# name -> (path, request kind)
+ENDPOINTS = {
+    "analyze": ("/analyze", "json"),
+    "analyze_stream": ("/analyze/stream", "stream"),
+    "strategy": ("/strategy", "json"),
+    "batch": ("/analyze/batch", "json"),
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Payloads:
+    """Request bodies, built once up front"""
+
+    def __init__(self, distinct: int, events_per_match: int, batch_size: int):
+        self.distinct = distinct
+        self.batch_size = batch_size
+        self.matches = [list(generate_events(events_per_match, seed=i)) for i in range(distinct)]
+
+    def body(self, name: str, index: int) -> Dict[str, Any]:
+        match = index % self.distinct
+        if name == "strategy":
+            return {"performance_data": {"team": "Noxus", "win_rate": round(match / self.distinct, 3)}}
+        if name == "batch":
+            return {
+                "matches": [
+                    {"match_id": str(m), "events": self.matches[m % self.distinct]}
+                    for m in range(index * self.batch_size, (index + 1) * self.batch_size)
+                ]
+            }
+        return {"events": self.matches[match]}
+
+
+class Result:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.ttft: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.failed_items = 0
+        self.errors: List[str] = []
+        self.elapsed = 0.0
+        self.provider_calls: Optional[int] = None
+        self.coalesced = 0.0
+
+    def record(self, status: int, latency: float, ttft: Optional[float] = None):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if 200 <= status < 300:
+            self.latencies.append(latency)
+            if ttft is not None:
+                self.ttft.append(ttft)
+
+    def summary(self) -> Dict[str, Any]:
+        ok = len(self.latencies)
+        return {
+            "endpoint": self.name,
+            "requests": sum(self.statuses.values()),
+            "ok": ok,
+            "statuses": self.statuses,
+            "failed_items": self.failed_items,
+            "throughput_rps": ok / self.elapsed if self.elapsed else 0.0,
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p90": percentile(self.latencies, 90),
+            "latency_p99": percentile(self.latencies, 99),
+            "latency_max": max(self.latencies) if self.latencies else float("nan"),
+            "ttft_p50": percentile(self.ttft, 50) if self.ttft else None,
+            "ttft_p99": percentile(self.ttft, 99) if self.ttft else None,
+            "provider_calls": self.provider_calls,
+            "coalesced": self.coalesced,
+            "errors": self.errors[:5],
+        }
+
+
+async def scrape_coalesced(client) -> float:
+    """Sum of llm_coalesced_requests_total over groups"""
+    try:
+        response = await client.get("/metrics")
+    except Exception:
+        return 0.0
+    return sum(
+        float(match.group(1))
+        for match in re.finditer(r"^llm_coalesced_requests_total\{[^}]*\} (\S+)$", response.text, re.MULTILINE)
+    )
+
+
+async def send(client, name: str, payloads: Payloads, index: int, result: Result):
+    path, kind = ENDPOINTS[name]
+    body = payloads.body(name, index)
+    started = time.perf_counter()
+
+    if kind == "stream":
+        ttft = None
+        failed = False
+        async with client.stream("POST", path, json=body) as response:
+            async for line in response.aiter_lines():
+                if ttft is None and line.startswith("event: token"):
+                    ttft = time.perf_counter() - started
+                failed = failed or line.startswith("event: error")
+        if failed:
+            result.failed_items += 1
+        result.record(response.status_code, time.perf_counter() - started, ttft)
+        return
+
+    response = await client.post(path, json=body)
+    result.record(response.status_code, time.perf_counter() - started)
+    if not 200 <= response.status_code < 300:
+        if len(result.errors) < 5:
+            result.errors.append(f"{response.status_code}: {response.text[:200]}")
+    elif name == "batch":
+        result.failed_items += response.json()["failed"]
+
+
+async def run_endpoint(client, name: str, payloads: Payloads, args, standin_stats) -> Result:
+    result = Result(name)
+    counter = iter(range(args.requests))
+    calls_before = await standin_stats()
+    coalesced_before = await scrape_coalesced(client)
+
+    async def worker():
+        for index in counter:
+            try:
+                await send(client, name, payloads, index, result)
+            except Exception as e:
+                result.statuses[0] = result.statuses.get(0, 0) + 1
+                result.errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    result.elapsed = time.perf_counter() - started
+
+    calls_after = await standin_stats()
+    if calls_before is not None and calls_after is not None:
+        result.provider_calls = calls_after - calls_before
+    result.coalesced = await scrape_coalesced(client) - coalesced_before
+    return result
+
+
+def spawn_standin(args) -> subprocess.Popen:
+    command = [
+        sys.executable, str(Path(__file__).parent / "llm_standin.py"),
+        "--port", str(args.standin_port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--tokens-per-second", str(args.tokens_per_second),
+        "--failure-rate", str(args.failure_rate),
+        "--failure-status", str(args.failure_status),
+        "--reply-tokens", str(args.reply_tokens),
+        "--seed", str(args.seed),
+    ]
+    return subprocess.Popen(command, cwd=SERVICE_DIR)
+
+
+def service_env(args, base_url: str) -> Dict[str, str]:
+    env = {"LLM_OPENAI_BASE_URL": base_url}
+    if not args.cache:
+        env.update({"LLM_CACHE_SIZE": "0", "LLM_CACHE_PATH": ""})
+    return env
+
+
+def spawn_service(args) -> subprocess.Popen:
+    env = os.environ.copy()
+    env.update(service_env(args, f"http://127.0.0.1:{args.standin_port}/v1"))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=SERVICE_DIR,
+        env=env,
+    )
+
+
+async def wait_until_ready(client, path: str = "/", timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(path)).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"{path} did not become ready")
+
+
+def print_table(summaries: List[Dict[str, Any]]):
+    header = (
+        f"{'endpoint':<16}{'ok/total':>10}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+        f"{'ttft p50':>10}{'ttft p99':>10}{'provider':>10}{'coalesced':>11}{'failed':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        ttft = "".join(
+            f"{value * 1000:>10.1f}" if value is not None else f"{'-':>10}" for value in (s["ttft_p50"], s["ttft_p99"])
+        )
+        calls = f"{s['provider_calls']:>10}" if s["provider_calls"] is not None else f"{'-':>10}"
+        print(
+            f"{s['endpoint']:<16}{s['ok']:>5}/{s['requests']:<4}{s['throughput_rps']:>9.2f}"
+            f"{s['latency_p50'] * 1000:>9.1f}{s['latency_p90'] * 1000:>9.1f}{s['latency_p99'] * 1000:>9.1f}"
+            f"{ttft}{calls}{s['coalesced']:>11.0f}{s['failed_items']:>8}"
+        )
+        for status, count in sorted(s["statuses"].items()):
+            if not 200 <= status < 300:
+                print(f"{'':<16}{count} x {'connection error' if status == 0 else status}")
+
+
+async def main_async(args):
+    import httpx
+
+    payloads = Payloads(args.distinct or args.requests, args.events, args.batch_size)
+    processes: List[subprocess.Popen] = []
+    standin_client = None
+    lifespan = None
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+
+    if args.in_process:
+        os.environ.update(service_env(args, "http://standin/v1"))
+        from app import main as service
+        from app.providers import ChatProvider
+
+        standin = llm_standin.from_arguments(args)
+        service.provider_registry.register(
+            ChatProvider("openai", "http://standin/v1", transport=llm_standin.StandinTransport(standin))
+        )
+        client_args = {"transport": httpx.ASGITransport(app=service.app), "base_url": "http://llm"}
+        # ASGITransport never runs the lifespan: start the warm-up and close resources as a server would
+        lifespan = service.app.router.lifespan_context(service.app)
+
+        async def standin_stats():
+            return standin.requests
+    else:
+        if args.spawn:
+            processes.append(spawn_standin(args))
+            processes.append(spawn_service(args))
+        url = f"http://127.0.0.1:{args.port}" if args.spawn else args.url
+        client_args = {"base_url": url}
+        standin_client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.standin_port}")
+
+        async def standin_stats():
+            if not args.spawn:
+                return None
+            return (await standin_client.get("/stats")).json()["requests"]
+
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            if lifespan is not None:
+                await stack.enter_async_context(lifespan)
+            client = await stack.enter_async_context(
+                httpx.AsyncClient(timeout=args.timeout, limits=limits, **client_args)
+            )
+            if args.spawn:
+                await wait_until_ready(standin_client, "/stats")
+            await wait_until_ready(client, "/health/ready")
+
+            summaries = []
+            for name in args.endpoints:
+                print(f"{name} ...", file=sys.stderr)
+                result = await run_endpoint(client, name, payloads, args, standin_stats)
+                summaries.append(result.summary())
+    finally:
+        if standin_client is not None:
+            await standin_client.aclose()
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print(
+        f"\n{args.requests} requests per endpoint, concurrency {args.concurrency}, "
+        f"{payloads.distinct} distinct matches of {args.events:,} events\n"
+    )
+    print_table(summaries)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "results": summaries}, f, indent=2, default=str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--url", default="http://localhost:8002")
+    mode.add_argument("--spawn", action="store_true", help="Start the stand-in and the service as subprocesses")
+    mode.add_argument("--in-process", action="store_true", help="Run the stand-in and the service in this process")
+    parser.add_argument("--port", type=int, default=8012, help="Service port for --spawn")
+    parser.add_argument("--standin-port", type=int, default=8101, help="Stand-in port for --spawn")
+    parser.add_argument("--events", type=int, default=1000, help="Events per match")
+    parser.add_argument(
+        "--distinct", type=int, default=0, help="Distinct matches to cycle through (default: one per request)"
+    )
+    parser.add_argument("--batch-size", type=int, default=8, help="Matches per /analyze/batch request")
+    parser.add_argument("--cache", action="store_true", help="Keep the analysis cache enabled (--spawn/--in-process)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument(
+        "--endpoints",
+        type=lambda value: value.split(","),
+        default=list(ENDPOINTS),
+        help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}",
+    )
+    parser.add_argument("-o", "--output", help="Write results as JSON")
+    llm_standin.add_arguments(parser)
+    args = parser.parse_args()
+
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Import the service as `app`, like the benchmarks do
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,12 @@
+"""Analysis cache keys"""
+
+from app.analyzers import PostGameAnalyzer, extract_statistics
+
+
+def test_cache_key_depends_on_prompt_token_budget():
+    stats = extract_statistics([{"event_type": "death", "team": "Noxus"}])
+    small = PostGameAnalyzer(prompt_token_budget=100).cache_key(stats, "openai", "gpt-3.5-turbo")
+    large = PostGameAnalyzer(prompt_token_budget=1000).cache_key(stats, "openai", "gpt-3.5-turbo")
+
+    assert small != large
+    assert small == PostGameAnalyzer(prompt_token_budget=100).cache_key(stats, "openai", "gpt-3.5-turbo")
@@ -0,0 +1,46 @@
+"""Batch analysis keeps failures per match"""
+
+import asyncio
+
+from app.analyzers import PostGameAnalyzer
+from app.batch import BatchAnalyzer
+
+
+def match(winner="Noxus", duration=42.0):
+    return [
+        {"event_type": "deposit", "team": "Noxus", "agent_id": 1},
+        {"event_type": "death", "team": "Ionia", "agent_id": 3},
+        {"event_type": "episode_end", "team": "Noxus", "data": {"winner": winner, "duration": duration}},
+    ]
+
+
+def analyze(matches, provider):
+    analyzer = PostGameAnalyzer()
+
+    async def generate(provider, model, prompt):
+        return f"analysis of {len(prompt)} chars"
+
+    analyzer.generate = generate
+    batch = BatchAnalyzer(analyzer, stats_workers=1)
+    try:
+        return asyncio.run(batch.analyze(matches, provider=provider))
+    finally:
+        batch.close()
+
+
+def test_malformed_match_fails_alone_in_template_batch():
+    results = analyze([match(), match(duration="long"), match(winner="Ionia")], provider="template")
+
+    assert [result["status"] for result in results] == ["success", "error", "success"]
+    assert "Noxus won after 42.0 seconds" in results[0]["analysis"]
+    assert "Ionia won" in results[2]["analysis"]
+    assert results[1]["error"].startswith("Could not build analysis")
+
+
+def test_malformed_match_fails_alone_in_generated_batch():
+    results = analyze([match(duration="long"), match(), match(duration=7.5)], provider="openai")
+
+    assert [result["status"] for result in results] == ["error", "success", "success"]
+    assert results[0]["error"].startswith("Could not build prompt")
+    assert all(result["analysis"].startswith("analysis of") for result in results[1:])
+    assert not any(result["cached"] for result in results[1:])
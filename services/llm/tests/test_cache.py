@@ -0,0 +1,92 @@
+"""Two-tier response cache"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.cache import ResponseCache, fingerprint
+
+
+def test_memory_tier_expires_after_ttl():
+    cache = ResponseCache("memory_ttl", path="", ttl_seconds=0.05)
+    cache.set("key", {"text": "hello"})
+    assert cache.get("key") == {"text": "hello"}
+
+    time.sleep(0.06)
+    assert cache.get("key") is None
+    assert "key" not in cache._memory
+
+
+def test_disk_tier_survives_restarts_and_expires(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache("disk_ttl", path=path, ttl_seconds=0.2)
+    cache.set("key", ["a", 1])
+    cache.close()
+
+    restarted = ResponseCache("disk_ttl", path=path, ttl_seconds=0.2)
+    assert restarted.get("key") == ["a", 1]
+    # Promoted: later lookups are served from memory with the disk entry's expiry
+    assert "key" in restarted._memory
+    restarted.close()
+
+    time.sleep(0.21)
+    expired = ResponseCache("disk_ttl", path=path, ttl_seconds=0.2)
+    assert expired.get("key") is None
+    expired.close()
+
+
+def test_disk_hits_are_promoted_to_memory(tmp_path):
+    cache = ResponseCache("promotion", path=str(tmp_path / "cache.sqlite3"))
+    cache.set("key", "value")
+    cache._memory.clear()
+
+    assert cache.get("key") == "value"
+    cache.close()
+    # Served from memory once the disk tier is gone
+    cache.path = ""
+    assert cache.get("key") == "value"
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache("lru", path="", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_async_access_matches_sync(tmp_path):
+    async def run():
+        cache = ResponseCache("async_access", path=str(tmp_path / "cache.sqlite3"))
+        key = fingerprint("openai", "gpt-3.5-turbo", {"kills": 3})
+        assert await cache.aget(key) is None
+        await cache.aset(key, {"summary": "ok"})
+        cache._memory.clear()
+        assert await cache.aget(key) == {"summary": "ok"}
+        cache.close()
+
+    asyncio.run(run())
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = ResponseCache("clearing", path=str(tmp_path / "cache.sqlite3"))
+    cache.set("key", "value")
+    cache.clear()
+    cache._memory.clear()
+    assert cache.get("key") is None
+    cache.close()
+
+
+@pytest.mark.parametrize("name", ["", "1cache", "analysis; DROP TABLE analysis", "my-cache", "a b"])
+def test_name_must_be_an_identifier(name):
+    with pytest.raises(ValueError):
+        ResponseCache(name, path="")
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
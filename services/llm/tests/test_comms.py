@@ -0,0 +1,23 @@
+"""Comms state bucketing tolerates malformed agent states"""
+
+from app.comms import CommsCodebook, bucket
+
+
+def test_bucket_reads_fractions_and_hit_points():
+    assert bucket({"health": 0.2, "mana": 3, "position": [-40, 0, 0]}) == (0, 1, 0)
+    assert bucket({"health": 50, "max_health": 100, "position": {"x": 0}}) == (1, 0, 1)
+    assert bucket({}) == (2, 0, 1)
+
+
+def test_bucket_treats_unparsable_fields_as_missing():
+    assert bucket({"health": "full"}) == bucket({})
+    assert bucket({"health": 80, "max_health": "lots", "mana": "some"}) == (2, 0, 1)
+    assert bucket({"health": 80, "max_health": 0}) == (2, 0, 1)
+
+
+def test_one_bad_agent_does_not_fail_the_batch():
+    states = [{"health": 0.1}, {"health": "n/a"}, {"health": [1, 2]}, {"health": 0.5}]
+    messages = CommsCodebook().messages(["attack"] * len(states), states)
+
+    assert len(messages) == len(states)
+    assert all(messages)
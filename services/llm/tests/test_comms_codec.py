@@ -0,0 +1,94 @@
+"""Packed comms formats round-trip and tolerate malformed agent states"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.comms_codec import (
+    RECORD_SIZE,
+    UNKNOWN_CODE,
+    VECTOR_SIZE,
+    decode_batch,
+    encode_batch,
+    from_vectors,
+    signal_arrays,
+    to_vectors,
+)
+
+INTENTS = [0, 1, 2, 3, 4, 9]
+POSITIONS = [[0.0, 0.0], [10.0, -20.0], [-49.5, 49.5], [25.0, 0.0], [50.0, -50.0], [3.0, 4.0]]
+PRIORITIES = [0, 1, 2, 5, 7, 3]
+
+
+def test_binary_round_trip():
+    data = encode_batch(INTENTS, POSITIONS, PRIORITIES)
+    assert len(data) == RECORD_SIZE * len(INTENTS)
+
+    decoded = decode_batch(data)
+    np.testing.assert_array_equal(decoded["intent"], [0, 1, 2, 3, 4, UNKNOWN_CODE])
+    np.testing.assert_array_equal(decoded["priority"], PRIORITIES)
+    np.testing.assert_allclose(decoded["position"], POSITIONS, atol=50 / 32767)
+
+
+def test_vector_round_trip():
+    vectors = to_vectors(INTENTS, POSITIONS, PRIORITIES)
+    assert vectors.shape == (len(INTENTS), VECTOR_SIZE)
+    assert vectors.dtype == np.float32
+    np.testing.assert_array_equal(vectors[-1, :5], 0.0)
+
+    decoded = from_vectors(vectors)
+    np.testing.assert_array_equal(decoded["intent"], [0, 1, 2, 3, 4, UNKNOWN_CODE])
+    np.testing.assert_array_equal(decoded["priority"], PRIORITIES)
+    np.testing.assert_allclose(decoded["position"], POSITIONS, atol=1e-4)
+
+
+def test_xyz_positions_and_out_of_range_values_are_clipped():
+    decoded = decode_batch(encode_batch([2, 2], [[80.0, 5.0, -3.0], [1.0, 5.0, -90.0]], [12, -1]))
+    np.testing.assert_array_equal(decoded["priority"], [7, 0])
+    np.testing.assert_allclose(decoded["position"], [[50.0, -3.0], [1.0, -50.0]], atol=50 / 32767)
+
+
+def test_decode_rejects_partial_records():
+    with pytest.raises(ValueError):
+        decode_batch(b"\x00" * (RECORD_SIZE + 1))
+
+
+def test_signal_arrays_treat_malformed_fields_as_missing():
+    states = [
+        {"priority": "high", "position": "nowhere"},
+        {"priority": None, "position": [float("nan"), 0.0, 1.0]},
+        {"priority": "3", "position": "(10, 0, -5)"},
+        {"priority": 1e30, "position": {"x": 4}},
+        {"priority": float("nan")},
+    ]
+    codes, positions, priorities = signal_arrays(["attacking", "2", 4, "bogus", 0], states)
+
+    np.testing.assert_array_equal(codes, [2, 2, 4, 5, 0])
+    np.testing.assert_array_equal(priorities, [0, 0, 3, 7, 0])
+    np.testing.assert_array_equal(positions, [[0, 0], [0, 0], [10, -5], [4, 0], [0, 0]])
+
+    decoded = decode_batch(encode_batch(codes, positions, priorities))
+    np.testing.assert_array_equal(decoded["intent"], [2, 2, 4, UNKNOWN_CODE, 0])
+    np.testing.assert_array_equal(decoded["priority"], [0, 0, 3, 7, 0])
+
+
+@pytest.mark.parametrize("fmt", ["text", "vector", "binary"])
+def test_comms_batch_answers_every_format_with_a_malformed_agent(monkeypatch, fmt):
+    monkeypatch.setattr(main, "ENABLE_COMMS", True)
+    agents = [
+        {"intent": "attacking", "agent_state": {"health": 0.5, "priority": 2, "position": [10, 0, 10]}},
+        {"intent": "defending", "agent_state": {"health": "n/a", "priority": "high", "position": "?"}},
+    ]
+    response = TestClient(main.app).post("/comms/batch", json={"agents": agents, "format": fmt})
+    assert response.status_code == 200
+
+    if fmt == "binary":
+        decoded = decode_batch(response.content)
+        np.testing.assert_array_equal(decoded["priority"], [2, 0])
+    elif fmt == "vector":
+        decoded = from_vectors(np.array(response.json()["vectors"]))
+        np.testing.assert_array_equal(decoded["intent"], [2, 3])
+        np.testing.assert_array_equal(decoded["priority"], [2, 0])
+    else:
+        assert len(response.json()["messages"]) == 2
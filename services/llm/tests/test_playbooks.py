@@ -0,0 +1,142 @@
+"""Playbook cache answers, bucketing and failure backoff"""
+
+import asyncio
+import time
+
+from app.cache import ResponseCache
+from app.playbooks import PlaybookCache, bucket_value
+from app.strategies import StrategyGenerator
+
+
+def playbook(name):
+    return {
+        "roles": {"agent_0": name},
+        "priorities": [name],
+        "tactics": {"early_game": name},
+        "team_coordination": name,
+    }
+
+
+class Scenario:
+    """PlaybookCache over a memory-only cache and a scripted generator"""
+
+    def __init__(self, **kwargs):
+        self.generator = StrategyGenerator()
+        self.generator.generate_validated = self.generate_validated
+        self.cache = PlaybookCache(self.generator, cache=ResponseCache("playbooks", path=""), **kwargs)
+        self.replies = []
+        self.calls = 0
+
+    async def generate_validated(self, performance_data, recent_matches=None, provider="openai"):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        reply = self.replies.pop(0) if self.replies else None
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    async def get(self, win_rate, provider="openai"):
+        return await self.cache.get({"win_rate": win_rate}, provider=provider)
+
+    async def settle(self):
+        await asyncio.gather(*self.cache._tasks)
+
+
+def test_fresh_stale_previous_and_template_answers():
+    async def run():
+        scenario = Scenario(ttl_seconds=0.2)
+        template = scenario.generator._template_strategy({})
+        scenario.replies = [playbook("first"), playbook("other bucket"), playbook("refreshed")]
+
+        assert await scenario.get(0.5, provider="template") == (template, "template")
+        assert await scenario.get(0.5) == (playbook("first"), "generated")
+        assert await scenario.get(0.52) == (playbook("first"), "fresh")
+
+        # A new bucket gets the latest playbook while its own is generated
+        assert await scenario.get(0.9) == (playbook("first"), "previous")
+        await scenario.settle()
+        assert await scenario.get(0.9) == (playbook("other bucket"), "fresh")
+
+        await asyncio.sleep(0.2)
+        assert await scenario.get(0.5) == (playbook("first"), "stale")
+        await scenario.settle()
+        assert await scenario.get(0.5) == (playbook("refreshed"), "fresh")
+        assert scenario.calls == 3
+
+    asyncio.run(run())
+
+
+def test_failing_provider_is_not_waited_on_again_without_a_playbook():
+    async def run():
+        scenario = Scenario()
+        template = scenario.generator._template_strategy({})
+        scenario.replies = [RuntimeError("provider down")]
+
+        assert await scenario.get(0.5) == (template, "template")
+        assert scenario.calls == 1
+
+        # Other buckets of the same provider also skip the LLM during the backoff
+        started = time.monotonic()
+        assert await scenario.get(0.5) == (template, "template")
+        assert await scenario.get(0.9) == (template, "template")
+        assert scenario.calls == 1
+        assert time.monotonic() - started < 0.01
+
+        # Once it lapses the provider is tried again
+        scenario.cache._failed_providers["openai"] = 0.0
+        scenario.cache._failed.clear()
+        scenario.replies = [playbook("recovered")]
+        assert await scenario.get(0.5) == (playbook("recovered"), "generated")
+        assert not scenario.cache._failed_providers
+
+    asyncio.run(run())
+
+
+def test_failed_buckets_are_retried_after_the_backoff_and_forgotten_once_lapsed():
+    async def run():
+        scenario = Scenario()
+        scenario.replies = [playbook("first")]
+        await scenario.get(0.5)
+
+        for win_rate in (0.1, 0.2, 0.3):
+            assert (await scenario.get(win_rate))[1] == "previous"
+            await scenario.settle()
+        assert len(scenario.cache._failed) == 3
+
+        # Backing off: no new attempt for a failed bucket
+        await scenario.get(0.1)
+        assert not scenario.cache._tasks and scenario.calls == 4
+
+        for key in scenario.cache._failed:
+            scenario.cache._failed[key] = 0.0
+        await scenario.get(0.1)
+        await scenario.settle()
+        assert scenario.calls == 5
+        # The lapsed entries were dropped when the new failure was recorded
+        assert len(scenario.cache._failed) == 1
+
+    asyncio.run(run())
+
+
+def test_only_rate_fields_are_bucketed_as_rates():
+    data = {
+        "win_rate": 0.62,
+        "kill_ratio": 0.6,
+        "mana_share": [0.33, 0.97],
+        "avg_reaction_seconds": 0.93,
+        "episode_return": 123.4,
+        "games": 57,
+        "team": "Noxus",
+        "stats": {"Accuracy": 0.456, "delay": 0.456},
+    }
+    assert bucket_value(data, 0.05, 2) == {
+        "win_rate": 0.6,
+        "kill_ratio": 0.6,
+        "mana_share": [0.3, 0.95],
+        "avg_reaction_seconds": 0.93,
+        "episode_return": 120.0,
+        "games": 57.0,
+        "team": "Noxus",
+        "stats": {"Accuracy": 0.45, "delay": 0.46},
+    }
+    assert bucket_value({"win_rate": float("nan")}, 0.05, 2) == {"win_rate": "nan"}
@@ -0,0 +1,160 @@
+"""ChatProvider retries, timeouts, concurrency and error handling against the stand-in"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.providers import ChatProvider, ProviderError
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from llm_standin import StandinLLM, StandinTransport  # noqa: E402
+
+
+class ScriptedTransport(StandinTransport):
+    """Answers the first requests with canned responses, then defers to the stand-in"""
+
+    def __init__(self, standin, *responses):
+        super().__init__(standin)
+        self.responses = list(responses)
+        self.attempts = 0
+
+    async def handle_async_request(self, request):
+        self.attempts += 1
+        if self.responses:
+            return self.responses.pop(0)
+        return await super().handle_async_request(request)
+
+
+def provider(transport, **kwargs):
+    kwargs.setdefault("backoff", 0.0)
+    return ChatProvider("test", "http://standin/v1", transport=transport, **kwargs)
+
+
+def chat(client, prompt="How did the match go?", **kwargs):
+    async def call():
+        try:
+            return await client.chat([{"role": "user", "content": prompt}], model="standin", **kwargs)
+        finally:
+            await client.close()
+
+    return asyncio.run(call())
+
+
+def test_completion_text_comes_from_the_standin():
+    standin = StandinLLM(latency=0.0, tokens_per_second=0)
+    text = chat(provider(StandinTransport(standin)))
+
+    assert text == "".join(standin.reply([{"role": "user", "content": "How did the match go?"}])).strip()
+    assert standin.requests == 1
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retryable_statuses_are_retried_after_retry_after(status):
+    standin = StandinLLM(latency=0.0, tokens_per_second=0)
+    transport = ScriptedTransport(standin, httpx.Response(status, headers={"Retry-After": "0.3"}))
+
+    started = time.monotonic()
+    text = chat(provider(transport))
+
+    assert text
+    assert transport.attempts == 2 and standin.requests == 1
+    assert time.monotonic() - started >= 0.3
+
+
+def test_retries_give_up_after_max_retries():
+    standin = StandinLLM(latency=0.0, failure_rate=1.0, failure_status=503)
+
+    with pytest.raises(ProviderError, match="HTTP 503 after 3 attempts"):
+        chat(provider(StandinTransport(standin), max_retries=2))
+    assert standin.requests == 3
+
+
+def test_client_errors_are_not_retried():
+    transport = ScriptedTransport(StandinLLM(), httpx.Response(400, json={"error": {"message": "bad model"}}))
+
+    with pytest.raises(ProviderError, match="HTTP 400"):
+        chat(provider(transport))
+    assert transport.attempts == 1
+
+
+def test_timed_out_attempts_are_retried_then_fail():
+    standin = StandinLLM(latency=1.0, tokens_per_second=0)
+
+    started = time.monotonic()
+    with pytest.raises(ProviderError, match="timed out after 2 attempts"):
+        chat(provider(StandinTransport(standin), timeout=0.1, max_retries=1))
+    assert standin.requests == 2
+    assert time.monotonic() - started < 1.0
+
+
+def test_concurrency_is_limited_to_max_concurrency():
+    standin = StandinLLM(latency=0.05, tokens_per_second=0)
+    client = provider(StandinTransport(standin), max_concurrency=2)
+
+    async def burst():
+        try:
+            return await asyncio.gather(*(
+                client.chat([{"role": "user", "content": f"match {i}"}], model="standin") for i in range(8)
+            ))
+        finally:
+            await client.close()
+
+    texts = asyncio.run(burst())
+    assert len(set(texts)) == 8
+    assert standin.requests == 8
+    assert standin.peak_in_flight == 2
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, content=b"<html>gateway</html>"),
+        httpx.Response(200, json={"choices": []}),
+        httpx.Response(200, json={"choices": [{"message": {"content": None}}]}),
+        httpx.Response(200, json=["not", "an", "object"]),
+    ],
+)
+def test_malformed_responses_raise_provider_error(response):
+    transport = ScriptedTransport(StandinLLM(), response)
+
+    with pytest.raises(ProviderError, match="malformed completion response"):
+        chat(provider(transport))
+    assert transport.attempts == 1
+
+
+def test_stream_chat_yields_the_reply_in_pieces():
+    standin = StandinLLM(latency=0.0, tokens_per_second=0)
+    client = provider(ScriptedTransport(standin, httpx.Response(503, headers={"Retry-After": "0"})))
+    messages = [{"role": "user", "content": "Stream it"}]
+
+    async def collect():
+        try:
+            return [piece async for piece in client.stream_chat(messages, model="standin")]
+        finally:
+            await client.close()
+
+    pieces = asyncio.run(collect())
+    assert pieces == standin.reply(messages)
+
+
+def test_malformed_stream_chunks_raise_provider_error():
+    body = b'data: {"choices": [{"delta": {"content": "Hi"}}]}\n\ndata: {not json}\n\n'
+    response = httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body)
+    client = provider(ScriptedTransport(StandinLLM(), response))
+
+    async def collect():
+        pieces = []
+        try:
+            async for piece in client.stream_chat([{"role": "user", "content": "Hi"}], model="standin"):
+                pieces.append(piece)
+        finally:
+            await client.close()
+        return pieces
+
+    with pytest.raises(ProviderError, match="malformed stream chunk"):
+        asyncio.run(collect())
@@ -0,0 +1,101 @@
+"""Coalescing of concurrent identical calls"""
+
+import asyncio
+import gc
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        flights = SingleFlight("shared")
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "playbook"
+
+        results = await asyncio.gather(*(flights.do("key", call) for _ in range(10)))
+        assert results == ["playbook"] * 10
+        assert calls == 1
+        assert not flights._calls
+
+        # Finished calls are not reused
+        assert await flights.do("key", call) == "playbook"
+        assert calls == 2
+
+    asyncio.run(run())
+
+
+def test_distinct_keys_run_separately():
+    async def run():
+        flights = SingleFlight("distinct")
+
+        async def call(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(flights.do("a", lambda: call("a")), flights.do("b", lambda: call("b")))
+        assert results == ["a", "b"]
+
+    asyncio.run(run())
+
+
+def test_failure_is_shared_with_every_caller():
+    async def run():
+        flights = SingleFlight("failure")
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(*(flights.do("key", call) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    async def run():
+        flights = SingleFlight("cancel")
+
+        async def call():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flights.do("key", call))
+        second = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(run())
+
+
+def test_failure_after_every_caller_left_is_not_reported_as_unretrieved():
+    unretrieved = []
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+        flights = SingleFlight("abandoned")
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        waiter = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.02)
+        assert not flights._calls
+        gc.collect()
+
+    asyncio.run(run())
+    gc.collect()
+    assert not unretrieved